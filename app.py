@@ -1,23 +1,58 @@
 #!/usr/bin/python3
+import functools
 import importlib
 import os
 import sys
 from datetime import datetime
 
-from PyQt5 import QtCore, QtWidgets, uic
+from PyQt5 import QtCore, QtWidgets
 from PyQt5.Qt import QMessageBox, QWidget, pyqtSlot
 
+from build_ui import UI_FILE, build, is_compiled
 from custom_tableview import CustomTableView
-from model import TableModel
-from paginator import QueryPaginator
+from model import TableModel, VirtualTableModel
+from pool import ConnectionPool
+from providers import all_providers
+from result_cache import ResultCache, cache_ttl
+from result_tab import ResultTab
+
+
+def form_class():
+    """
+    Returns the form class compiled into ui_app.py, which is rebuilt if
+    app.ui has changed. The class is generated from app.ui at runtime if
+    it can't be compiled or DBMP_RUNTIME_UI environment variable is set.
+    """
+    if not os.environ.get("DBMP_RUNTIME_UI"):
+        try:
+            if not is_compiled():
+                build()
+            from ui_app import Ui_qdTest
+
+            return Ui_qdTest
+        except (OSError, ImportError):
+            # e.g. read-only installation
+            pass
+    from PyQt5 import uic
+
+    return uic.loadUiType(UI_FILE)[0]
+
 
 # we have to inherit the form from UI file, so we need to load it first.
-FORM_CLASS, _ = uic.loadUiType(
-    os.path.join(os.path.dirname(__file__), "app.ui")
-)
+FORM_CLASS = form_class()
 
 # back button name
 BACK_BUTTON_NAME = "pbBack"
+# how often the status of the running query is updated, ms
+STATUS_INTERVAL = 200
+# number of pages kept in memory by the virtual model
+WINDOW_PAGES = 5
+# longer cells are truncated for display if the user wishes
+DISPLAY_MAX_LENGTH = 1000
+# tabs are titled with the beginning of their query
+TITLE_LENGTH = 30
+# default age limit of cached results, seconds
+RESULT_TTL = 60
 
 
 class MainForm(QWidget, FORM_CLASS):
@@ -26,17 +61,30 @@ class MainForm(QWidget, FORM_CLASS):
         super().__init__(parent)
         self.setupUi(self)
         self.__add_custom_tableview()
+        self.__add_tab_bar()
         self.leRowsPerPage.setText("001000")
-        self.conn = None
-        self.model = None
-        self.db_provider = None
-
-        # paginator
-        self.paginator = None
-
-        # describe DB providers here
-        # order needs to be maintained to ensure that SQLite is the first one
-        self.providers = {"SQLite": "sqlite3", "PostgreSQL": "psycopg2"}
+        self.sbCacheTtl.setValue(RESULT_TTL)
+
+        # warm connections by provider and connection string, also lent
+        # for background work
+        self.pool = ConnectionPool()
+        # first pages of repeated selects, shared by the tabs
+        self.results = ResultCache(ttl=RESULT_TTL)
+        self.sbCacheTtl.valueChanged.connect(self.cache_ttl_changed)
+        # result tabs in the order of the tab bar, the shown one
+        self.tabs = []
+        self.tab = None
+        self.tabs_opened = 0
+        # status of the running query of the shown tab
+        self.status_timer = QtCore.QTimer(self)
+        self.status_timer.setInterval(STATUS_INTERVAL)
+        self.status_timer.timeout.connect(self.update_status)
+
+        # providers are described in providers.py, built-in ones go first,
+        # so SQLite is the first one
+        self.providers = {
+            provider.name: provider for provider in all_providers()
+        }
         # add items to the list
         self.cmbProvider.addItems(self.providers.keys())
 
@@ -44,14 +92,22 @@ class MainForm(QWidget, FORM_CLASS):
         self.pbCheck.clicked.connect(self.check_connection)
         self.pbExecute.clicked.connect(self.execute_query)
         self.pbClose.clicked.connect(self.close_all)
+        self.pbCancel.clicked.connect(self.cancel_query)
+        self.pbExport.clicked.connect(self.export_results)
+        self.pbImport.clicked.connect(self.import_file)
+        self.pbNewTab.clicked.connect(self.new_tab)
         self.leConnection.editingFinished.connect(self.reset_conn)
         self.cmbProvider.currentIndexChanged.connect(self.provider_changed)
         self.pbForth.clicked.connect(self.page)
         self.pbBack.clicked.connect(self.page)
+        self.leGotoPage.returnPressed.connect(self.goto_page)
+        self.tbResults.currentChanged.connect(self.switch_tab)
+        self.tbResults.tabCloseRequested.connect(self.close_tab)
 
         # signals and slots for CustomTableView
-        self.tbvResults.top_reached_signal.connect(self.pbBack.click)
-        self.tbvResults.bottom_reached_signal.connect(self.pbForth.click)
+        self.tbvResults.pages_moved_signal.connect(self.move_pages)
+
+        self.new_tab()
 
     def __add_custom_tableview(self) -> bool:
         """
@@ -68,15 +124,132 @@ class MainForm(QWidget, FORM_CLASS):
         self.verticalLayout_2.insertWidget(0, self.tbvResults)
         return True
 
+    def __add_tab_bar(self):
+        """Adds tab bar of result sets above the table."""
+        self.tbResults = QtWidgets.QTabBar(self.gpbResults)
+        self.tbResults.setObjectName("tbResults")
+        self.tbResults.setTabsClosable(True)
+        self.tbResults.setExpanding(False)
+        self.verticalLayout_2.insertWidget(0, self.tbResults)
+
+    def __connect_tab(self, tab: ResultTab):
+        """Connects results of the tab's worker, the tab comes first."""
+        worker = tab.worker
+        for signal, slot in (
+            (worker.page_ready_signal, self.show_page),
+            (worker.no_page_signal, self.no_page),
+            (worker.progress_signal, self.update_progress),
+            (worker.error_signal, self.query_failed),
+            (worker.count_signal, self.update_count),
+            (worker.window_page_signal, self.show_window_page),
+            (worker.window_dropped_signal, self.window_dropped),
+            (worker.export_progress_signal, self.update_export),
+            (worker.export_done_signal, self.export_done),
+            (worker.export_failed_signal, self.export_failed),
+            (worker.import_progress_signal, self.update_import),
+            (worker.import_done_signal, self.import_done),
+            (worker.import_failed_signal, self.import_failed),
+            (worker.script_done_signal, self.show_script_results),
+        ):
+            signal.connect(functools.partial(slot, tab))
+
+    @pyqtSlot()
+    def new_tab(self):
+        """Opens new result tab with its own worker and shows it."""
+        self.tabs_opened += 1
+        tab = ResultTab(
+            self,
+            self.pool,
+            f"Query {self.tabs_opened}",
+            result_cache=self.results,
+        )
+        self.__connect_tab(tab)
+        self.tabs.append(tab)
+        index = self.tbResults.addTab(tab.title)
+        self.tbResults.setCurrentIndex(index)
+        return True
+
+    @pyqtSlot(int)
+    def close_tab(self, index: int):
+        """Closes the tab, its query is cancelled."""
+        if len(self.tabs) == 1:
+            # there is always a tab to show results in
+            self.new_tab()
+        tab = self.tabs.pop(index)
+        if tab is self.tab:
+            # nothing to suspend, the next tab is shown
+            self.tab = None
+        self.tbResults.removeTab(index)
+        tab.shutdown()
+        tab.wait()
+        tab.deleteLater()
+        return True
+
+    @pyqtSlot(int)
+    def switch_tab(self, index: int):
+        """
+        Shows the tab, the model of the previous one is dropped and its
+        page is bookmarked. Hidden tab's page is read again.
+        """
+        if index < 0 or self.tabs[index] is self.tab:
+            return False
+        if self.tab:
+            self.__suspend(self.tab)
+        self.tab = tab = self.tabs[index]
+        self.tbvResults.setModel(tab.model)
+        self.__show_script(tab)
+        self.__show_busy(tab)
+        self.lblUpdateTime.setText(tab.update_time)
+        self.lblCurrentPage.setText("")
+        self.__show_page_number()
+        self.update_status()
+        if tab.connection:
+            self.__show_connection(*tab.connection)
+        if tab.paginator_active and tab.model is None and tab.bookmark:
+            self.__navigate_to(tab.bookmark)
+        return True
+
+    def __suspend(self, tab: ResultTab):
+        """Frees memory of the tab being hidden."""
+        bookmark = tab.current_page
+        if tab.virtual and isinstance(tab.model, VirtualTableModel):
+            # page of the top row
+            bookmark = max(self.tbvResults.rowAt(0), 0) // tab.rows_num + 1
+        tab.suspend(bookmark)
+        self.tbvResults.setModel(None)
+
+    def __show_connection(self, provider_name: str, db_conn_str: str):
+        """Shows connection of the tab without resetting it."""
+        for widget in (self.cmbProvider, self.leConnection):
+            widget.blockSignals(True)
+        self.cmbProvider.setCurrentText(provider_name)
+        self.leConnection.setText(db_conn_str)
+        for widget in (self.cmbProvider, self.leConnection):
+            widget.blockSignals(False)
+
     def close_all(self):
-        # finish up the connection
-        self.reset_conn()
+        """Closes the window, workers are stopped by closeEvent()."""
         self.close()
 
+    def closeEvent(self, *args, **kwargs):
+        """
+        Overriding of parent's (Qt) method, that's why camelCase used.
+        The window may be closed in any way, e.g. by the title bar, so
+        the workers stop their threads and connections are closed here.
+        """
+        # finish up the connections, the workers stop their threads
+        tabs, self.tabs = self.tabs, []
+        for tab in tabs:
+            tab.shutdown()
+        for tab in tabs:
+            tab.wait()
+        self.pool.close()
+        return QWidget.closeEvent(self, *args, **kwargs)
+
     def keyPressEvent(self, *args, **kwargs):
         """
         Overriding of parent's (Qt) method, that's why camelCase used.
-        Ctrl+Enter executes query.
+        Ctrl+Enter executes query, Ctrl+T opens new tab.
         """
         # check if Ctrl+Enter|Return pressed
         if (
@@ -85,6 +258,11 @@ class MainForm(QWidget, FORM_CLASS):
         ) and args[0].modifiers() == QtCore.Qt.ControlModifier:
             # execute query
             self.execute_query()
+        elif (
+            args[0].key() == QtCore.Qt.Key_T
+            and args[0].modifiers() == QtCore.Qt.ControlModifier
+        ):
+            self.new_tab()
         elif args[0].key() == QtCore.Qt.Key_Escape:
             self.pbClose.clicked.emit()
         else:
@@ -96,14 +274,12 @@ class MainForm(QWidget, FORM_CLASS):
         """Check button handler."""
 
         try:
-            self.conn = self.try_to_connect()
+            self.tab.conn = self.try_to_connect()
         except (
             ModuleNotFoundError,
             RuntimeError,
             ValueError,
-            self.db_provider.Error,
-            self.db_provider.Warning,
-        ) as err:
+        ) + self.tab.errors as err:
             self.message_box(
                 "Error!",
                 f"Connection can not be established due to: {str(err)}",
@@ -121,11 +297,13 @@ class MainForm(QWidget, FORM_CLASS):
 
     def __import_provider(self, provider_name: str):
         """Trying to import module for the provider and return it."""
-        return importlib.import_module(str(self.providers[provider_name]))
+        return importlib.import_module(
+            str(self.providers[provider_name].module)
+        )
 
-    def __is_sqlite_db(self) -> bool:
+    def __is_sqlite_db(self, db_provider) -> bool:
         """Checks if DB provider is SQLite"""
-        return self.db_provider.__name__ == "sqlite3"
+        return db_provider.__name__ == "sqlite3"
 
     def __is_db_in_memory(self, db_type: str = ":memory:") -> bool:
         """
@@ -157,16 +335,18 @@ class MainForm(QWidget, FORM_CLASS):
 
     def try_to_connect(self):
         """
-        Connects to the database with the connection string
-        provided by the user.
+        Connects the shown tab to the database with the connection
+        string provided by the user.
         """
-        if self.conn:
-            return self.conn
+        tab = self.tab
+        if tab.conn:
+            return tab.conn
 
-        # it's unknown what type of provider will user choose, so import here
-        self.db_provider = self.__import_provider(
-            self.cmbProvider.currentData(0)
-        )
+        # it's unknown what type of provider will user choose, so import here;
+        # every tab has its own provider
+        provider_name = self.cmbProvider.currentData(0)
+        tab.db_provider = self.__import_provider(provider_name)
+        tab.errors = (tab.db_provider.Error, tab.db_provider.Warning)
 
         db_conn_str = self.leConnection.text().strip()
         if not db_conn_str:
@@ -175,14 +355,45 @@ class MainForm(QWidget, FORM_CLASS):
         # since SQLite DB is a file we need to check if there is such file
         # or user wants to create new one
         if (
-            self.__is_sqlite_db()
+            self.__is_sqlite_db(tab.db_provider)
             and not self.__is_db_in_memory(db_conn_str)
             and not self.__is_file(db_conn_str)
         ):
             # Exception might be risen here
             self.__create_sqlite_file(db_conn_str)
 
-        return self.db_provider.connect(db_conn_str)
+        # recent connection to the DB is reused if there is one, every
+        # tab has its own connection
+        conn = self.pool.acquire(
+            *self.__pool_args(tab.db_provider, db_conn_str)
+        )
+        tab.connection = (provider_name, db_conn_str)
+        return conn
+
+    def __pool_args(self, db_provider, db_conn_str: str) -> tuple:
+        """Returns key of the pool and function which connects to the DB."""
+        key = (db_provider.__name__, db_conn_str)
+        if self.__is_sqlite_db(db_provider):
+            # connections are used by the worker threads
+            return key, functools.partial(
+                db_provider.connect, db_conn_str, check_same_thread=False
+            )
+        return key, functools.partial(db_provider.connect, db_conn_str)
+
+    def __connection_factory(self, tab: ResultTab):
+        """
+        Returns function which lends extra connections to the tab's DB
+        from the pool for background work or None if it's not possible.
+        """
+        _, db_conn_str = tab.connection
+        if self.__is_sqlite_db(tab.db_provider) and self.__is_db_in_memory(
+            db_conn_str
+        ):
+            # every connection gets its own in-memory DB
+            return None
+        return self.pool.factory(
+            *self.__pool_args(tab.db_provider, db_conn_str)
+        )
 
     def __is_query_exists(self) -> bool:
         """Checks if query text is present."""
@@ -193,29 +404,180 @@ class MainForm(QWidget, FORM_CLASS):
 
     @pyqtSlot()
     def execute_query(self):
-        """Handles 'Execute' button."""
+        """Handles 'Execute' button, the query runs in the shown tab."""
+        tab = self.tab
+        if tab.busy:
+            return False
         if not self.check_connection(False) or not self.__is_query_exists():
             return False
 
-        # let's try to create paginator object and execute query inside of it
-        try:
-            self.paginator = QueryPaginator(
-                rows_num=int(self.leRowsPerPage.displayText().strip()),
-                connection=self.conn,
-                query=self.teQuery.toPlainText().strip(),
+        # the worker closes the previous paginator, creates new one and
+        # executes query inside of it
+        self.__set_busy(tab, True)
+        tab.rows_fetched = 0
+        tab.total_pages = ""
+        tab.virtual = self.cbVirtual.isChecked()
+        tab.incremental = self.cbIncremental.isChecked() and not tab.virtual
+        tab.appending = False
+        tab.rows_num = int(self.leRowsPerPage.displayText().strip())
+        tab.query = self.teQuery.toPlainText().strip()
+        tab.total_rows = None
+        tab.paginator_active = True
+        tab.script_results = []
+        self.__show_script(tab)
+        index = self.tabs.index(tab)
+        self.tbResults.setTabText(
+            index, " ".join(tab.query.split())[:TITLE_LENGTH]
+        )
+        self.tbResults.setTabToolTip(index, tab.query)
+        tab.execute_requested.emit(
+            dict(
+                rows_num=tab.rows_num,
+                connection=tab.conn,
+                query=tab.query,
+                # flags of the selected provider, the module may be shared
+                # by several of them
+                provider=self.providers[tab.connection[0]],
+                snapshot=self.cbSnapshot.isChecked(),
+                prefetch=True,
+                connection_factory=self.__connection_factory(tab),
+                # 0 means no timeout
+                timeout=self.sbTimeout.value() or None,
+                count_rows=True,
+                result_cache=(
+                    self.results if self.cbCache.isChecked() else None
+                ),
+                script=self.cbScript.isChecked(),
+                transaction=self.cbTransaction.isChecked(),
+                generation=tab.worker.next_generation(),
+                display_max_length=(
+                    DISPLAY_MAX_LENGTH if self.cbTruncate.isChecked() else None
+                ),
             )
-        except (
-            ValueError,
-            self.db_provider.Error,
-            self.db_provider.Warning,
-        ) as err:
-            self.lblCurrentPage.setText("")
-            self.message_box("Error!", str(err), QMessageBox.Critical)
+        )
+        return True
+
+    @pyqtSlot()
+    def cancel_query(self):
+        """Handles 'Cancel' button, the query of the shown tab stops."""
+        if not self.tab.busy:
+            return False
+        # the worker's thread is busy, so the worker is called directly
+        self.tab.worker.cancel()
+        return True
+
+    @pyqtSlot()
+    def export_results(self):
+        """Handles 'Export' button, the whole result is written."""
+        tab = self.tab
+        if not tab.paginator_active or tab.busy:
+            return False
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export", "", "CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not path:
             return False
+        tab.transfer_status = "Exporting"
+        self.__set_busy(tab, True)
+        tab.export_requested.emit(
+            dict(
+                # the tab's connection keeps the paginator's cursor
+                connection_factory=self.__connection_factory(tab),
+                provider=self.providers[tab.connection[0]],
+                query=tab.query,
+                path=path,
+            )
+        )
+        return True
 
-        # model is created when forth or back button pressed
-        # in order to create model we must emit signal
-        self.pbForth.clicked.emit()
+    def update_export(self, tab: ResultTab, rows: int, rows_per_second: float):
+        """Worker reports progress of the export."""
+        tab.transfer_status = (
+            f"Exporting, rows written: {rows} ({rows_per_second:.0f} rows/s)"
+        )
+        self.update_status()
+
+    def export_done(self, tab: ResultTab, rows: int, path: str):
+        """Export is finished."""
+        tab.transfer_status = ""
+        self.__set_busy(tab, False)
+        self.update_status()
+        self.message_box(
+            "Success!",
+            f"{rows} rows exported to {path}",
+            QMessageBox.Information,
+        )
+
+    def export_failed(self, tab: ResultTab, message: str):
+        """Export failed or was cancelled, the table stays."""
+        tab.transfer_status = ""
+        self.__set_busy(tab, False)
+        self.update_status()
+        self.message_box("Error!", message, QMessageBox.Critical)
+
+    @pyqtSlot()
+    def import_file(self):
+        """Handles 'Import' button, CSV file is loaded into the table."""
+        tab = self.tab
+        if tab.busy or not self.check_connection(False):
+            return False
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Import", "", "CSV (*.csv);;All files (*)"
+        )
+        if not path:
+            return False
+        table, accepted = QtWidgets.QInputDialog.getText(
+            self,
+            "Import",
+            "Table, created if it doesn't exist:",
+            text=os.path.splitext(os.path.basename(path))[0],
+        )
+        if not accepted or not table.strip():
+            return False
+        tab.transfer_status = "Importing"
+        self.__set_busy(tab, True)
+        tab.import_requested.emit(
+            dict(
+                connection=tab.conn,
+                # SQLite file would be locked by the paginator's cursor,
+                # so only other DBs get own connection for the import
+                connection_factory=(
+                    None
+                    if self.__is_sqlite_db(tab.db_provider)
+                    else self.__connection_factory(tab)
+                ),
+                path=path,
+                table=table.strip(),
+            )
+        )
+        return True
+
+    def update_import(self, tab: ResultTab, rows: int, rows_per_second: float):
+        """Worker reports progress of the import."""
+        tab.transfer_status = (
+            f"Importing, rows inserted: {rows} ({rows_per_second:.0f} rows/s)"
+        )
+        self.update_status()
+
+    def import_done(self, tab: ResultTab, rows: int, table: str):
+        """Import is finished."""
+        seconds = tab.elapsed.elapsed() / 1000
+        tab.transfer_status = ""
+        self.__set_busy(tab, False)
+        self.update_status()
+        rate = f", {rows / seconds:.0f} rows/s" if seconds else ""
+        self.message_box(
+            "Success!",
+            f"{rows} rows imported into {table} in {seconds:.1f} s{rate}",
+            QMessageBox.Information,
+        )
+
+    def import_failed(self, tab: ResultTab, message: str):
+        """Import failed or was cancelled, committed rows stay."""
+        tab.transfer_status = ""
+        self.__set_busy(tab, False)
+        self.update_status()
+        self.message_box("Error!", message, QMessageBox.Critical)
 
     def __is_forward(self, sender) -> bool:
         """Checks if direction is forward"""
@@ -226,83 +588,309 @@ class MainForm(QWidget, FORM_CLASS):
     @pyqtSlot()
     def page(self):
         """Pages query results"""
-        if not self.paginator:
-            return
-        self.model = None
-        # if data is not fetched from paginator yet we must recreate model
-        # because we dont know beforehead if data will arrive.
-        # otherwise we can end up in situation when paginator is already
-        # fetched (might be partially), model is None and
-        # no new data will arrive in for loop (paginator.feeder)
-        # this potential situation leads to empty model in view
-        if not self.paginator.fetched:
-            self.model = TableModel(columns=self.paginator.headers())
-        # let's save current state of the cursor
-        savedCursor = self.cursor()
-        try:
-            # set the cursor to the wait cursor
-            self.setCursor(QtCore.Qt.WaitCursor)
-            # feed the model
-            for row in self.paginator.feeder(self.__is_forward(self.sender)):
-                # we must be ensured that model is changed when
-                # actual data arrives only
-                if not self.model:
-                    self.model = TableModel(columns=self.paginator.headers())
-                # data
-                self.model.input_data.append(row[0])
-                # row number
-                self.model.rows.append(row[1])
-            # return the cursor to the previous state
-            self.setCursor(savedCursor)
-        except (self.db_provider.Error, self.db_provider.Warning) as err:
-            # return the cursor to the previous state
-            self.setCursor(savedCursor)
-            # unset current page
-            self.lblCurrentPage.setText("")
-            self.message_box("Error!", str(err), QMessageBox.Critical)
-            # clean the model
-            self.tbvResults.setModel(None)
+        return self.move_pages(1 if self.__is_forward(self.sender) else -1)
+
+    @pyqtSlot(int)
+    def move_pages(self, pages: int):
+        """Moves by the number of pages, e.g. collected by the view"""
+        tab = self.tab
+        if not tab.paginator_active:
+            return False
+        if tab.virtual:
+            # the whole result is scrolled
+            return False
+        if tab.incremental:
+            # the next page is appended, there is nothing to go back to
+            if pages > 0 and tab.model:
+                tab.model.fetchMore(QtCore.QModelIndex())
+            return False
+        base = tab.target_page or tab.current_page
+        if base + pages < 1 and base <= 1:
+            # there is nothing before the first page
             return False
+        return self.__navigate_to(base + pages)
 
-        if not self.model:
+    def __navigate_to(self, page: int) -> bool:
+        """Requests the page, navigation request in flight is superseded"""
+        tab = self.tab
+        if tab.busy and tab.target_page is None:
+            # the query is being executed
             return False
+        if not tab.busy:
+            self.__set_busy(tab, True)
+        tab.target_page = max(page, 1)
+        tab.goto_requested.emit(tab.target_page, tab.worker.next_generation())
+        return True
+
+    @pyqtSlot()
+    def fetch_more(self):
+        """Incremental model of the shown tab asks for the next page"""
+        tab = self.tab
+        if not tab.paginator_active or tab.busy:
+            # the view asks again while scrolling
+            tab.model.loading = False
+            return False
+        tab.appending = True
+        self.__set_busy(tab, True)
+        tab.page_requested.emit(True, tab.worker.next_generation())
+        return True
+
+    @pyqtSlot()
+    def goto_page(self):
+        """Jumps to the page entered by the user"""
+        tab = self.tab
+        page_text = self.leGotoPage.text().strip()
+        if not tab.paginator_active:
+            return False
+        if not page_text or int(page_text) < 1:
+            return False
+        self.leGotoPage.clear()
+        if tab.virtual and isinstance(tab.model, VirtualTableModel):
+            # rows of the page are requested by the model when shown
+            row = (int(page_text) - 1) * tab.rows_num
+            if row >= tab.model.rowCount(None):
+                return False
+            index = tab.model.index(row, 0)
+            self.tbvResults.scrollTo(index, self.tbvResults.PositionAtTop)
+            self.tbvResults.selectRow(row)
+            return True
+        return self.__navigate_to(int(page_text))
+
+    def __set_busy(self, tab: ResultTab, busy: bool):
+        """Shows that the query of the tab is running or finished."""
+        tab.busy = busy
+        if busy:
+            tab.elapsed.start()
+        if tab is self.tab:
+            self.__show_busy(tab)
+
+    def __show_busy(self, tab: ResultTab):
+        """Shows whether the query of the shown tab is running."""
+        self.pbCancel.setEnabled(tab.busy)
+        if tab.busy:
+            self.status_timer.start()
+            self.update_status()
+            self.setCursor(QtCore.Qt.BusyCursor)
+        else:
+            self.status_timer.stop()
+            self.unsetCursor()
+
+    @pyqtSlot()
+    def update_status(self):
+        """Shows elapsed time and number of fetched rows of the tab."""
+        tab = self.tab
+        seconds = tab.elapsed.elapsed() / 1000 if tab.busy else 0
+        status = f"Rows fetched: {tab.rows_fetched}"
+        if tab.busy:
+            status = f"Running {seconds:.1f} s, {status.lower()}"
+        if tab.transfer_status:
+            status = f"{tab.transfer_status}, {seconds:.1f} s"
+        self.lblStatus.setText(status)
+
+    def update_progress(self, tab: ResultTab, rows_fetched: int):
+        """Worker reports number of fetched rows."""
+        tab.rows_fetched = rows_fetched
+        self.update_status()
+
+    def update_count(
+        self, tab: ResultTab, total_rows: int, total_pages: int, exact: bool
+    ):
+        """Worker reports number of rows and pages."""
+        if not tab.paginator_active:
+            return False
+        tab.total_rows = total_rows
+        if isinstance(tab.model, VirtualTableModel):
+            tab.model.set_total_rows(total_rows)
+        tab.total_pages = f"{total_pages}" if exact else f"~{total_pages}"
+        if tab is self.tab:
+            self.__show_page_number()
+        return True
+
+    def show_page(self, tab: ResultTab, result):
+        """Feeds the model with the page fetched by the worker"""
+        if result.generation != tab.worker.generation:
+            # superseded by newer request
+            return False
+        tab.target_page = None
+        self.__set_busy(tab, False)
+        self.update_status()
+        if not tab.paginator_active:
+            # connection was reset while the page was being fetched
+            return False
+        if tab is not self.tab:
+            # the tab was hidden meanwhile, the page is read when shown
+            self.__update_time_and_page(tab, result.page.number)
+            tab.suspend(result.page.number)
+            return False
+        if tab.appending:
+            tab.appending = False
+            tab.model.append_page(result.page, result.display)
+            self.__update_time_and_page(tab, result.page.number)
+            return True
+        if tab.virtual:
+            tab.model = VirtualTableModel(
+                columns=result.headers,
+                page=result.page,
+                rows_num=tab.rows_num,
+                total_rows=tab.total_rows,
+                window_pages=WINDOW_PAGES,
+                display=result.display,
+            )
+            tab.model.page_needed_signal.connect(tab.request_window)
+        else:
+            # rows of the page are taken as is
+            tab.model = TableModel(
+                columns=result.headers,
+                page=result.page,
+                incremental=tab.incremental,
+                display=result.display,
+            )
+            tab.model.fetch_more_signal.connect(self.fetch_more)
 
         # clean the model
         self.__update_model_in_view()
         # update last query result time and page number
-        self.__update_time_and_page()
-
-        if self.__is_forward(self.sender):
+        self.__update_time_and_page(tab, result.page.number)
+
+        if tab.virtual:
+            # the page might be the bookmark of the tab
+            row = (result.page.number - 1) * tab.rows_num
+            index = tab.model.index(row, 0)
+            self.tbvResults.scrollTo(index, self.tbvResults.PositionAtTop)
+            self.tbvResults.selectRow(row)
+        elif result.forward:
             self.tbvResults.selectRow(0)
         else:
-            self.tbvResults.selectRow(self.model.rowCount(None) - 1)
+            self.tbvResults.selectRow(tab.model.rowCount(None) - 1)
         return True
 
+    def show_window_page(self, tab: ResultTab, result):
+        """Feeds the virtual model with the page fetched by the worker"""
+        if not tab.paginator_active:
+            return False
+        if not isinstance(tab.model, VirtualTableModel):
+            # other query is shown already or the tab is hidden
+            return False
+        tab.model.put_page(result.page, result.display)
+        if result.page.rows:
+            self.__update_time_and_page(tab, result.page.number)
+        return True
+
+    def window_dropped(self, tab: ResultTab, page: int):
+        """The page wasn't read, the view has scrolled away from it."""
+        if isinstance(tab.model, VirtualTableModel):
+            tab.model.forget_request(page)
+
+    def show_script_results(self, tab: ResultTab, results: list, paged: bool):
+        """
+        Shows rowcount and time of every statement of the script.
+        The last select is paged afterwards if paged is set.
+        """
+        tab.script_results = results
+        self.__show_script(tab)
+        if paged:
+            return True
+        # there is no select to page
+        tab.paginator_active = False
+        tab.current_page = 0
+        tab.model = None
+        if tab is self.tab:
+            self.lblCurrentPage.setText("")
+            self.tbvResults.setModel(None)
+        self.__set_busy(tab, False)
+        self.update_status()
+        return True
+
+    def __show_script(self, tab: ResultTab):
+        """Fills the grid with the script results of the shown tab."""
+        if tab is not self.tab:
+            return
+        self.twScript.setRowCount(len(tab.script_results))
+        for row, result in enumerate(tab.script_results):
+            cells = (
+                str(result.number),
+                str(result.rowcount) if result.rowcount >= 0 else "",
+                f"{result.seconds:.3f}",
+                " ".join(result.statement.split()),
+            )
+            for column, text in enumerate(cells):
+                self.twScript.setItem(
+                    row, column, QtWidgets.QTableWidgetItem(text)
+                )
+        self.twScript.resizeColumnsToContents()
+        self.twScript.setVisible(bool(tab.script_results))
+
+    def no_page(self, tab: ResultTab, generation: int):
+        """There is no such page, current one stays"""
+        if generation != tab.worker.generation:
+            # superseded by newer request
+            return False
+        tab.target_page = None
+        self.__set_busy(tab, False)
+        self.update_status()
+        if tab.appending:
+            tab.appending = False
+            tab.model.append_page(None)
+
+    def query_failed(self, tab: ResultTab, message: str):
+        """Shows DB error reported by the worker"""
+        self.__set_busy(tab, False)
+        tab.target_page = None
+        tab.appending = False
+        self.update_status()
+        # unset current page and clean the model
+        tab.current_page = 0
+        tab.model = None
+        if tab is self.tab:
+            self.lblCurrentPage.setText("")
+            self.tbvResults.setModel(None)
+        else:
+            message = f"{self.__tab_title(tab)}: {message}"
+        self.message_box("Error!", message, QMessageBox.Critical)
+
+    def __tab_title(self, tab: ResultTab) -> str:
+        """Returns text of the tab."""
+        return self.tbResults.tabText(self.tabs.index(tab))
+
     def __update_model_in_view(self):
         """Updates model in view."""
         self.tbvResults.setModel(None)
-        self.tbvResults.setModel(self.model)
+        self.tbvResults.setModel(self.tab.model)
         self.tbvResults.selectRow(0)
 
-    def __update_time_and_page(self):
+    def __update_time_and_page(self, tab: ResultTab, page: int):
         """Updates execution time and page number"""
-        self.lblUpdateTime.setText(
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        )
-        self.lblCurrentPage.setText(str(self.paginator.current_page))
+        tab.update_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        tab.current_page = page
+        if tab is self.tab:
+            self.lblUpdateTime.setText(tab.update_time)
+            self.__show_page_number()
+
+    def __show_page_number(self):
+        """Shows current page and number of pages if it's known."""
+        tab = self.tab
+        if not tab.current_page:
+            return
+        page = str(tab.current_page)
+        if tab.total_pages:
+            page = f"{page} of {tab.total_pages}"
+        self.lblCurrentPage.setText(page)
 
     @pyqtSlot()
     def reset_conn(self):
-        """Resets connection"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Resets connection of the shown tab"""
+        self.tab.reset_conn()
 
     @pyqtSlot(int)
     def provider_changed(self, index):
         """Handles provider change in the providers list box. Resets conn."""
         self.reset_conn()
 
+    @pyqtSlot(int)
+    def cache_ttl_changed(self, seconds: int):
+        """Sets age limit of cached results, 0 means no limit."""
+        self.results.ttl = cache_ttl(seconds)
+
     def message_box(self, text, informative, icon, buttons=QMessageBox.Ok):
         """Wraps up the QMessageBox"""
         msg = QMessageBox(self)
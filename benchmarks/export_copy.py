@@ -0,0 +1,58 @@
+"""
+Compares export of a PostgreSQL query to CSV with fetches (DB-API) and
+with COPY TO STDOUT. Requires psycopg2 and a database to connect to:
+python benchmarks/export_copy.py "dbname=test user=postgres" [rows]
+The DSN can also be set in DBMP_PG_DSN environment variable.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import psycopg2  # noqa: E402
+
+from export import export_query  # noqa: E402
+
+ROWS = 1000000
+QUERY = (
+    "select num, md5(num::text) as hash, num * 0.5 as half, "
+    "now() - num * interval '1 second' as moment "
+    "from generate_series(1, {rows}) as num"
+)
+
+
+def measure(dsn: str, query: str, path: str, use_copy: bool):
+    """Returns number of rows, seconds and size of the file."""
+    conn = psycopg2.connect(dsn)
+    try:
+        started = time.perf_counter()
+        rows = export_query(conn, query, path, use_copy=use_copy)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+    return rows, elapsed, os.path.getsize(path)
+
+
+def main():
+    dsn = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("DBMP_PG_DSN")
+    if not dsn:
+        sys.exit(__doc__)
+    rows_num = int(sys.argv[2]) if len(sys.argv) > 2 else ROWS
+    query = QUERY.format(rows=rows_num)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.csv")
+        for name, use_copy in (("fetch", False), ("COPY", True)):
+            rows, elapsed, size = measure(dsn, query, path, use_copy)
+            rate = rows / elapsed
+            speed = size / elapsed / 1e6
+            print(
+                f"{name:6} {rows} rows {elapsed:8.2f} s "
+                f"{rate:12.0f} rows/s {speed:8.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures memory per row of the NW_SELECT page stored as a list of row
+tuples and as columnar page, both for raw values and display strings.
+Run from the repository root: python benchmarks/memory_per_row.py
+"""
+
+import gc
+import os
+import sqlite3
+import sys
+
+sys.path[:0] = [
+    os.path.join(os.path.dirname(__file__), os.pardir),
+    os.path.join(os.path.dirname(__file__), os.pardir, "tests"),
+]
+
+from columnar import ColumnarPage  # noqa: E402
+from formatters import RowFormatter  # noqa: E402
+from paginator import QueryPaginator  # noqa: E402
+from settings import NW_SELECT, NW_SQLITE  # noqa: E402
+
+
+def deep_size(obj) -> int:
+    """Returns size of the object and all objects it refers to."""
+    seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        pending.extend(gc.get_referents(item))
+    return size
+
+
+def main():
+    conn = sqlite3.connect(NW_SQLITE)
+    paginator = QueryPaginator(rows_num=1000, query=NW_SELECT, connection=conn)
+    page = paginator.fetch_page()
+    display = RowFormatter(paginator.description, sqlite3).format_rows(
+        page.rows
+    )
+    first = page.numbers.start
+    storages = (
+        ("rows, list of tuples", page.rows),
+        ("row numbers, list of ints", list(page.numbers)),
+        ("rows, columnar", ColumnarPage(page.rows, first)),
+        ("display, list of tuples", display),
+        ("display, columnar", ColumnarPage(display, first)),
+    )
+    print(f"{len(page.rows)} rows of {NW_SELECT}")
+    for name, storage in storages:
+        print(f"{name:28} {deep_size(storage) / len(page.rows):8.1f} B/row")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
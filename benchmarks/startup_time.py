@@ -0,0 +1,64 @@
+"""
+Measures time from the start of the process till the main window is
+shown, with the form class generated from app.ui at runtime (before)
+and imported from compiled ui_app.py (after).
+Requires PyQt5, use QT_QPA_PLATFORM=offscreen on headless hosts.
+Run from the repository root: python benchmarks/startup_time.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+RUNS = 10
+# the child measures itself, interpreter startup is excluded
+CHILD = """
+import time
+started = time.perf_counter()
+from PyQt5 import QtWidgets
+import app
+application = QtWidgets.QApplication([])
+form = app.MainForm()
+form.show()
+application.processEvents()
+print(time.perf_counter() - started)
+form.close_all()
+"""
+
+
+def time_to_window(runtime_ui: bool) -> float:
+    """Returns seconds till the window is shown in a new process."""
+    env = dict(os.environ)
+    env.pop("DBMP_RUNTIME_UI", None)
+    if runtime_ui:
+        env["DBMP_RUNTIME_UI"] = "1"
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout
+    return float(output.split()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    sys.path.insert(0, ROOT)
+    from build_ui import build
+
+    build()
+    for name, runtime_ui in (("runtime app.ui", True), ("ui_app.py", False)):
+        times = [time_to_window(runtime_ui) for _ in range(runs)]
+        print(
+            f"{name:15} median {statistics.median(times) * 1000:7.1f} ms, "
+            f"min {min(times) * 1000:7.1f} ms of {runs} runs"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+"""
+Compiles app.ui into ui_app.py, so the form class is imported at start
+instead of being generated from the XML on every launch.
+app.py runs the build itself when app.ui is newer than ui_app.py.
+Run from the repository root: python build_ui.py
+"""
+
+import os
+
+UI_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.ui")
+COMPILED_FILE = os.path.join(os.path.dirname(UI_FILE), "ui_app.py")
+
+
+def is_compiled() -> bool:
+    """Checks if ui_app.py exists and isn't older than app.ui."""
+    try:
+        return os.path.getmtime(COMPILED_FILE) >= os.path.getmtime(UI_FILE)
+    except OSError:
+        return False
+
+
+def build():
+    """Writes ui_app.py, the file is replaced at once when it's ready."""
+    from PyQt5 import uic
+
+    partial = f"{COMPILED_FILE}.tmp"
+    try:
+        with open(UI_FILE, encoding="utf-8") as ui, open(
+            partial, "w", encoding="utf-8"
+        ) as compiled:
+            uic.compileUi(ui, compiled)
+        os.replace(partial, COMPILED_FILE)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+if __name__ == "__main__":
+    build()
+    print(f"{UI_FILE} is compiled into {COMPILED_FILE}")
@@ -0,0 +1,153 @@
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+# bounds of 64-bit signed integers stored in arrays
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+# values of the column: array, list or indices into the string table,
+# the table of distinct strings or None, mask of NULLs or None
+Column = namedtuple("Column", "data table nulls")
+
+
+def _nulls(values: list):
+    """Returns mask of NULL values or None if there are no NULLs."""
+    if any(value is None for value in values):
+        return bytearray(value is None for value in values)
+    return None
+
+
+def _string_column(values: list):
+    """
+    Returns column of strings with the table of distinct ones,
+    or None if there are too few repetitions to bother.
+    """
+    table = {}
+    for value in values:
+        if value is not None:
+            table.setdefault(value, len(table))
+    if len(table) * 2 > len(values):
+        return None
+    indices = array("H" if len(table) <= 0xFFFF else "I")
+    indices.extend(0 if value is None else table[value] for value in values)
+    return Column(indices, list(table), _nulls(values))
+
+
+def encode_column(values: list) -> Column:
+    """
+    Stores values of the column compactly: integers and floats in
+    arrays, repeated strings as indices into the table of distinct ones.
+    Other columns are kept in a list.
+    """
+    kinds = {type(value) for value in values if value is not None}
+    if kinds == {int} and all(
+        INT64_MIN <= value <= INT64_MAX
+        for value in values
+        if value is not None
+    ):
+        data = array("q", (value or 0 for value in values))
+        return Column(data, None, _nulls(values))
+    if kinds == {float}:
+        data = array("d", (value or 0.0 for value in values))
+        return Column(data, None, _nulls(values))
+    if kinds == {str}:
+        column = _string_column(values)
+        if column:
+            return column
+    return Column(list(values), None, None)
+
+
+class ColumnarPage:
+    """
+    Rows of the page stored column by column. Row numbers are computed
+    from the number of the first row, rows are read with value() or as
+    tuples by index, like a list of rows.
+    """
+
+    def __init__(self, rows, first_number: int = 1):
+        self.first_number = first_number
+        self.__length = len(rows)
+        self.__columns = [encode_column(list(values)) for values in zip(*rows)]
+
+    @property
+    def column_count(self) -> int:
+        """Returns number of columns"""
+        return len(self.__columns)
+
+    @property
+    def numbers(self) -> range:
+        """Returns numbers of the rows"""
+        return range(self.first_number, self.first_number + self.__length)
+
+    def value(self, row: int, column: int):
+        """Returns value of the cell."""
+        data, table, nulls = self.__columns[column]
+        if nulls is not None and nulls[row]:
+            return None
+        if table is not None:
+            return table[data[row]]
+        return data[row]
+
+    def __len__(self):
+        return self.__length
+
+    def __getitem__(self, row: int) -> tuple:
+        if row < 0:
+            row += self.__length
+        if not 0 <= row < self.__length:
+            raise IndexError("row index out of range")
+        return tuple(
+            self.value(row, column) for column in range(self.column_count)
+        )
+
+    def __iter__(self):
+        for row in range(self.__length):
+            yield self[row]
+
+
+class PageChain:
+    """Consecutive columnar pages read as one sequence of rows."""
+
+    def __init__(self):
+        self.pages = []
+        # index of the first row of every page
+        self.__starts = []
+        self.__length = 0
+
+    @property
+    def numbers(self) -> range:
+        """Returns numbers of the rows"""
+        if not self.pages:
+            return range(0)
+        first = self.pages[0].first_number
+        return range(first, first + self.__length)
+
+    def append(self, page: ColumnarPage):
+        """Appends the page, empty pages are skipped."""
+        if not len(page):
+            return
+        self.pages.append(page)
+        self.__starts.append(self.__length)
+        self.__length += len(page)
+
+    def value(self, row: int, column: int):
+        """Returns value of the cell."""
+        num = bisect_right(self.__starts, row) - 1
+        return self.pages[num].value(row - self.__starts[num], column)
+
+    def __len__(self):
+        return self.__length
+
+    def __getitem__(self, row: int) -> tuple:
+        if not 0 <= row < self.__length:
+            raise IndexError("row index out of range")
+        num = bisect_right(self.__starts, row) - 1
+        return self.pages[num][row - self.__starts[num]]
+
+
+def cell(rows, row: int, column: int):
+    """Returns value of the cell of columnar storage or list of rows."""
+    if isinstance(rows, (ColumnarPage, PageChain)):
+        return rows.value(row, column)
+    return rows[row][column]
@@ -0,0 +1,57 @@
+import json
+import sqlite3
+
+from dbapi import driver_errors
+from keyset import single_table, strip_query
+
+# alias of the user's query wrapped into the count query
+SUBQUERY_ALIAS = "dbmp_count"
+
+
+def count_query(query: str) -> str:
+    """Returns query which counts rows of the query."""
+    return f"SELECT COUNT(*) FROM ({strip_query(query)}) AS {SUBQUERY_ALIAS}"
+
+
+def estimate_rows(connection, query: str):
+    """
+    Returns estimated number of rows of the query or None.
+    PostgreSQL's planner estimate is taken from EXPLAIN, SQLite's one
+    is taken from sqlite_stat1 (filled by ANALYZE) for single table
+    queries only. The failed EXPLAIN is rolled back, so it must be
+    called before anything else is done within the transaction.
+    """
+    if isinstance(connection, sqlite3.Connection):
+        return _sqlite_estimate(connection, query)
+    curs = connection.cursor()
+    try:
+        curs.execute(f"EXPLAIN (FORMAT JSON) {strip_query(query)}")
+        plan = curs.fetchone()[0]
+    except driver_errors(connection):
+        # not PostgreSQL after all
+        connection.rollback()
+        return None
+    finally:
+        curs.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _sqlite_estimate(connection, query: str):
+    """Returns number of rows of the table from sqlite_stat1 or None."""
+    table = single_table(query)
+    if not table:
+        return None
+    try:
+        row = connection.execute(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = ? COLLATE NOCASE "
+            "LIMIT 1",
+            (table,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # ANALYZE never run
+        return None
+    if not row or not row[0]:
+        return None
+    return int(row[0].split()[0])
@@ -1,6 +1,9 @@
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtWidgets import QTableView
 
+# navigation events are collected for this time, ms
+NAVIGATION_DELAY = 100
+
 
 class CustomTableView(QTableView):
     """
@@ -9,15 +12,26 @@ class CustomTableView(QTableView):
     Signals are emitted when the top or the bottom of the table is reached by
     either of: navigation keys, PgUp/PgDown, mouse wheel.
     New signals help in situation when pagination is required.
+    Held keys and fast wheel emit a lot of events, so the reached
+    top/bottom events are also coalesced for NAVIGATION_DELAY and sent
+    as one pages_moved_signal with the number of pages to move by.
     Names of the overriden methods left intact with Qt naming scheme.
     """
 
     # signals for situation where up or down reached
     top_reached_signal = pyqtSignal()
     bottom_reached_signal = pyqtSignal()
+    # number of pages to move by, negative one means backward
+    pages_moved_signal = pyqtSignal(int)
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        # pages to move by which are not sent yet
+        self.pending_pages = 0
+        self.navigation_timer = QTimer(self)
+        self.navigation_timer.setSingleShot(True)
+        self.navigation_timer.setInterval(NAVIGATION_DELAY)
+        self.navigation_timer.timeout.connect(self.send_navigation)
 
     def wheelEvent(self, *args, **kwargs):
         """
@@ -67,8 +81,23 @@ class CustomTableView(QTableView):
         """Emits signal when the first row reached"""
         event.ignore()
         self.top_reached_signal.emit()
+        self.navigate(-1)
 
     def bottom_row_reached(self, event):
         """Emits signal when the last row reached"""
         event.ignore()
         self.bottom_reached_signal.emit()
+        self.navigate(1)
+
+    def navigate(self, pages: int):
+        """Adds pages to move by, they are sent after a while."""
+        self.pending_pages += pages
+        if not self.navigation_timer.isActive():
+            # the timer isn't restarted, so held keys still move
+            self.navigation_timer.start()
+
+    def send_navigation(self):
+        """Sends collected pages to move by."""
+        pages, self.pending_pages = self.pending_pages, 0
+        if pages:
+            self.pages_moved_signal.emit(pages)
@@ -0,0 +1,75 @@
+import re
+import sys
+
+# queries which may be declared as a server-side cursor
+SELECT_RE = re.compile(r"^[\s(]*(select|values|table|with)\b", re.I)
+# data modifying statements, they may follow WITH
+MODIFY_RE = re.compile(r"\b(insert|update|delete|merge)\b", re.I)
+
+
+def driver_module(connection):
+    """
+    Returns DB-API module the connection belongs to or None.
+    Wrapped connections, e.g. of the pool, are looked through.
+    """
+    connection = getattr(connection, "__wrapped__", connection)
+    return sys.modules.get(type(connection).__module__.split(".")[0])
+
+
+def driver_errors(connection) -> tuple:
+    """Returns Error and Warning of the connection's DB-API module."""
+    module = driver_module(connection)
+    return tuple(
+        getattr(module, name)
+        for name in ("Error", "Warning")
+        if hasattr(module, name)
+    )
+
+
+def paramstyle(connection) -> str:
+    """Returns paramstyle of the DB-API module the connection belongs to."""
+    return getattr(driver_module(connection), "paramstyle", "qmark")
+
+
+def threadsafety(connection) -> int:
+    """
+    Returns threadsafety level of the connection's DB-API module.
+    SQLite connections can't be used by other threads by default
+    (check_same_thread), so they are not shared.
+    """
+    module = driver_module(connection)
+    level = getattr(module, "threadsafety", 0)
+    if getattr(module, "__name__", "") == "sqlite3":
+        return min(level, 1)
+    return level
+
+
+def cancel_connection(connection, method: str = None) -> bool:
+    """
+    Aborts the statement running on the connection, safe to call from
+    any thread. Uses the method if it's given, e.g. by the provider,
+    interrupt() of sqlite3 or cancel() of psycopg2 otherwise.
+    Returns False if the driver can't cancel.
+    """
+    if method is None:
+        names = ("interrupt", "cancel")
+    else:
+        # empty method means the provider can't cancel
+        names = (method,) if method else ()
+    for name in names:
+        cancel = getattr(connection, name, None)
+        if callable(cancel):
+            cancel()
+            return True
+    return False
+
+
+def is_select(query: str) -> bool:
+    """Checks if the query only reads data."""
+    match = SELECT_RE.match(query)
+    if not match:
+        return False
+    if match.group(1).lower() == "with":
+        # WITH might be followed by INSERT, UPDATE or DELETE
+        return not MODIFY_RE.search(query)
+    return True
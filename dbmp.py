@@ -0,0 +1,306 @@
+#!/usr/bin/python3
+"""
+Console front end, pages the result of the query in the terminal or
+streams it to stdout. Qt is never imported, so it runs on headless hosts.
+
+    python -m dbmp sqlite tests/nw.sqlite "select * from orders"
+    python -m dbmp postgresql "dbname=test" "select 1" --batch
+"""
+
+import argparse
+import csv
+import functools
+import importlib
+import os
+import shutil
+import sys
+import time
+
+from dbapi import driver_errors, driver_module
+from export import csv_value
+from formatters import RowFormatter
+from paginator import QueryCancelledError, QueryPaginator
+from providers import all_providers
+
+# longer cells are truncated in the terminal
+CLI_MAX_LENGTH = 40
+# rows per page of the batch mode
+BATCH_ROWS = 1000
+# lines of the terminal taken by the header and the status
+SCREEN_LINES = 4
+# output formats of the batch mode
+TABLE = "table"
+CSV = "csv"
+# keys moving by pages, as in the GUI: PgDown, PgUp, arrows
+KEY_MOVES = {
+    "\x1b[6~": 1,
+    "\x1b[B": 1,
+    "\x1b[C": 1,
+    " ": 1,
+    "n": 1,
+    "\x1b[5~": -1,
+    "\x1b[A": -1,
+    "\x1b[D": -1,
+    "p": -1,
+    "b": -1,
+}
+HOME_KEYS = ("\x1b[H", "\x1b[1~", "\x1bOH")
+END_KEYS = ("\x1b[F", "\x1b[4~", "\x1bOF")
+GOTO_KEYS = ("g",)
+# Esc, q or Ctrl+C
+QUIT_KEYS = ("\x1b", "q", "\x03")
+HELP = "PgDn/PgUp, arrows: page  Home/End: first/last  g: go to  q: quit"
+
+
+def provider_modules() -> dict:
+    """Returns DB-API modules of the providers by lowercase names."""
+    return {
+        provider.name.lower(): provider.module for provider in all_providers()
+    }
+
+
+def parse_args(argv=None):
+    """Returns parsed command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="dbmp", description="Pages the result of the query."
+    )
+    parser.add_argument("provider", choices=sorted(provider_modules()))
+    parser.add_argument(
+        "connection", help="SQLite file or PostgreSQL connection string"
+    )
+    parser.add_argument("query", help="query, - reads it from stdin")
+    parser.add_argument("-r", "--rows", type=int, help="rows per page")
+    parser.add_argument(
+        "-p", "--page", type=int, default=1, help="page to start from"
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        action="store_true",
+        help="stream pages to stdout, the default if it's not a terminal",
+    )
+    parser.add_argument("-f", "--format", choices=(TABLE, CSV), default=TABLE)
+    parser.add_argument(
+        "-t", "--timeout", type=float, help="statement timeout, seconds"
+    )
+    parser.add_argument(
+        "-w",
+        "--max-width",
+        type=int,
+        default=CLI_MAX_LENGTH,
+        help="longer cells are truncated in the table, 0 keeps them",
+    )
+    return parser.parse_args(argv)
+
+
+def connect(provider: str, connection: str):
+    """
+    Connects to the DB, the driver is imported only now.
+    Returns the connection and the factory of extra connections or None.
+    """
+    module = importlib.import_module(provider_modules()[provider])
+    if module.__name__ == "sqlite3":
+        if connection == ":memory:":
+            # every connection gets its own in-memory DB
+            return module.connect(connection), None
+        if not os.path.isfile(connection):
+            raise ValueError(f"no such file: {connection}")
+    return (
+        module.connect(connection),
+        functools.partial(module.connect, connection),
+    )
+
+
+def format_table(headers: list, display: list, numbers) -> list:
+    """Returns lines of the text table with row numbers."""
+    columns = ["#"] + list(headers)
+    cells = [
+        (str(number),) + tuple(row) for row, number in zip(display, numbers)
+    ]
+    widths = [len(str(column)) for column in columns]
+    for row in cells:
+        for num, text in enumerate(row):
+            widths[num] = max(widths[num], len(text))
+    lines = [
+        " | ".join(
+            str(column).ljust(width) for column, width in zip(columns, widths)
+        ).rstrip(),
+        "-+-".join("-" * width for width in widths),
+    ]
+    for row in cells:
+        number, values = row[0], row[1:]
+        lines.append(
+            " | ".join(
+                [number.rjust(widths[0])]
+                + [
+                    text.ljust(width)
+                    for text, width in zip(values, widths[1:])
+                ]
+            ).rstrip()
+        )
+    return lines
+
+
+def page_status(paginator, page) -> str:
+    """Returns page number, rows of the page and number of pages."""
+    status = f"Page {page.number}"
+    if paginator.total_pages is not None:
+        exact = "" if paginator.total_exact else "~"
+        status += f" of {exact}{paginator.total_pages}"
+    if page.numbers:
+        status += f", rows {page.numbers.start}-{page.numbers.stop - 1}"
+    return status
+
+
+def stream_pages(paginator, formatter, out, fmt: str = TABLE, first=1):
+    """Writes pages from the first one to the end, returns rows written."""
+    page = paginator.fetch_page_at(first)
+    rows = 0
+    if fmt == CSV:
+        writer = csv.writer(out)
+        writer.writerow(paginator.headers())
+    while page:
+        if fmt == CSV:
+            writer.writerows(
+                [csv_value(value) for value in row] for row in page.rows
+            )
+        else:
+            display = formatter.format_rows(page.rows)
+            lines = format_table(paginator.headers(), display, page.numbers)
+            out.write("\n".join(lines) + "\n")
+            out.write(f"({page_status(paginator, page)})\n\n")
+        rows += len(page.rows)
+        page = paginator.fetch_page(True)
+    return rows
+
+
+def read_key(fd: int) -> str:
+    """Reads the key, escape sequences of special keys are read whole."""
+    import select
+
+    key = os.read(fd, 1).decode(errors="replace")
+    if key == "\x1b":
+        while select.select([fd], [], [], 0.05)[0]:
+            key += os.read(fd, 1).decode(errors="replace")
+            if key[-1].isalpha() or key[-1] == "~":
+                break
+    return key
+
+
+def interactive(paginator, formatter, out, first: int = 1) -> int:
+    """Pages the result in the terminal until the user quits."""
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    settings = termios.tcgetattr(fd)
+    page = paginator.fetch_page_at(first, clamp=True)
+    message = ""
+    try:
+        while True:
+            show_page(paginator, formatter, out, page, message)
+            message = ""
+            tty.setraw(fd)
+            try:
+                key = read_key(fd)
+            finally:
+                termios.tcsetattr(fd, termios.TCSADRAIN, settings)
+            target = None
+            if key in QUIT_KEYS:
+                return 0
+            if key in KEY_MOVES:
+                target = (page.number if page else 1) + KEY_MOVES[key]
+            elif key in HOME_KEYS:
+                target = 1
+            elif key in END_KEYS:
+                if not paginator.total_exact:
+                    message = "number of pages is not known yet"
+                    continue
+                target = paginator.total_pages
+            elif key in GOTO_KEYS:
+                text = input("Go to page: ").strip()
+                target = int(text) if text.isdigit() else None
+            if not target or target < 1:
+                continue
+            started = time.monotonic()
+            result = paginator.fetch_page_at(target, clamp=True)
+            if result:
+                page = result
+                message = f"{time.monotonic() - started:.3f} s"
+            else:
+                message = "there is no such page"
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, settings)
+
+
+def show_page(paginator, formatter, out, page, message: str = ""):
+    """Clears the screen and shows the page with its status."""
+    out.write("\x1b[H\x1b[2J")
+    if page:
+        display = formatter.format_rows(page.rows)
+        lines = format_table(paginator.headers(), display, page.numbers)
+        out.write("\n".join(lines) + "\n")
+        status = page_status(paginator, page)
+    else:
+        status = "No rows"
+    if message:
+        status += f" ({message})"
+    out.write(f"{status}\n{HELP}\n")
+    out.flush()
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    query = sys.stdin.read() if args.query == "-" else args.query
+    batch = args.batch or not (sys.stdin.isatty() and sys.stdout.isatty())
+    rows_num = args.rows
+    if not rows_num:
+        lines = shutil.get_terminal_size().lines - SCREEN_LINES
+        rows_num = BATCH_ROWS if batch else max(lines, 1)
+    try:
+        conn, factory = connect(args.provider, args.connection)
+    except (ImportError, ValueError) as err:
+        print(f"dbmp: {err}", file=sys.stderr)
+        return 2
+    except Exception as err:
+        # e.g. OperationalError of the driver
+        print(f"dbmp: can't connect: {err}", file=sys.stderr)
+        return 2
+    paginator = None
+    try:
+        paginator = QueryPaginator(
+            rows_num=rows_num,
+            query=query,
+            connection=conn,
+            connection_factory=factory,
+            timeout=args.timeout,
+            # counting is needed for the status only
+            count_rows=not batch,
+        )
+        formatter = RowFormatter(
+            paginator.description, driver_module(conn), args.max_width or None
+        )
+        if batch:
+            stream_pages(
+                paginator, formatter, sys.stdout, args.format, args.page
+            )
+        else:
+            interactive(paginator, formatter, sys.stdout, args.page)
+    except (ValueError, QueryCancelledError) + driver_errors(conn) as err:
+        print(f"dbmp: {err}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # e.g. piped to head
+        sys.stderr.close()
+        return 0
+    finally:
+        if paginator:
+            paginator.close()
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import csv
+import io
+import json
+import os
+import time
+from datetime import date, datetime, time as daytime
+
+from dbapi import cancel_connection, driver_errors, is_select
+from keyset import strip_query
+from providers import provider_for, resolve
+from reader import CursorReader
+
+# rows fetched at once while exporting
+EXPORT_BATCH_ROWS = 10000
+# size of the file's write buffer
+WRITE_BUFFER = 1024 * 1024
+# progress is reported not more often than this, seconds
+PROGRESS_INTERVAL = 0.5
+# supported formats
+CSV = "csv"
+JSONL = "jsonl"
+
+
+class ExportCancelledError(RuntimeError):
+    """Export was cancelled, the partial file is removed."""
+
+
+def export_format(path: str) -> str:
+    """Returns format for the file name, CSV is the default one."""
+    extension = os.path.splitext(path)[1].lower()
+    return JSONL if extension in (".jsonl", ".ndjson", ".json") else CSV
+
+
+def csv_value(value):
+    """Converts the value for the csv module."""
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def json_value(value):
+    """Converts the value json can't serialize."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (date, daytime)):
+        return value.isoformat()
+    # Decimal is written as string to keep precision
+    return str(value)
+
+
+def copy_query(query: str) -> str:
+    """Returns COPY statement which writes CSV of the query to STDOUT."""
+    return f"COPY ({strip_query(query)}) TO STDOUT WITH CSV HEADER"
+
+
+def can_copy(connection, provider=None) -> bool:
+    """Checks if the provider streams COPY output, e.g. psycopg2."""
+    return _provider(connection, provider).copy_export
+
+
+def export_query(
+    connection,
+    query: str,
+    path: str,
+    fmt: str = None,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+    progress=None,
+    cancel_event=None,
+    use_copy: bool = True,
+    provider=None,
+) -> int:
+    """
+    Streams all rows of the select query to CSV or JSON Lines file and
+    returns number of rows written. Rows are fetched in big batches,
+    with a named cursor if the driver supports it, so memory use doesn't
+    depend on the size of the result. Capabilities of the driver are
+    taken from the provider (providers.py) of the connection if it's not
+    given.
+    CSV of PostgreSQL is written by the server with COPY TO STDOUT
+    straight to the file, values are not converted to Python objects
+    (PostgreSQL's text representation is used then).
+    progress(rows, rows_per_second) is called every PROGRESS_INTERVAL.
+    Export stops when cancel_event (threading.Event) is set, or when the
+    statement is cancelled after setting it; ExportCancelledError is
+    raised then. The transaction is rolled back if the export fails or
+    is cancelled, the connection stays usable. Doesn't depend on Qt.
+    """
+    fmt = fmt or export_format(path)
+    if fmt not in (CSV, JSONL):
+        raise ValueError(f"unknown export format: {fmt}")
+    if batch_rows < 1:
+        raise ValueError("number of rows must be greater than 0")
+    if not is_select(query):
+        raise ValueError("only select queries can be exported")
+    report = reporter(progress)
+    provider = _provider(connection, provider)
+    try:
+        with open(path, "wb", buffering=WRITE_BUFFER) as stream:
+            if fmt == CSV and use_copy and provider.copy_export:
+                rows = _copy_rows(
+                    connection, query, stream, report, cancel_event
+                )
+            else:
+                rows = _fetch_rows(
+                    connection,
+                    provider,
+                    query,
+                    stream,
+                    fmt,
+                    batch_rows,
+                    report,
+                    cancel_event,
+                )
+    except BaseException as err:
+        _remove(path)
+        # e.g. PostgreSQL refuses statements of the aborted transaction
+        connection.rollback()
+        cancelled = cancel_event and cancel_event.is_set()
+        if cancelled and isinstance(err, driver_errors(connection)):
+            # the statement was aborted by the canceller
+            raise ExportCancelledError("export cancelled") from err
+        raise
+    report(rows, final=True)
+    return rows
+
+
+def _provider(connection, provider):
+    """Returns the provider with capabilities known."""
+    if provider is None:
+        return provider_for(connection)
+    return resolve(provider, connection)
+
+
+def _fetch_rows(
+    connection,
+    provider,
+    query,
+    stream,
+    fmt,
+    batch_rows,
+    report,
+    cancel_event,
+) -> int:
+    """Writes rows fetched from the cursor, returns number of rows."""
+    reader = CursorReader(
+        connection,
+        query,
+        batch_rows,
+        provider.named_cursors,
+        provider.scrollable,
+    )
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    rows_written = 0
+    try:
+        reader.execute(query, commit=False)
+        columns = [column[0] for column in reader.cursor.description]
+        write = _writer(text, fmt, columns)
+        for rows in iter(reader.fetch, []):
+            _check(cancel_event)
+            write(rows)
+            rows_written += len(rows)
+            report(rows_written)
+    finally:
+        reader.close()
+        text.flush()
+        # the binary stream is closed by the caller
+        text.detach()
+    return rows_written
+
+
+def _copy_rows(connection, query, stream, report, cancel_event) -> int:
+    """Writes COPY output to the stream, returns number of rows."""
+    lines = 0
+    cancelled = False
+
+    class Output:
+        """File-like object which counts lines for the progress."""
+
+        def write(self, data):
+            nonlocal lines, cancelled
+            if cancel_event and cancel_event.is_set():
+                # COPY is aborted by the server, the rest is dropped
+                if not cancelled:
+                    cancelled = True
+                    cancel_connection(connection)
+                return len(data)
+            lines += data.count(b"\n")
+            report(max(lines - 1, 0))
+            return stream.write(data)
+
+    curs = connection.cursor()
+    try:
+        curs.copy_expert(copy_query(query), Output())
+    finally:
+        curs.close()
+    # COPY might finish before the cancellation
+    _check(cancel_event)
+    # newlines quoted in values are counted as lines by Output
+    return curs.rowcount if curs.rowcount >= 0 else max(lines - 1, 0)
+
+
+def _writer(stream, fmt: str, columns: list):
+    """Writes the header and returns function which writes rows."""
+    if fmt == CSV:
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+
+        def write_csv(rows):
+            writer.writerows(
+                [csv_value(value) for value in row] for row in rows
+            )
+
+        return write_csv
+
+    encoder = json.JSONEncoder(ensure_ascii=False, default=json_value)
+
+    def write_jsonl(rows):
+        stream.writelines(
+            encoder.encode(dict(zip(columns, row))) + "\n" for row in rows
+        )
+
+    return write_jsonl
+
+
+def reporter(progress):
+    """
+    Returns function which passes number of rows and the rate to the
+    progress callback not more often than PROGRESS_INTERVAL.
+    """
+    started = time.monotonic()
+    reported = started
+
+    def report(rows: int, final: bool = False):
+        nonlocal reported
+        if not progress:
+            return
+        now = time.monotonic()
+        if final or now - reported >= PROGRESS_INTERVAL:
+            reported = now
+            elapsed = now - started
+            progress(rows, rows / elapsed if elapsed else 0.0)
+
+    return report
+
+
+def _check(cancel_event):
+    """Raises ExportCancelledError if the export is cancelled."""
+    if cancel_event and cancel_event.is_set():
+        raise ExportCancelledError("export cancelled")
+
+
+def _remove(path: str):
+    """Removes partial file."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
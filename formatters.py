@@ -0,0 +1,122 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+# mark of the truncated text
+ELLIPSIS = "…"
+# number of bytes shown for binary values
+BINARY_PREVIEW = 64
+
+
+def truncate(text: str, max_length=None) -> str:
+    """Cuts the text to max_length characters if it's longer."""
+    if max_length and len(text) > max_length:
+        return text[: max_length - 1] + ELLIPSIS
+    return text
+
+
+def format_text(value) -> str:
+    """Text is shown as is."""
+    return value if isinstance(value, str) else str(value)
+
+
+def format_number(value) -> str:
+    """Numbers including Decimal are shown without exponent if possible."""
+    if isinstance(value, Decimal):
+        return format(value, "f")
+    return str(value)
+
+
+def format_temporal(value) -> str:
+    """Dates and times are shown in ISO format."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def format_binary(value) -> str:
+    """Binary values are shown as hex preview."""
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return str(value)
+    data = bytes(value[:BINARY_PREVIEW])
+    text = "0x" + data.hex()
+    if len(value) > BINARY_PREVIEW:
+        text += ELLIPSIS
+    return text
+
+
+# formatters for python types of values
+TYPE_FORMATTERS = (
+    (str, format_text),
+    ((bytes, bytearray, memoryview), format_binary),
+    ((datetime, date, time, timedelta), format_temporal),
+    ((int, float, Decimal), format_number),
+)
+# DB-API type objects of the driver module -> formatter
+DBAPI_FORMATTERS = (
+    ("STRING", format_text),
+    ("BINARY", format_binary),
+    ("DATETIME", format_temporal),
+    ("NUMBER", format_number),
+)
+
+
+def formatter_for_value(value):
+    """Returns formatter suitable for the value's type."""
+    for types, formatter in TYPE_FORMATTERS:
+        if isinstance(value, types):
+            return formatter
+    return str
+
+
+def formatter_for_type(type_code, module=None):
+    """
+    Returns formatter for the type code of cursor.description or None
+    if the type is unknown, e.g. SQLite doesn't report types at all.
+    Type codes are compared with DB-API type objects of the module.
+    """
+    if type_code is None or module is None:
+        return None
+    for name, formatter in DBAPI_FORMATTERS:
+        type_object = getattr(module, name, None)
+        if type_object is not None and type_code == type_object:
+            return formatter
+    return None
+
+
+class RowFormatter:
+    """
+    Converts rows into display strings. Formatter of every column is
+    chosen once, either from cursor.description type codes or from the
+    first not NULL value of the column. Long cells are truncated to
+    max_length characters if it's given.
+    """
+
+    def __init__(self, description=None, module=None, max_length=None):
+        self.max_length = max_length
+        self.formatters = [
+            formatter_for_type(column[1], module)
+            for column in description or []
+        ]
+
+    def format_rows(self, rows) -> list:
+        """Returns tuples of display strings for the rows."""
+        if rows and len(self.formatters) < len(rows[0]):
+            # description is unknown
+            self.formatters += [None] * (len(rows[0]) - len(self.formatters))
+        formatters = self.formatters
+        max_length = self.max_length
+        result = []
+        for row in rows:
+            display = []
+            for num, value in enumerate(row):
+                if value is None:
+                    display.append("")
+                    continue
+                formatter = formatters[num]
+                if formatter is None:
+                    formatter = formatters[num] = formatter_for_value(value)
+                display.append(truncate(formatter(value), max_length))
+            result.append(tuple(display))
+        return result
@@ -0,0 +1,255 @@
+import csv
+import itertools
+import re
+
+from columnar import INT64_MAX, INT64_MIN
+from dbapi import driver_errors, driver_module
+from export import reporter
+from keyset import placeholders, quote
+from providers import provider_for
+
+# rows inserted with one executemany
+IMPORT_BATCH_ROWS = 10000
+# rows inserted within one transaction
+TRANSACTION_ROWS = 100000
+# rows the column types are inferred from
+SAMPLE_ROWS = 1000
+# page cache of SQLite while importing, KiB
+SQLITE_CACHE_SIZE = 64 * 1024
+# kinds of columns from the narrowest to the widest one
+INTEGER, REAL, TEXT = range(3)
+# SQL types of the kinds, the generic ones fit PostgreSQL
+SQL_TYPES = {
+    "sqlite3": ("INTEGER", "REAL", "TEXT"),
+    None: ("BIGINT", "DOUBLE PRECISION", "TEXT"),
+}
+INTEGER_RE = re.compile(r"^[+-]?\d+$")
+REAL_RE = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+# numbers with leading zeros, e.g. codes, which zeros are data
+LEADING_ZERO_RE = re.compile(r"^[+-]?0\d")
+
+
+class ImportCancelledError(RuntimeError):
+    """Import was cancelled, rows of the running transaction are undone."""
+
+
+def value_kind(value: str) -> int:
+    """Returns the narrowest kind of column the value fits in."""
+    if LEADING_ZERO_RE.match(value):
+        return TEXT
+    if INTEGER_RE.match(value) and INT64_MIN <= int(value) <= INT64_MAX:
+        return INTEGER
+    if REAL_RE.match(value):
+        return REAL
+    return TEXT
+
+
+def infer_kinds(sample: list, columns: int) -> list:
+    """
+    Returns kind of every column of the sample rows, columns without
+    values are TEXT.
+    """
+    kinds = []
+    for num in range(columns):
+        values = [row[num] for row in sample if num < len(row) and row[num]]
+        kinds.append(max(map(value_kind, values)) if values else TEXT)
+    return kinds
+
+
+def convert_value(value: str, kind: int):
+    """
+    Converts value of CSV for the column, empty string is NULL.
+    Values which don't fit the column are left as is for the DB to decide,
+    as well as numbers with leading zeros.
+    """
+    if value == "":
+        return None
+    if LEADING_ZERO_RE.match(value):
+        return value
+    try:
+        if kind == INTEGER:
+            return int(value)
+        if kind == REAL:
+            return float(value)
+    except ValueError:
+        pass
+    return value
+
+
+def column_names(header: list) -> list:
+    """Returns names for the columns, empty names are replaced."""
+    return [name.strip() or f"c{num}" for num, name in enumerate(header, 1)]
+
+
+def quote_table(table: str) -> str:
+    """Quotes the table name which may be qualified with the schema."""
+    return ".".join(quote(part) for part in table.split("."))
+
+
+def create_query(table: str, columns: list, kinds: list, module=None) -> str:
+    """Returns CREATE TABLE statement, existing table is left intact."""
+    types = SQL_TYPES.get(getattr(module, "__name__", None), SQL_TYPES[None])
+    definitions = ", ".join(
+        f"{quote(column)} {types[kind]}"
+        for column, kind in zip(columns, kinds)
+    )
+    return f"CREATE TABLE IF NOT EXISTS {quote_table(table)} ({definitions})"
+
+
+def import_csv(
+    connection,
+    path: str,
+    table: str,
+    delimiter: str = ",",
+    batch_rows: int = IMPORT_BATCH_ROWS,
+    transaction_rows: int = TRANSACTION_ROWS,
+    sample_rows: int = SAMPLE_ROWS,
+    progress=None,
+    cancel_event=None,
+) -> int:
+    """
+    Loads CSV file with the header into the table and returns number of
+    imported rows. The table is created if it doesn't exist, column
+    types are inferred from the first sample_rows rows.
+    Rows are inserted with executemany by batch_rows and committed every
+    transaction_rows. SQLite doesn't sync and keeps its journal in
+    memory while importing, journal of WAL DB is left as is.
+    progress(rows, rows_per_second) is called every PROGRESS_INTERVAL.
+    Import stops when cancel_event (threading.Event) is set, or when the
+    statement is cancelled after setting it; ImportCancelledError is
+    raised then. Committed transactions stay in both cases, as on errors.
+    Doesn't depend on Qt.
+    """
+    if not table.strip():
+        raise ValueError("no table name provided")
+    if batch_rows < 1 or transaction_rows < 1 or sample_rows < 1:
+        raise ValueError("number of rows must be greater than 0")
+    report = reporter(progress)
+    with open(path, newline="", encoding="utf-8-sig") as stream:
+        reader = csv.reader(stream, delimiter=delimiter)
+        header = next(reader, None)
+        if not header:
+            raise ValueError("CSV file has no header")
+        sample = list(itertools.islice(reader, sample_rows))
+        kinds = infer_kinds(sample, len(header))
+        module = driver_module(connection)
+        pragmas = {}
+        try:
+            _fast_load(connection, pragmas)
+            rows = _insert_rows(
+                connection,
+                create_query(table, column_names(header), kinds, module),
+                _insert_query(connection, table, len(header)),
+                itertools.chain(sample, reader),
+                kinds,
+                batch_rows,
+                transaction_rows,
+                report,
+                cancel_event,
+            )
+        except BaseException as err:
+            connection.rollback()
+            cancelled = cancel_event and cancel_event.is_set()
+            if cancelled and isinstance(err, driver_errors(connection)):
+                # the statement was aborted by the canceller
+                raise ImportCancelledError("import cancelled") from err
+            raise
+        finally:
+            _restore(connection, pragmas)
+    report(rows, final=True)
+    return rows
+
+
+def _insert_query(connection, table: str, columns: int) -> str:
+    """Returns INSERT statement with placeholders of the driver."""
+    style = provider_for(connection).paramstyle
+    marks, _ = placeholders(style, (None,) * columns)
+    return f"INSERT INTO {quote_table(table)} VALUES ({', '.join(marks)})"
+
+
+def _insert_rows(
+    connection,
+    create: str,
+    insert: str,
+    rows,
+    kinds: list,
+    batch_rows: int,
+    transaction_rows: int,
+    report,
+    cancel_event,
+) -> int:
+    """Creates the table and inserts the rows, returns their number."""
+    style = provider_for(connection).paramstyle
+    columns = len(kinds)
+    rows_inserted = 0
+    uncommitted = 0
+    curs = connection.cursor()
+    try:
+        curs.execute(create)
+        while True:
+            batch = list(itertools.islice(rows, batch_rows))
+            if not batch:
+                break
+            _check(cancel_event)
+            params = (_row_params(style, row, kinds, columns) for row in batch)
+            curs.executemany(insert, params)
+            rows_inserted += len(batch)
+            uncommitted += len(batch)
+            if uncommitted >= transaction_rows:
+                connection.commit()
+                uncommitted = 0
+            report(rows_inserted)
+        connection.commit()
+    finally:
+        curs.close()
+    return rows_inserted
+
+
+def _row_params(style: str, row: list, kinds: list, columns: int):
+    """Returns parameters of the row, short rows are padded with NULLs."""
+    if len(row) > columns:
+        raise ValueError(f"row has more than {columns} values: {row}")
+    values = tuple(
+        convert_value(row[num], kind) if num < len(row) else None
+        for num, kind in enumerate(kinds)
+    )
+    return placeholders(style, values)[1]
+
+
+def _fast_load(connection, pragmas: dict):
+    """
+    Turns off syncing of SQLite and keeps its journal in memory unless
+    the DB is in WAL mode. Previous value of every setting goes to
+    pragmas before it's changed, so _restore() undoes what was done
+    even if a later setting fails. Other drivers are left as they are.
+    """
+    if getattr(driver_module(connection), "__name__", "") != "sqlite3":
+        return
+    if connection.in_transaction:
+        # journal mode can't be changed inside of the transaction,
+        # which isn't ours to commit
+        return
+    settings = (
+        ("journal_mode", "MEMORY"),
+        ("synchronous", "OFF"),
+        ("cache_size", f"-{SQLITE_CACHE_SIZE}"),
+    )
+    for name, value in settings:
+        previous = connection.execute(f"PRAGMA {name}").fetchone()[0]
+        if name == "journal_mode" and str(previous).lower() == "wal":
+            # WAL is persistent and shared with other connections
+            continue
+        pragmas[name] = previous
+        connection.execute(f"PRAGMA {name} = {value}")
+
+
+def _restore(connection, pragmas: dict):
+    """Restores settings changed by _fast_load(), the last one first."""
+    for name, value in reversed(list(pragmas.items())):
+        connection.execute(f"PRAGMA {name} = {value}")
+
+
+def _check(cancel_event):
+    """Raises ImportCancelledError if the import is cancelled."""
+    if cancel_event and cancel_event.is_set():
+        raise ImportCancelledError("import cancelled")
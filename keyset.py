@@ -0,0 +1,236 @@
+import re
+import sqlite3
+import string
+
+from dbapi import driver_errors, paramstyle
+
+# alias of the user's query wrapped into the seek query
+SUBQUERY_ALIAS = "dbmp_keyset"
+
+# literals, quoted identifiers and comments of the query
+LEXEME_RE = re.compile(
+    r"(?P<quoted>'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\""
+    r"|\$(?P<tag>\w*)\$.*?\$(?P=tag)\$)|--[^\n]*|/\*.*?\*/",
+    re.S,
+)
+# trailing ORDER BY of the query
+ORDER_BY_RE = re.compile(r"\border\s+by\s+(?P<columns>.+)$", re.I | re.S)
+# plain column in ORDER BY, ascending only: col, t.col, "col", t."col"
+ORDER_COLUMN_RE = re.compile(
+    r'(?:(?:\w+|"[^"]+")\.)?(?:(?P<plain>\w+)|"(?P<quoted>[^"]+)")'
+    r"(?:\s+asc)?",
+    re.I,
+)
+
+# select from a single table: select ... from t [order by ...]
+SINGLE_TABLE_RE = re.compile(
+    r"^select\s.+?\sfrom\s+(?:\w+\.)?"
+    r"(?:(?P<plain>\w+)|\"(?P<dquoted>[^\"]+)\"|'(?P<squoted>[^']+)'"
+    r"|\[(?P<bracketed>[^\]]+)\]|`(?P<backticked>[^`]+)`)"
+    r"(?:\s+order\s+by\s.+)?$",
+    re.I | re.S,
+)
+# select list of plain columns, so they are named as in the table
+SELECT_LIST_RE = re.compile(
+    r"^select\s+(?P<columns>.+?)\s+from\s", re.I | re.S
+)
+PLAIN_COLUMN_RE = re.compile(r'(?:(?:\w+|"[^"]+")\.)?(?:\*|\w+|"[^"]+")')
+
+
+def strip_query(query: str) -> str:
+    """
+    Returns query without trailing semicolons, whitespaces and comments,
+    so the query can be wrapped into another one.
+    """
+    end = pos = 0
+    for match in LEXEME_RE.finditer(query):
+        end = _code_end(query, pos, match.start(), end)
+        if match.group("quoted"):
+            end = match.end()
+        pos = match.end()
+    return query[: _code_end(query, pos, len(query), end)].strip()
+
+
+def _code_end(query: str, start: int, stop: int, end: int) -> int:
+    """
+    Returns the end of the code between start and stop if there is
+    any code, otherwise the end found before.
+    """
+    code = query[start:stop].rstrip(string.whitespace + ";")
+    return start + len(code) if code else end
+
+
+def detect_order_by(query: str):
+    """
+    Returns tuple of columns from the trailing ORDER BY of the query.
+    None is returned if there is no ORDER BY or it's not a simple
+    ascending list of columns (expressions, DESC, LIMIT etc).
+    """
+    match = ORDER_BY_RE.search(strip_query(query))
+    if not match:
+        return None
+    columns = []
+    for item in match.group("columns").split(","):
+        column = ORDER_COLUMN_RE.fullmatch(item.strip())
+        if not column:
+            return None
+        columns.append(column.group("plain") or column.group("quoted"))
+    return tuple(columns)
+
+
+def single_table(query: str):
+    """
+    Returns the table name if the query selects all rows of one table,
+    otherwise None.
+    """
+    match = SINGLE_TABLE_RE.match(strip_query(query))
+    if not match:
+        return None
+    return next(name for name in match.groups() if name)
+
+
+def unique_key(connection, query: str, columns: tuple) -> bool:
+    """
+    Checks if the columns identify rows of the query uniquely, so the
+    query can be paged by seeking from them: the query selects plain
+    columns of one table, the columns are NOT NULL and include all
+    columns of its primary key or a unique index.
+    """
+    table = single_table(query)
+    match = SELECT_LIST_RE.match(strip_query(query))
+    if not table or not match:
+        return False
+    for item in match.group("columns").split(","):
+        if not PLAIN_COLUMN_RE.fullmatch(item.strip()):
+            # expressions and aliases aren't columns of the table
+            return False
+    keys, not_null = _table_keys(connection, table)
+    wanted = {column.casefold() for column in columns}
+    return wanted <= not_null and any(key <= wanted for key in keys)
+
+
+def _table_keys(connection, table: str) -> tuple:
+    """
+    Returns column sets of unique keys of the table and NOT NULL
+    columns, names are casefolded. Nothing is returned if the DB can't
+    tell, the failed lookup is rolled back.
+    """
+    if isinstance(
+        getattr(connection, "__wrapped__", connection), sqlite3.Connection
+    ):
+        return _sqlite_keys(connection, table)
+    marks, params = placeholders(paramstyle(connection), (quote(table),))
+    curs = connection.cursor()
+    try:
+        # PostgreSQL catalog, other DBs fail here
+        curs.execute(
+            "SELECT i.indexrelid, a.attname FROM pg_index i "
+            "JOIN pg_attribute a ON a.attrelid = i.indrelid "
+            "AND a.attnum = ANY(i.indkey) "
+            f"WHERE i.indrelid = CAST({marks[0]} AS regclass) "
+            "AND i.indisunique AND i.indpred IS NULL "
+            "AND i.indexprs IS NULL",
+            params,
+        )
+        keys = {}
+        for index, column in curs.fetchall():
+            keys.setdefault(index, set()).add(column.casefold())
+        curs.execute(
+            "SELECT attname FROM pg_attribute "
+            f"WHERE attrelid = CAST({marks[0]} AS regclass) "
+            "AND attnum > 0 AND attnotnull",
+            params,
+        )
+        not_null = {row[0].casefold() for row in curs.fetchall()}
+    except driver_errors(connection):
+        connection.rollback()
+        return [], set()
+    finally:
+        curs.close()
+    return list(keys.values()), not_null
+
+
+def _sqlite_keys(connection, table: str) -> tuple:
+    """Returns unique keys and NOT NULL columns of SQLite table."""
+    # cid, name, type, notnull, default, position in primary key
+    info = connection.execute(f"PRAGMA table_info({quote(table)})").fetchall()
+    not_null = {row[1].casefold() for row in info if row[3]}
+    primary = [row for row in info if row[5]]
+    if len(primary) == 1 and primary[0][2].upper() == "INTEGER":
+        # alias of rowid, which is never NULL
+        not_null.add(primary[0][1].casefold())
+    keys = [{row[1].casefold() for row in primary}] if primary else []
+    # seq, name, unique, origin, partial
+    for index in connection.execute(f"PRAGMA index_list({quote(table)})"):
+        if not index[2] or (len(index) > 4 and index[4]):
+            continue
+        columns = [
+            row[2]
+            for row in connection.execute(
+                f"PRAGMA index_info({quote(index[1])})"
+            )
+        ]
+        if None not in columns:
+            # not an expression index
+            keys.append({column.casefold() for column in columns})
+    return keys, not_null
+
+
+def quote(identifier: str) -> str:
+    """Quotes identifier the SQL standard way."""
+    return '"{}"'.format(identifier.replace('"', '""'))
+
+
+def placeholders(style: str, values: tuple):
+    """
+    Returns list of placeholders for the values and parameters
+    suitable for the paramstyle.
+    """
+    if style == "named":
+        names = [f"k{num}" for num in range(len(values))]
+        return [f":{name}" for name in names], dict(zip(names, values))
+    if style == "numeric":
+        marks = [f":{num}" for num in range(1, len(values) + 1)]
+        return marks, tuple(values)
+    if style in ("format", "pyformat"):
+        return ["%s"] * len(values), tuple(values)
+    return ["?"] * len(values), tuple(values)
+
+
+def seek_query(
+    query: str,
+    columns: tuple,
+    limit: int,
+    key: tuple = None,
+    backward: bool = False,
+    offset: int = 0,
+    style: str = "qmark",
+):
+    """
+    Returns SQL and parameters to fetch a page which follows the key
+    (or precedes it when going backward).
+    Rows fetched backward come in reversed order. With format and
+    pyformat paramstyles % of the query are doubled.
+    """
+    quoted = [quote(column) for column in columns]
+    query = strip_query(query)
+    if style in ("format", "pyformat"):
+        # the query is executed with parameters, so its % are escaped
+        query = query.replace("%", "%%")
+    sql = f"SELECT * FROM ({query}) AS {SUBQUERY_ALIAS}"
+    params = ()
+    if key is not None:
+        marks, params = placeholders(style, key)
+        operator = "<" if backward else ">"
+        if len(columns) == 1:
+            sql += f" WHERE {quoted[0]} {operator} {marks[0]}"
+        else:
+            sql += " WHERE ({}) {} ({})".format(
+                ", ".join(quoted), operator, ", ".join(marks)
+            )
+    order = " DESC" if backward else ""
+    sql += " ORDER BY " + ", ".join(column + order for column in quoted)
+    sql += f" LIMIT {int(limit)}"
+    if offset:
+        sql += f" OFFSET {int(offset)}"
+    return sql, params
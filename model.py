@@ -1,5 +1,14 @@
 from PyQt5.Qt import QAbstractTableModel
-from PyQt5.QtCore import Qt, QVariant
+from PyQt5.QtCore import QModelIndex, Qt, QVariant, pyqtSignal
+
+from columnar import ColumnarPage, PageChain, cell
+
+
+def columnar(rows, first_number: int) -> ColumnarPage:
+    """Returns rows as columnar page unless they are stored so already."""
+    if isinstance(rows, ColumnarPage):
+        return rows
+    return ColumnarPage(rows, first_number)
 
 
 class TableModel(QAbstractTableModel):
@@ -8,16 +17,80 @@ class TableModel(QAbstractTableModel):
     methods.
     All methods override base class methods, so names left intact with
     Qt naming scheme.
+    The model adopts rows and row numbers of the paginator's Page as is,
+    rows may be a list or columnar storage.
+    Display strings of the rows formatted in advance are shown if given,
+    so repaints don't convert values again.
+    Incremental model asks for the next page with fetch_more_signal when
+    the view scrolls to the end, the page is appended with append_page().
     """
 
-    def __init__(self, parent=None, columns=None):
+    # the next page is needed
+    fetch_more_signal = pyqtSignal()
+
+    def __init__(
+        self,
+        parent=None,
+        columns=None,
+        page=None,
+        incremental=False,
+        display=None,
+    ):
         super().__init__(parent)
         # data storage
-        self.input_data = []
+        self.input_data = page.rows if page else []
         # column names
         self.columns = columns or []
-        # row numbers
-        self.rows = []
+        # row numbers, list or range
+        self.rows = page.numbers if page else []
+        # display strings of the rows or None
+        self.display = display
+        # pages are appended while scrolling
+        self.incremental = incremental
+        if incremental:
+            # pages are appended to chains of columnar pages
+            self.input_data = PageChain()
+            self.display = PageChain()
+            if page:
+                self.__append(page, display)
+        # there might be more pages
+        self.more = incremental
+        # the next page is requested
+        self.loading = False
+
+    def canFetchMore(self, index):
+        """Returns True if there might be more rows"""
+        if index.isValid():
+            return False
+        return self.more and not self.loading
+
+    def fetchMore(self, index):
+        """Requests the next page, it comes with append_page()"""
+        if not self.canFetchMore(index):
+            return
+        self.loading = True
+        self.fetch_more_signal.emit()
+
+    def append_page(self, page, display=None):
+        """
+        Appends rows of the page and their display strings,
+        None means there are no more pages
+        """
+        self.loading = False
+        if not page or not page.rows:
+            self.more = False
+            return
+        first = len(self.input_data)
+        self.beginInsertRows(QModelIndex(), first, first + len(page.rows) - 1)
+        self.__append(page, display)
+        self.endInsertRows()
+
+    def __append(self, page, display=None):
+        """Appends the page to the chains."""
+        first_number = page.numbers.start
+        self.input_data.append(columnar(page.rows, first_number))
+        self.display.append(columnar(display or page.rows, first_number))
+        self.rows = self.input_data.numbers
 
     def data(self, index, role):
         """
@@ -31,7 +104,8 @@ class TableModel(QAbstractTableModel):
 
         # let's check if we've got DisplayRole
         if role == Qt.DisplayRole:
-            return QVariant(self.input_data[index.row()][index.column()])
+            rows = self.input_data if self.display is None else self.display
+            return QVariant(cell(rows, index.row(), index.column()))
         return QVariant("")
 
     def rowCount(self, index):
@@ -69,3 +143,128 @@ class TableModel(QAbstractTableModel):
             return self.rows[section]
         # this is the default
         return section + 1
+
+
+class VirtualTableModel(TableModel):
+    """
+    Reports all rows of the result, while only a window of pages is kept
+    in memory. Missing pages are requested with page_needed_signal when
+    the view asks for their rows and come with put_page(). Pages furthest
+    from the last viewed one are evicted. Number of rows may be estimated,
+    it's corrected as pages come.
+    """
+
+    # number of the page which rows are needed
+    page_needed_signal = pyqtSignal(int)
+
+    def __init__(
+        self,
+        parent=None,
+        columns=None,
+        page=None,
+        rows_num=1000,
+        total_rows=None,
+        window_pages=5,
+        display=None,
+    ):
+        super().__init__(parent, columns)
+        self.rows_num = rows_num
+        self.window_pages = window_pages
+        # page number -> display strings or rows
+        self.pages = {}
+        # pages requested but not come yet
+        self.requested = set()
+        # page of the last row asked by the view
+        self.viewport_page = 1
+        self.total_rows = total_rows or 0
+        if page:
+            self.put_page(page, display)
+
+    def data(self, index, role):
+        """Returns data of the row, requests its page if it's missing."""
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        page, offset = divmod(index.row(), self.rows_num)
+        page += 1
+        self.viewport_page = page
+        rows = self.pages.get(page)
+        if rows is None:
+            self.__request(page)
+            return QVariant()
+        if offset >= len(rows):
+            return QVariant()
+        return QVariant(cell(rows, offset, index.column()))
+
+    def rowCount(self, index):
+        """Returns the number of rows of the whole result"""
+        return self.total_rows
+
+    def columnCount(self, index):
+        """Returns the number of columns"""
+        if self.columns:
+            return len(self.columns)
+        for rows in self.pages.values():
+            return len(rows[0])
+        return 0
+
+    def put_page(self, page, display=None):
+        """
+        Stores display strings or rows of the page,
+        empty page is beyond the result.
+        """
+        self.requested.discard(page.number)
+        first = (page.number - 1) * self.rows_num
+        if not page.rows:
+            # the result is shorter than estimated
+            self.set_total_rows(min(self.total_rows, first))
+            return
+        self.pages[page.number] = page.rows if display is None else display
+        self.__evict()
+        last = first + len(page.rows)
+        if len(page.rows) < self.rows_num:
+            # the last page
+            self.set_total_rows(last)
+        elif last >= self.total_rows:
+            # one more row to let the view scroll to the next page
+            self.set_total_rows(last + 1)
+        self.dataChanged.emit(
+            self.index(first, 0),
+            self.index(last - 1, self.columnCount(None) - 1),
+        )
+
+    def forget_request(self, page: int):
+        """Forgets the page which wasn't read, it's requested again."""
+        self.requested.discard(page)
+
+    def set_total_rows(self, total_rows: int):
+        """Changes the number of rows reported to the view."""
+        if total_rows > self.total_rows:
+            self.beginInsertRows(
+                QModelIndex(), self.total_rows, total_rows - 1
+            )
+            self.total_rows = total_rows
+            self.endInsertRows()
+        elif total_rows < self.total_rows:
+            self.beginRemoveRows(
+                QModelIndex(), total_rows, self.total_rows - 1
+            )
+            self.total_rows = total_rows
+            last_page = -(-total_rows // self.rows_num)
+            for number in [num for num in self.pages if num > last_page]:
+                del self.pages[number]
+            self.endRemoveRows()
+
+    def __request(self, page: int):
+        """Requests the page once."""
+        if page in self.requested:
+            return
+        self.requested.add(page)
+        self.page_needed_signal.emit(page)
+
+    def __evict(self):
+        """Drops pages furthest from the viewport."""
+        while len(self.pages) > self.window_pages:
+            furthest = max(
+                self.pages, key=lambda num: abs(num - self.viewport_page)
+            )
+            del self.pages[furthest]
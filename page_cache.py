@@ -0,0 +1,103 @@
+import sys
+from collections import OrderedDict
+
+# number of rows used to estimate the size of the page
+SIZE_SAMPLE_ROWS = 16
+
+
+def approx_size(rows: list, sample: int = SIZE_SAMPLE_ROWS) -> int:
+    """
+    Returns approximate size of the page in bytes.
+    Only first rows are measured, the result is extrapolated to the page.
+    """
+    if not rows:
+        return sys.getsizeof(rows)
+    measured = rows[:sample]
+    rows_size = 0
+    for row in measured:
+        rows_size += sys.getsizeof(row)
+        rows_size += sum(sys.getsizeof(value) for value in row)
+    return sys.getsizeof(rows) + rows_size * len(rows) // len(measured)
+
+
+class PageCache:
+    """
+    Keeps recently served pages in memory.
+    Least recently used pages are evicted as soon as either the number
+    of pages or the approximate size of pages exceeds its limit.
+    """
+
+    def __init__(self, max_pages: int = 16, max_bytes: int = 64 * 1024 * 1024):
+        if max_pages < 0:
+            raise ValueError("number of pages must not be negative")
+        if max_bytes < 0:
+            raise ValueError("number of bytes must not be negative")
+        self.__max_pages = max_pages
+        self.__max_bytes = max_bytes
+        # page number -> (rows, size in bytes)
+        self.__pages = OrderedDict()
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__pages)
+
+    def __contains__(self, page: int) -> bool:
+        return page in self.__pages
+
+    @property
+    def hits(self) -> int:
+        """Returns number of pages served from the cache"""
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """Returns number of pages not found in the cache"""
+        return self.__misses
+
+    @property
+    def size(self) -> int:
+        """Returns approximate size of all cached pages in bytes"""
+        return self.__size
+
+    def get(self, page: int):
+        """Returns rows of the page or None if the page is not cached."""
+        entry = self.__pages.get(page)
+        if entry is None:
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        # page is the most recently used one now
+        self.__pages.move_to_end(page)
+        return entry[0]
+
+    def put(self, page: int, rows: list) -> bool:
+        """Stores rows of the page, evicts old pages if needed."""
+        if not rows or not self.__max_pages:
+            return False
+        size = approx_size(rows)
+        if size > self.__max_bytes:
+            # the page alone exceeds the budget
+            return False
+        self.discard(page)
+        self.__pages[page] = (rows, size)
+        self.__size += size
+        while (
+            len(self.__pages) > self.__max_pages
+            or self.__size > self.__max_bytes
+        ):
+            _, (_, evicted_size) = self.__pages.popitem(last=False)
+            self.__size -= evicted_size
+        return True
+
+    def discard(self, page: int):
+        """Removes the page from the cache if it's there."""
+        entry = self.__pages.pop(page, None)
+        if entry is not None:
+            self.__size -= entry[1]
+
+    def clear(self):
+        """Removes all pages, counters are left intact."""
+        self.__pages.clear()
+        self.__size = 0
@@ -1,10 +1,63 @@
+import threading
+from collections import namedtuple
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from counter import count_query, estimate_rows
+from dbapi import cancel_connection, driver_errors, is_select
+from keyset import detect_order_by, seek_query, unique_key
+from page_cache import PageCache
+from pool import PoolExhaustedError
+from providers import provider_for, resolve
+from reader import CursorReader
+from snapshot import Snapshot
+
+# keyset columns are taken from the ORDER BY of the query
+KEYSET_AUTO = "auto"
+
+# rows of the page, range of their numbers and the page number
+Page = namedtuple("Page", "rows numbers number")
+
+
+class QueryCancelledError(RuntimeError):
+    """Statement was cancelled by the user or by the timeout."""
+
+
 class QueryPaginator:
     """
     Takes query as input and feeds its data to the customer.
     Feeder can go forward or backward.
     """
 
-    def __init__(self, rows_num: int = 1000, query: str = "", connection=None):
+    def __init__(
+        self,
+        rows_num: int = 1000,
+        query: str = "",
+        connection=None,
+        cache_pages: int = 16,
+        cache_bytes: int = 64 * 1024 * 1024,
+        # unique columns of the result to seek pages from
+        keyset=None,
+        # named cursors are used if the driver supports them
+        server_side: bool = True,
+        # the result is read once into a SQLite table
+        snapshot: bool = False,
+        # the next page is read in a background thread
+        prefetch: bool = False,
+        # makes connections for prefetch and counting, may lend them
+        # from ConnectionPool
+        connection_factory=None,
+        # seconds, running statement is cancelled afterwards
+        timeout: float = None,
+        # rows are counted in a background thread, count_callback is
+        # called from that thread when the number changes
+        count_rows: bool = False,
+        count_callback=None,
+        # looked up by the connection's driver if not given
+        provider=None,
+        # ResultCache, the first pages of the select are cached there
+        result_cache=None,
+    ):
         if not connection:
             raise ValueError("no connection provided")
         if not (isinstance(query, str) and query.strip()):
@@ -15,27 +68,103 @@ class QueryPaginator:
             raise ValueError("unexpected connection")
         if rows_num < 1:
             raise ValueError("number of rows must be greater than 0")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be greater than 0")
         # default page
         self.__current_page = 0
         # default number of rows per fetch
         self.__number_of_rows = rows_num
 
         self.__conn = connection
-        self.__curs = None
         self.__query = query
+        self.__provider = (
+            provider_for(connection)
+            if provider is None
+            else resolve(provider, connection)
+        )
+        self.__server_side = server_side and self.__provider.named_cursors
+        self.__reader = self.__new_reader(connection)
+        # recently served pages, shared with the prefetch thread
+        self.__cache = PageCache(cache_pages, cache_bytes)
+        self.__lock = threading.Lock()
+        # keyset pagination
+        self.__keyset = None
+        self.__key_index = []
+        # page number -> (first key, last key), shared with the prefetch
+        # thread
+        self.__bookmarks = {}
+        # page which rows are waiting in the cursor after seek
+        self.__seek_page = None
+        # materialized result and its description,
+        # the description is kept as well when the cursor is reset
+        self.__snapshot = None
+        self.__description = None
+        # background prefetch of the next page
+        self.__connection_factory = connection_factory
+        self.__executor = None
+        # (page number, future)
+        self.__pending = None
+        self.__cancelled = threading.Event()
+        self.__worker_conn = None
+        self.__worker_reader = None
+        # statement timeout and the reason of cancellation
+        self.__timeout = timeout
+        self.__cancel_reason = None
+        # set while a statement runs within __interruptible(), idle
+        # connection isn't interrupted, SQLite would abort the next fetch
+        self.__running = False
+        self.__running_lock = threading.Lock()
+        # total number of rows, exact or estimated
+        self.__total_rows = None
+        self.__total_exact = False
+        self.__count_callback = count_callback
+        self.__count_executor = None
+        self.__count_conn = None
+        self.__count_stopped = threading.Event()
+        # repeated select is served by the result cache
+        self.__results = result_cache
+        self.__result_key = None
+        self.__result_version = None
+        cached = None
+        if result_cache is not None and is_select(query):
+            if not (keyset or snapshot):
+                self.__result_key = result_cache.key(
+                    connection, query, rows_num
+                )
+                self.__result_version = result_cache.version(connection)
+                cached = result_cache.get(
+                    self.__result_key, self.__result_version
+                )
 
-        # execute query at creation
-        self.__execute_query(self.__query)
+        if cached:
+            # the query is executed when a page isn't cached
+            self.__description = cached.description
+            for page, rows in cached.pages.items():
+                self.__cache.put(page, rows)
+            self.__set_total(cached.total_rows)
+        if count_rows and is_select(query) and not self.__total_exact:
+            # nothing is done within the transaction yet
+            self.__set_total(estimate_rows(connection, query), False)
+        if not cached:
+            # execute query at creation
+            with self.__interruptible():
+                if not self.__start_keyset(keyset):
+                    self.__execute_query(self.__query)
+                if snapshot and self.is_data_query:
+                    self.__take_snapshot()
         self.__fetched = False
+        self.__prefetch = prefetch and self.__can_prefetch()
+        if self.__snapshot:
+            self.__set_total(self.__snapshot.row_count, True)
+        elif count_rows and not self.__total_exact and self.__can_count():
+            self.__count_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="dbmp-count"
+            )
+            self.__count_executor.submit(self.__count_rows)
 
-    def __execute_query(self, query: str = "") -> bool:
+    def __execute_query(self, query: str = "", params=None) -> bool:
         """Executes query"""
-        if not self.__curs:
-            # exception silently rerisen
-            self.__curs = self.__conn.cursor()
-        # execute query
-        self.__curs.execute(query)
-        self.__conn.commit()
+        self.__reader.execute(query, params)
         # reset variables
         self.__fetched = False
         self.__current_page = 0
@@ -55,77 +184,564 @@ class QueryPaginator:
         # this is the actual page number
         return 1 if self.__current_page <= 0 else self.__current_page
 
+    @property
+    def server_side(self) -> bool:
+        """Returns True if the query is read with a named cursor"""
+        return self.__reader.named
+
+    @property
+    def provider(self):
+        """Returns the provider with capabilities of the driver"""
+        return self.__provider
+
+    @property
+    def snapshot(self):
+        """Returns materialized result or None"""
+        return self.__snapshot
+
+    @property
+    def keyset(self):
+        """Returns keyset columns or None if rows are skipped instead"""
+        return self.__keyset
+
+    @property
+    def prefetch(self) -> bool:
+        """Returns True if pages are prefetched in background"""
+        return self.__prefetch
+
+    @property
+    def cache_hits(self) -> int:
+        """Returns number of pages served from the page cache"""
+        return self.__cache.hits
+
+    @property
+    def cache_misses(self) -> int:
+        """Returns number of pages that had to be fetched from the DB"""
+        return self.__cache.misses
+
     @property
     def is_data_query(self):
         """Returns True if this is 'select' query"""
-        if all([self.__query, self.__curs]):
+        if self.__description is not None:
+            # materialized select or reset cursor
+            return True
+        curs = self.__reader.cursor
+        if all([self.__query, curs]):
             # explicitly check for None for the sake of PEP 249
-            return False if self.__curs.description is None else True
+            return False if curs.description is None else True
+
+    @property
+    def total_rows(self):
+        """Returns number of rows, exact or estimated, or None"""
+        return self.__total_rows
+
+    @property
+    def total_pages(self):
+        """Returns number of pages, exact or estimated, or None"""
+        if self.__total_rows is None:
+            return None
+        return -(-self.__total_rows // self.__number_of_rows)
+
+    @property
+    def total_exact(self) -> bool:
+        """Returns True if number of rows is exact"""
+        return self.__total_exact
+
+    @property
+    def description(self):
+        """Returns cursor.description of the select query or None"""
+        if not self.is_data_query:
+            return None
+        return self.__description or self.__reader.cursor.description
 
     def headers(self) -> list:
         """Returns list of headers for the query"""
         # return list of the columns headers
         if self.is_data_query:
             # select
-            return [descr[0] for descr in self.__curs.description]
+            return [descr[0] for descr in self.description]
         # create, insert, delete
         return ["Result"]
 
-    def feeder(self, forward: bool = True):
-        """Feeds the data from the query's result."""
-        feeder_func = self.__sql_type_factory(self.is_data_query)
-        yield from feeder_func(forward)
+    def close(self):
+        """Closes the cursor, the connection is left open."""
+        self.cancel_prefetch()
+        self.__stop_count()
+        self.__reader.close()
+        if self.__snapshot:
+            self.__snapshot.close()
+            self.__snapshot = None
+
+    def cancel(self):
+        """Aborts running statement, may be called from any thread."""
+        self.__cancel("query cancelled")
+
+    def cancel_prefetch(self):
+        """
+        Stops background prefetch, the page being read with the prefetch
+        connection is interrupted.
+        """
+        self.__prefetch = False
+        self.__cancelled.set()
+        if self.__pending:
+            self.__pending[1].cancel()
+            self.__pending = None
+        if self.__executor:
+            worker_conn = self.__worker_conn
+            if worker_conn:
+                # nobody waits for the page
+                cancel_connection(worker_conn, self.__provider.cancel)
+            # resources of the thread are released in the thread
+            self.__executor.submit(self.__close_worker)
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+
+    def suspend(self) -> int:
+        """
+        Frees memory of the paginator nobody looks at, e.g. of a hidden
+        tab: cached pages are dropped, the prefetch thread and its
+        connection are released. The cursor of the select is closed as
+        well, so it doesn't lock SQLite DB; the query is executed again
+        and the page is read with fetch_page_at(), keyset bookmarks are
+        kept.
+        Prefetch resumes with the next page served.
+        Returns the bookmark, the current page number.
+        """
+        self.__pause_prefetch()
+        with self.__lock:
+            self.__cache.clear()
+        if self.is_data_query:
+            self.__release_reader()
+        return self.__current_page
+
+    def stop_background(self):
+        """
+        Stops reading of the result in background, e.g. before writing
+        to SQLite DB, which readers of other connections would lock.
+        Prefetch resumes with the next page served, rows aren't counted
+        again.
+        """
+        self.__pause_prefetch()
+        self.__stop_count()
+
+    def __pause_prefetch(self):
+        """Stops the prefetch thread, prefetch is left enabled."""
+        prefetch = self.__prefetch
+        self.cancel_prefetch()
+        # the prefetch thread is gone, nothing is left to cancel
+        self.__cancelled.clear()
+        self.__prefetch = prefetch
+
+    def fetch_page(self, forward: bool = True):
+        """
+        Returns the next or the previous Page, None if there is no such
+        page. Rows are returned as fetched, without per row overhead.
+        """
+        result = None
+        if self.is_data_query:
+            page = self.__current_page + (1 if forward else -1)
+            if page >= 1:
+                result = self.__fetch_select_page(page)
+        elif forward and not self.__fetched:
+            result = self.__ddl_page()
         self.__fetched = True
+        return result
 
-    def __sql_type_factory(self, data_query=True):
-        """Factory function returns handler for DDL or DML queries."""
-        if data_query:
-            # select
-            return self.__dml_feeder
-        # create, insert, delete
-        return self.__ddl_feeder
-
-    def __dml_feeder(self, forward=True):
-        """Pager for DML query, handles backward direction."""
-        if not forward:
-            if self.__current_page <= 1:
-                return  # StopIteration
-            # to fast forward for certain number of runs we must save cur page
-            ff_runs = self.__current_page
-            # ff must be done from the very begining, so reexecute query
-            self.__execute_query(self.__query)
-            self.__fast_forward(ff_runs - 2)
-        # feed data to customer
-        yield from self.__select_feeder()
-
-    def __select_feeder(self):
-        """
-        Feeds results from the select query. Forward direction only.
+    def fetch_page_at(self, page: int, clamp: bool = False):
+        """
+        Returns the Page which becomes the current one,
+        None if there is no such page. With clamp the last page is
+        returned instead of the page beyond the end, if the number of
+        rows is known exactly.
+        """
+        if page < 1:
+            raise ValueError("page number must be greater than 0")
+        result = None
+        if self.is_data_query:
+            result = self.__fetch_select_page(page)
+            last = self.total_pages if self.__total_exact else None
+            if result is None and clamp and last and last < page:
+                result = self.__fetch_select_page(last)
+        elif page == 1:
+            result = self.__ddl_page()
+        self.__fetched = True
+        return result
+
+    def feeder(self, forward: bool = True):
+        """
+        Feeds the data from the query's result.
         Feeds tuple (<row data>, <row number>)
         """
-        runs = False
-        for num, row in enumerate(
-            self.__curs.fetchmany(self.__number_of_rows), 1
+        yield from self.__page_rows(self.fetch_page(forward))
+
+    def goto_page(self, page: int):
+        """
+        Feeds the data of the page, the page becomes the current one.
+        Nothing is fed if there is no such page.
+        """
+        yield from self.__page_rows(self.fetch_page_at(page))
+
+    def goto_row(self, row: int):
+        """Feeds the data of the page the row belongs to."""
+        if row < 1:
+            raise ValueError("row number must be greater than 0")
+        yield from self.goto_page((row - 1) // self.__number_of_rows + 1)
+
+    def __page_rows(self, page):
+        """Feeds rows of the page with their numbers."""
+        if page:
+            yield from zip(page.rows, page.numbers)
+
+    def __fetch_select_page(self, page: int):
+        """Returns the page and makes it the current one if it exists."""
+        rows = self.__get_page(page)
+        if not rows:
+            return None
+        self.__current_page = page
+        if len(rows) == self.__number_of_rows:
+            # there might be the next page
+            self.__schedule_prefetch(page + 1)
+        first = (page - 1) * self.__number_of_rows + 1
+        return Page(rows, range(first, first + len(rows)), page)
+
+    def __get_page(self, page: int) -> list:
+        """Returns rows of the page either from the cache or from the DB."""
+        self.__wait_prefetch(page)
+        with self.__lock:
+            rows = self.__cache.get(page)
+        if rows is None:
+            with self.__interruptible():
+                rows = self.__read_page(page)
+            with self.__lock:
+                self.__cache.put(page, rows)
+        if len(rows) < self.__number_of_rows and (rows or page == 1):
+            # the last page tells the exact number of rows
+            self.__set_total((page - 1) * self.__number_of_rows + len(rows))
+        if self.__result_key:
+            self.__results.put_page(
+                self.__result_key,
+                self.__result_version,
+                self.description,
+                page,
+                rows,
+                self.__total_rows if self.__total_exact else None,
+            )
+        return rows
+
+    def __new_reader(self, connection) -> CursorReader:
+        """Returns reader of the query suitable for the provider."""
+        return CursorReader(
+            connection,
+            self.__query,
+            self.__number_of_rows,
+            self.__server_side,
+            self.__provider.scrollable,
+        )
+
+    def __read_page(self, page: int, reader=None) -> list:
+        """Reads rows of the page from the DB."""
+        reader = reader or self.__reader
+        if self.__snapshot:
+            first = (page - 1) * self.__number_of_rows + 1
+            return self.__snapshot.rows(
+                first, first + self.__number_of_rows - 1
+            )
+        if self.__keyset:
+            return self.__read_keyset_page(page, reader)
+        return reader.read(page)
+
+    def __take_snapshot(self):
+        """Materializes the result, the cursor is not needed afterwards."""
+        self.__description = self.__reader.cursor.description
+        self.__snapshot = Snapshot(
+            self.__conn, self.__query, iter(self.__reader.fetch, [])
+        )
+        self.__reader.close()
+
+    def __start_keyset(self, keyset) -> bool:
+        """
+        Executes seek query for the first page if keyset is provided.
+        Returns False if the query must be executed as is.
+        """
+        auto = keyset == KEYSET_AUTO
+        columns = detect_order_by(self.__query) if auto else keyset
+        if not columns:
+            return False
+        columns = tuple(columns)
+        if auto and not unique_key(self.__conn, self.__query, columns):
+            # tied or NULL keys would be skipped by the seek
+            return False
+        sql, params, _ = self.__seek_query(1, columns)
+        try:
+            self.__execute_query(sql, params)
+        except driver_errors(self.__conn):
+            if not auto:
+                raise
+            # ORDER BY is not suitable for seeking
+            self.__conn.rollback()
+            return False
+        names = [descr[0] for descr in self.__reader.cursor.description or ()]
+        missing = [column for column in columns if column not in names]
+        if missing:
+            if not auto:
+                raise ValueError(f"no keyset columns in the result: {missing}")
+            return False
+        self.__keyset = columns
+        self.__key_index = [names.index(column) for column in columns]
+        self.__seek_page = 1
+        return True
+
+    def __seek_query(self, page: int, columns: tuple):
+        """
+        Returns SQL, parameters and direction to fetch the page by seeking
+        from the closest known key.
+        """
+        # the prefetch thread adds bookmarks
+        with self.__lock:
+            bookmarks = dict(self.__bookmarks)
+        before = bookmarks.get(page - 1)
+        after = bookmarks.get(page + 1)
+        # seek from the page we are coming from
+        backward = after is not None and (
+            before is None or page < self.__current_page
+        )
+        key, offset = None, 0
+        if backward:
+            # right before the first row of the next page
+            key = after[0]
+        elif before is not None:
+            # right after the last row of the previous page
+            key = before[1]
+        else:
+            # skip pages from the closest known page
+            known = [num for num in bookmarks if num < page]
+            if known:
+                key = bookmarks[max(known)][1]
+            offset = (page - 1 - max(known, default=0)) * self.__number_of_rows
+        sql, params = seek_query(
+            self.__query,
+            columns,
+            self.__number_of_rows,
+            key=key,
+            backward=backward,
+            offset=offset,
+            style=self.__provider.paramstyle,
+        )
+        return sql, params, backward
+
+    def __read_keyset_page(self, page: int, reader) -> list:
+        """Reads rows of the page with the seek query."""
+        backward = False
+        if reader is not self.__reader or self.__seek_page != page:
+            sql, params, backward = self.__seek_query(page, self.__keyset)
+            reader.execute(sql, params, commit=False)
+        if reader is self.__reader:
+            self.__seek_page = None
+        rows = reader.fetch()
+        if backward:
+            rows.reverse()
+        if rows:
+            bookmark = (self.__key(rows[0]), self.__key(rows[-1]))
+            with self.__lock:
+                self.__bookmarks[page] = bookmark
+        return rows
+
+    def __key(self, row) -> tuple:
+        """Returns keyset values of the row."""
+        return tuple(row[index] for index in self.__key_index)
+
+    @contextmanager
+    def __interruptible(self):
+        """
+        Aborts DB operation if it exceeds the timeout. If the operation
+        fails, the cursor is reset and the transaction is rolled back,
+        so the paginator and the connection can be used again.
+        """
+        self.__cancel_reason = None
+        timer = None
+        if self.__timeout:
+            timer = threading.Timer(
+                self.__timeout,
+                self.__cancel,
+                (f"statement timeout of {self.__timeout} s exceeded",),
+            )
+            timer.daemon = True
+            timer.start()
+        with self.__running_lock:
+            self.__running = True
+        try:
+            yield
+        except driver_errors(self.__conn) as err:
+            self.__stop_running()
+            self.__recover()
+            if self.__cancel_reason:
+                raise QueryCancelledError(self.__cancel_reason) from err
+            raise
+        finally:
+            if timer:
+                timer.cancel()
+            self.__stop_running()
+        if self.__cancel_reason:
+            # came as the statement finished, the interrupt might be
+            # left armed for the pending cursor
+            self.__recover()
+
+    def __stop_running(self):
+        """Marks that no statement is running, cancel() does nothing."""
+        with self.__running_lock:
+            self.__running = False
+
+    def __cancel(self, reason: str):
+        """Aborts running statement for the reason."""
+        with self.__running_lock:
+            if not self.__running:
+                # nothing to abort
+                return
+            self.__cancel_reason = reason
+            cancel_connection(self.__conn, self.__provider.cancel)
+
+    def __recover(self):
+        """Makes the paginator usable after failed operation."""
+        self.__release_reader()
+        try:
+            self.__conn.rollback()
+        except driver_errors(self.__conn):
+            pass
+
+    def __release_reader(self):
+        """Closes the cursor, the query is executed again when needed."""
+        curs = self.__reader.cursor
+        if curs and curs.description is not None:
+            # headers are kept while the query waits for reexecution
+            self.__description = self.__description or curs.description
+        self.__reader.reset()
+        self.__seek_page = None
+
+    def __set_total(self, rows, exact: bool = True):
+        """Sets number of rows, the estimate never overrides exact one."""
+        if rows is None or (self.__total_exact and not exact):
+            return
+        if (rows, exact) == (self.__total_rows, self.__total_exact):
+            return
+        self.__total_rows, self.__total_exact = rows, exact
+        if exact and self.__result_key:
+            self.__results.put_total(
+                self.__result_key, self.__result_version, rows
+            )
+        if self.__count_callback:
+            self.__count_callback()
+
+    def __can_count(self) -> bool:
+        """Checks if rows can be counted in background."""
+        # counting on the same connection would block paging
+        return self.is_data_query and self.__connection_factory is not None
+
+    def __count_rows(self):
+        """Counts rows of the query, runs in the count thread."""
+        conn = self.__connection_factory()
+        self.__count_conn = conn
+        try:
+            if self.__count_stopped.is_set():
+                return
+            curs = conn.cursor()
+            curs.execute(count_query(self.__query))
+            rows = curs.fetchone()[0]
+            curs.close()
+            if not self.__count_stopped.is_set():
+                self.__set_total(rows)
+        except driver_errors(conn):
+            # e.g. cancelled by close()
+            pass
+        finally:
+            self.__count_conn = None
+            conn.close()
+
+    def __stop_count(self):
+        """Aborts background count and waits for the thread."""
+        self.__count_stopped.set()
+        if not self.__count_executor:
+            return
+        conn = self.__count_conn
+        if conn:
+            cancel_connection(conn)
+        self.__count_executor.shutdown(wait=True)
+        self.__count_executor = None
+
+    def __can_prefetch(self) -> bool:
+        """Checks if pages can be read in background."""
+        if self.__snapshot or not self.is_data_query:
+            # snapshot pages are looked up by row id anyway
+            return False
+        level = self.__provider.threadsafety
+        if level >= 2:
+            # connection can be shared, dedicated cursor is enough
+            return True
+        return level == 1 and self.__connection_factory is not None
+
+    def __schedule_prefetch(self, page: int):
+        """Starts reading the page in background."""
+        if not self.__prefetch:
+            return
+        with self.__lock:
+            if page in self.__cache:
+                return
+        if self.__pending:
+            if self.__pending[0] == page:
+                return
+            # user went elsewhere
+            self.__pending[1].cancel()
+        if not self.__executor:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="dbmp-prefetch"
+            )
+        future = self.__executor.submit(self.__prefetch_page, page)
+        self.__pending = (page, future)
+
+    def __wait_prefetch(self, page: int):
+        """Waits for the page if it's being prefetched."""
+        if not self.__pending or self.__pending[0] != page:
+            return
+        _, future = self.__pending
+        self.__pending = None
+        try:
+            future.result()
+        except (CancelledError, PoolExhaustedError) + driver_errors(
+            self.__conn
         ):
-            runs = True
-            yield row, self.__current_page * self.__number_of_rows + num
-        if runs:
-            self.__current_page += 1
-
-    def __fast_forward(self, runs: int = 0):
-        """Fast forward some pages to make going back possible."""
-        for _ in range(0, runs):
-            for _ in self.__select_feeder():
-                pass
-
-    def __ddl_feeder(self, forward=True):
-        """Feeder for DDL type queries."""
-        # creates, inserts, updates, deletes
-        if not forward or self.__fetched:
-            return  # StopIteration
-        if self.__curs.rowcount == -1:
+            # the page is going to be read in foreground
+            pass
+
+    def __prefetch_page(self, page: int):
+        """Reads the page into the cache, runs in the prefetch thread."""
+        if self.__cancelled.is_set():
+            return
+        if not self.__worker_reader:
+            if self.__provider.threadsafety < 2:
+                self.__worker_conn = self.__connection_factory()
+            self.__worker_reader = self.__new_reader(
+                self.__worker_conn or self.__conn
+            )
+        rows = self.__read_page(page, self.__worker_reader)
+        if rows and not self.__cancelled.is_set():
+            with self.__lock:
+                self.__cache.put(page, rows)
+
+    def __close_worker(self):
+        """Releases resources of the prefetch thread."""
+        if self.__worker_reader:
+            self.__worker_reader.close()
+            self.__worker_reader = None
+        if self.__worker_conn:
+            self.__worker_conn.close()
+            self.__worker_conn = None
+
+    def __ddl_page(self):
+        """Returns the result of DDL type query."""
+        rowcount = self.__reader.cursor.rowcount
+        if rowcount == -1:
             # create statement
-            yield ("Successfully executed!",), 1
+            rows = [("Successfully executed!",)]
         else:
             # insert or update or delete
-            yield (f"Affected rows: {self.__curs.rowcount}",), 1
+            rows = [(f"Affected rows: {rowcount}",)]
+        return Page(rows, range(1, 2), 1)
@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+
+from dbapi import driver_errors
+
+# connections open at once, idle and in use
+POOL_MAX_CONNECTIONS = 8
+# idle connections are closed after this, seconds
+POOL_MAX_IDLE = 600
+# idle connections are pinged before reuse after this, seconds
+VALIDATE_AFTER = 30
+
+
+class PoolExhaustedError(RuntimeError):
+    """All connections of the pool are in use."""
+
+
+class PooledConnection:
+    """
+    Connection lent by the pool for background work, close() returns it
+    to the pool. Everything else is done by the wrapped connection.
+    """
+
+    def __init__(self, pool, connection):
+        self.__wrapped__ = connection
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self.__wrapped__, name)
+
+    def close(self):
+        """Returns the connection to the pool, only once."""
+        if self._pool:
+            self._pool.release(self.__wrapped__)
+            self._pool = None
+
+
+class ConnectionPool:
+    """
+    Keeps warm connections by key, e.g. provider and connection string,
+    so switching back to a recent DB costs nothing. Connections are made
+    by connect() of acquire() when there is no idle one. Idle connection
+    is checked before reuse: closed ones are dropped, the ones idle for
+    VALIDATE_AFTER are pinged. Released connections are rolled back.
+    The total number of connections is capped, least recently used idle
+    connections are closed to make room. Thread safe.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = POOL_MAX_CONNECTIONS,
+        max_idle: float = POOL_MAX_IDLE,
+        validate_after: float = VALIDATE_AFTER,
+    ):
+        if max_connections < 1:
+            raise ValueError("number of connections must be greater than 0")
+        self.max_connections = max_connections
+        self.max_idle = max_idle
+        self.validate_after = validate_after
+        self.__lock = threading.Lock()
+        # id -> (key, connection, released at), least recently used first
+        self.__idle = OrderedDict()
+        # id -> key of connections in use
+        self.__in_use = {}
+        self.__closed = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def idle(self) -> int:
+        """Returns number of idle connections"""
+        return len(self.__idle)
+
+    @property
+    def in_use(self) -> int:
+        """Returns number of connections in use"""
+        return len(self.__in_use)
+
+    def acquire(self, key, connect):
+        """
+        Returns idle connection of the key or new one made by connect().
+        PoolExhaustedError is raised if all connections are in use.
+        """
+        while True:
+            with self.__lock:
+                if self.__closed:
+                    raise PoolExhaustedError("connection pool is closed")
+                expired = self.__expired()
+                entry = self.__take_idle(key)
+                if entry is None:
+                    if self.in_use + self.idle >= self.max_connections:
+                        if not self.__idle:
+                            raise PoolExhaustedError(
+                                f"all {self.max_connections} connections "
+                                "are in use"
+                            )
+                        # least recently used one makes room
+                        expired.append(self.__idle.popitem(last=False)[1][1])
+                    # reserved until connected
+                    reserved = object()
+                    self.__in_use[id(reserved)] = key
+            self.__close(expired)
+            if entry is None:
+                break
+            connection, released = entry
+            if self.__is_alive(connection, time.monotonic() - released):
+                self.hits += 1
+                return connection
+            with self.__lock:
+                self.__in_use.pop(id(connection), None)
+            self.__close([connection])
+        self.misses += 1
+        try:
+            connection = connect()
+        finally:
+            with self.__lock:
+                self.__in_use.pop(id(reserved))
+        with self.__lock:
+            self.__in_use[id(connection)] = key
+        return connection
+
+    def release(self, connection):
+        """
+        Returns the connection to the pool, the transaction is rolled
+        back. Broken connections and the ones of the closed pool are
+        closed.
+        """
+        with self.__lock:
+            key = self.__in_use.pop(id(connection), None)
+            closed = self.__closed
+        if key is None or closed:
+            self.__close([connection])
+            return
+        try:
+            connection.rollback()
+        except driver_errors(connection):
+            self.__close([connection])
+            return
+        with self.__lock:
+            self.__idle[id(connection)] = (key, connection, time.monotonic())
+
+    def discard(self, connection):
+        """Closes the connection, it's not returned to the pool."""
+        with self.__lock:
+            self.__in_use.pop(id(connection), None)
+        self.__close([connection])
+
+    def factory(self, key, connect):
+        """
+        Returns function which lends connections of the key for
+        background work, e.g. QueryPaginator's connection_factory.
+        The connection returns to the pool when it's closed.
+        """
+        return lambda: PooledConnection(self, self.acquire(key, connect))
+
+    def close(self):
+        """Closes idle connections, the ones in use are closed on release."""
+        with self.__lock:
+            self.__closed = True
+            idle = [entry[1] for entry in self.__idle.values()]
+            self.__idle.clear()
+        self.__close(idle)
+
+    def __take_idle(self, key):
+        """Takes most recently used idle connection of the key."""
+        for conn_id in reversed(self.__idle):
+            entry_key, connection, released = self.__idle[conn_id]
+            if entry_key == key:
+                del self.__idle[conn_id]
+                self.__in_use[conn_id] = key
+                return connection, released
+        return None
+
+    def __expired(self) -> list:
+        """Takes connections idle for longer than max_idle."""
+        now = time.monotonic()
+        expired = [
+            conn_id
+            for conn_id, (_, _, released) in self.__idle.items()
+            if now - released > self.max_idle
+        ]
+        return [self.__idle.pop(conn_id)[1] for conn_id in expired]
+
+    def __is_alive(self, connection, idle_for: float) -> bool:
+        """Checks if the connection may be reused."""
+        if getattr(connection, "closed", False):
+            # e.g. psycopg2 knows it without a round trip
+            return False
+        try:
+            curs = connection.cursor()
+            try:
+                if idle_for >= self.validate_after:
+                    curs.execute("SELECT 1")
+                    curs.fetchall()
+            finally:
+                curs.close()
+            if idle_for >= self.validate_after:
+                connection.rollback()
+        except driver_errors(connection):
+            return False
+        return True
+
+    def __close(self, connections: list):
+        """Closes the connections, errors of broken ones are ignored."""
+        for connection in connections:
+            try:
+                connection.close()
+            except driver_errors(connection):
+                pass
@@ -0,0 +1,152 @@
+import json
+import os
+from collections import namedtuple
+
+from dbapi import driver_module, paramstyle, threadsafety
+
+# JSON file with the list of provider dicts, the fields of Provider
+CONFIG_ENV = "DBMP_PROVIDERS"
+CONFIG_FILE = os.path.join("~", ".config", "dbmp", "providers.json")
+
+# DB-API driver and what it's capable of, None means the capability is
+# probed on the connection (named cursors are tried then):
+# name - shown to the user, module - DB-API module name,
+# named_cursors - server-side cursors with cursor(name=...),
+# scrollable - named cursors move with scroll() without reexecution,
+# threadsafety - DB-API level, connections are shared between threads
+# since 2, paramstyle - DB-API placeholders,
+# cancel - connection's method aborting the running statement from
+# other thread, "" if it can't be cancelled,
+# copy_export - CSV is written by the server with COPY TO STDOUT
+Provider = namedtuple(
+    "Provider",
+    "name module named_cursors scrollable threadsafety paramstyle cancel "
+    "copy_export",
+)
+# namedtuple() takes defaults since Python 3.7
+Provider.__new__.__defaults__ = (None,) * 6
+
+BUILTIN_PROVIDERS = (
+    Provider(
+        "SQLite",
+        "sqlite3",
+        named_cursors=False,
+        scrollable=False,
+        # connections are bound to their thread (check_same_thread)
+        threadsafety=1,
+        paramstyle="qmark",
+        cancel="interrupt",
+        copy_export=False,
+    ),
+    Provider(
+        "PostgreSQL",
+        "psycopg2",
+        named_cursors=True,
+        scrollable=True,
+        threadsafety=2,
+        paramstyle="pyformat",
+        cancel="cancel",
+        copy_export=True,
+    ),
+)
+
+# loaded registry, name -> Provider
+_registry = None
+
+
+def all_providers() -> list:
+    """
+    Returns registered providers, the built-in ones go first.
+    Providers of the config file are loaded once, they replace the
+    built-in ones of the same name.
+    """
+    global _registry
+    if _registry is None:
+        _registry = {}
+        for provider in BUILTIN_PROVIDERS + _config_providers():
+            _registry[provider.name] = provider
+    return list(_registry.values())
+
+
+def register(provider: Provider):
+    """Adds the provider or replaces the one of the same name."""
+    all_providers()
+    _registry[provider.name] = provider
+
+
+def provider_for(connection) -> Provider:
+    """
+    Returns the provider of the connection with all capabilities known,
+    the ones not declared are probed. Unknown drivers get capabilities
+    of their module.
+    """
+    module = driver_module(connection)
+    module_name = getattr(module, "__name__", type(connection).__module__)
+    declared = next(
+        (
+            provider
+            for provider in all_providers()
+            if provider.module == module_name
+        ),
+        Provider(module_name, module_name),
+    )
+    return resolve(declared, connection)
+
+
+def resolve(provider: Provider, connection) -> Provider:
+    """Returns the provider with capabilities probed on the connection."""
+    curs = None
+    if provider.copy_export is None:
+        curs = connection.cursor()
+        curs.close()
+    named_cursors = provider.named_cursors
+    if named_cursors is None:
+        # they are tried, the reader falls back if the driver refuses
+        named_cursors = True
+    cancel = provider.cancel
+    if cancel is None:
+        cancel = next(
+            (
+                name
+                for name in ("interrupt", "cancel")
+                if callable(getattr(connection, name, None))
+            ),
+            "",
+        )
+    return provider._replace(
+        named_cursors=named_cursors,
+        scrollable=(
+            named_cursors
+            if provider.scrollable is None
+            else provider.scrollable
+        ),
+        threadsafety=(
+            threadsafety(connection)
+            if provider.threadsafety is None
+            else provider.threadsafety
+        ),
+        paramstyle=provider.paramstyle or paramstyle(connection),
+        cancel=cancel,
+        copy_export=(
+            hasattr(curs, "copy_expert")
+            if provider.copy_export is None
+            else provider.copy_export
+        ),
+    )
+
+
+def _provider(fields: dict) -> Provider:
+    """Makes Provider of the dict."""
+    unknown = set(fields) - set(Provider._fields)
+    if unknown:
+        raise ValueError(f"unknown provider fields: {', '.join(unknown)}")
+    return Provider(**fields)
+
+
+def _config_providers() -> tuple:
+    """Returns providers of the config file if there is one."""
+    path = os.path.expanduser(os.environ.get(CONFIG_ENV) or CONFIG_FILE)
+    if not os.path.isfile(path):
+        return ()
+    with open(path, encoding="utf-8") as stream:
+        return tuple(_provider(fields) for fields in json.load(stream))
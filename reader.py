@@ -0,0 +1,182 @@
+from dbapi import driver_errors, is_select
+
+# max number of rows fetched at once while skipping pages
+SKIP_BATCH_ROWS = 100000
+
+
+class CursorReader:
+    """
+    Reads pages of the query from a cursor of the connection.
+    Keeps track of the cursor position, so sequential pages are read
+    without reexecuting the query.
+    Select queries are executed with a named (server-side) scrollable
+    cursor if the driver supports it, e.g. psycopg2. Scrollable cursors
+    are moved with scroll() instead of reexecuting the query. Named
+    cursors are not scrolled if scrollable is False.
+    """
+
+    def __init__(
+        self,
+        connection,
+        query: str,
+        rows_num: int,
+        server_side: bool = True,
+        scrollable: bool = True,
+    ):
+        self.__conn = connection
+        self.__query = query
+        self.__params = None
+        self.__number_of_rows = rows_num
+        self.__curs = None
+        # number of pages already read from the cursor,
+        # None if the query is not executed yet
+        self.__cursor_page = None
+        # rows of the next page read from the cursor in advance
+        self.__ahead = None
+        # named cursors are tried unless driver doesn't support them
+        self.__server_side = server_side
+        self.__named = False
+        self.__named_count = 0
+        self.__scrollable = False
+        self.__scroll_named = scrollable
+
+    @property
+    def cursor(self):
+        """Returns current cursor or None"""
+        return self.__curs
+
+    @property
+    def named(self) -> bool:
+        """Returns True if the query is read with a named cursor"""
+        return self.__named
+
+    def execute(self, query: str, params=None, commit: bool = True):
+        """
+        Executes query with the suitable cursor, the query is reexecuted
+        when the reader has to go back.
+        """
+        self.__query, self.__params = query, params
+        named = self.__server_side and params is None and is_select(query)
+        if named:
+            # named cursor can be executed only once, so new one is needed
+            curs = self.__named_cursor()
+            if curs is None:
+                named = False
+            else:
+                self.close()
+                self.__curs = curs
+        if not named and (not self.__curs or self.__named):
+            self.close()
+            # exception silently rerisen
+            self.__curs = self.__conn.cursor()
+        self.__named = named
+        self.__scrollable = hasattr(self.__curs, "scroll") and (
+            self.__scroll_named or not named
+        )
+        self.__ahead = None
+        self.__cursor_page = 0
+        # execute query
+        if params is None:
+            self.__curs.execute(query)
+        else:
+            self.__curs.execute(query, params)
+        if named:
+            # commit would close the named cursor, description of the
+            # named cursor is known after the first fetch only
+            self.__ahead = self.__curs.fetchmany(self.__number_of_rows)
+        elif commit:
+            self.__conn.commit()
+
+    def read(self, page: int) -> list:
+        """Reads rows of the page, the query is executed if needed."""
+        if self.__cursor_page is None:
+            self.__rewind()
+        target = page - 1
+        if self.__cursor_page != target and not self.__scroll(target):
+            if self.__cursor_page > target:
+                # cursor is beyond the page, it must be read from the very
+                # begining, so reexecute query
+                self.__rewind()
+            if not self.__fast_forward(target - self.__cursor_page):
+                # there are less pages than requested
+                return []
+        rows = self.fetch()
+        if rows:
+            self.__cursor_page += 1
+        return rows
+
+    def fetch(self) -> list:
+        """Fetches rows of the next page from the cursor."""
+        if self.__ahead is not None:
+            rows, self.__ahead = self.__ahead, None
+            return rows
+        return self.__curs.fetchmany(self.__number_of_rows)
+
+    def reset(self):
+        """Forgets the cursor, the query is executed again when needed."""
+        self.close()
+        self.__cursor_page = None
+
+    def close(self):
+        """Closes current cursor if any."""
+        self.__ahead = None
+        if self.__curs:
+            self.__curs.close()
+            self.__curs = None
+
+    def __named_cursor(self):
+        """Returns new named cursor or None if not supported."""
+        self.__named_count += 1
+        try:
+            return self.__conn.cursor(
+                name=f"dbmp_{id(self):x}_{self.__named_count}",
+                scrollable=self.__scroll_named,
+            )
+        except TypeError:
+            # driver doesn't support named cursors
+            self.__server_side = False
+            return None
+
+    def __scroll(self, target: int) -> bool:
+        """
+        Moves scrollable cursor right after the target page.
+        Returns False if the cursor can't be scrolled.
+        """
+        if not self.__scrollable:
+            return False
+        try:
+            self.__curs.scroll(target * self.__number_of_rows, "absolute")
+        except (IndexError, NotImplementedError) + driver_errors(self.__conn):
+            # out of bounds or not supported after all
+            self.__scrollable = False
+            return False
+        self.__ahead = None
+        self.__cursor_page = target
+        return True
+
+    def __rewind(self):
+        """Reexecutes the query."""
+        self.execute(self.__query, self.__params, commit=False)
+
+    def __fast_forward(self, runs: int = 0) -> bool:
+        """
+        Fast forward some pages, returns False if the end is reached.
+        Rows are skipped in big batches, pages are not formed.
+        """
+        if runs > 0 and self.__ahead is not None:
+            if not self.fetch():
+                return False
+            self.__cursor_page += 1
+            runs -= 1
+        rows_left = runs * self.__number_of_rows
+        while rows_left > 0:
+            size = min(rows_left, SKIP_BATCH_ROWS)
+            skipped = len(self.__curs.fetchmany(size))
+            rows_left -= skipped
+            if skipped < size:
+                # the end is reached, last page might be incomplete
+                skipped_rows = runs * self.__number_of_rows - rows_left
+                self.__cursor_page += -(-skipped_rows // self.__number_of_rows)
+                return False
+        self.__cursor_page += runs
+        return True
@@ -0,0 +1,245 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from keyset import strip_query
+from page_cache import approx_size
+
+# memory used by cached pages of all results
+RESULT_CACHE_BYTES = 256 * 1024 * 1024
+# first pages of the result which are cached
+RESULT_CACHE_PAGES = 16
+
+# literals, quoted identifiers and comments are kept as is, other
+# whitespaces are collapsed
+TOKEN_RE = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\$(\w*)\$.*?\$\1\$"
+    r"|--[^\n]*\n?|/\*.*?\*/|(\s+)",
+    re.S,
+)
+
+# cursor.description, page number -> rows of the first pages and
+# number of rows if it's known exactly
+CachedResult = namedtuple("CachedResult", "description pages total_rows")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Returns the query with whitespaces collapsed and trailing semicolons
+    removed, so the same query typed differently is cached once.
+    """
+    return TOKEN_RE.sub(
+        lambda match: " " if match.group(2) else match.group(),
+        strip_query(query),
+    )
+
+
+def sqlite_path(connection) -> str:
+    """Returns file of SQLite main database, empty for in-memory one."""
+    for _, name, path in connection.execute("PRAGMA database_list"):
+        if name == "main":
+            return path
+    return ""
+
+
+def database(connection):
+    """
+    Returns the DB of the connection: file of SQLite DB, empty for
+    in-memory one, DSN of other drivers or None if it's unknown.
+    """
+    connection = getattr(connection, "__wrapped__", connection)
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_path(connection)
+    return getattr(connection, "dsn", None)
+
+
+def cache_ttl(seconds: float) -> float:
+    """
+    Returns ResultCache's ttl for the age limit set by the user, 0 means
+    no limit: results whose data version can't be checked are kept as
+    well, till they are evicted or invalidated.
+    """
+    if seconds < 0:
+        raise ValueError("ttl must not be negative")
+    return seconds or math.inf
+
+
+def data_version(connection):
+    """
+    Returns value which changes when the data of the DB changes or None
+    if it can't be checked cheaply. SQLite's data_version tells changes
+    committed by other connections, total_changes the changes of the
+    connection itself, stat of the file and the WAL the rest,
+    e.g. replaced file.
+    """
+    connection = getattr(connection, "__wrapped__", connection)
+    if not isinstance(connection, sqlite3.Connection):
+        return None
+    path = sqlite_path(connection)
+    if not path:
+        return None
+    files = []
+    for name in (path, f"{path}-wal"):
+        try:
+            stat = os.stat(name)
+        except OSError:
+            continue
+        files.append((stat.st_mtime_ns, stat.st_size))
+    version = connection.execute("PRAGMA data_version").fetchone()[0]
+    return version, connection.total_changes, tuple(files)
+
+
+class ResultCache:
+    """
+    Keeps first pages of recently executed selects, so the repeated
+    query is shown without being executed, see QueryPaginator's
+    result_cache. Results are cached by normalized query, number of
+    rows per page and the connection. Cached result is served while
+    data_version() of the connection is the same. Results of DBs which
+    version can't be checked, e.g. PostgreSQL, are cached for ttl
+    seconds only if it's given. ttl limits the age of other results as
+    well. Least recently used results are evicted as soon as the size
+    of pages exceeds max_bytes. Results of the DB written to are dropped
+    with invalidate(). Thread safe.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_BYTES,
+        max_pages: int = RESULT_CACHE_PAGES,
+        ttl: float = None,
+    ):
+        if max_bytes < 0:
+            raise ValueError("number of bytes must not be negative")
+        if max_pages < 1:
+            raise ValueError("number of pages must be greater than 0")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be greater than 0")
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        # key -> [version, cached at, description, pages, total, size],
+        # least recently used first
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        """Returns approximate size of all cached pages in bytes"""
+        return self.__size
+
+    def key(self, connection, query: str, rows_num: int):
+        """
+        Returns key of the query's result, None if it can't be cached,
+        e.g. of SQLite in-memory DB, which is unique for the connection.
+        """
+        connection = getattr(connection, "__wrapped__", connection)
+        db = database(connection)
+        if db == "":
+            return None
+        return id(connection), db, rows_num, normalize_query(query)
+
+    def version(self, connection):
+        """Returns version of the connection's data, see data_version()."""
+        return data_version(connection)
+
+    def get(self, key, version):
+        """
+        Returns CachedResult of the key if it's still valid, None
+        otherwise. Outdated result is dropped.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key) if key else None
+            if entry is None or not self.__is_valid(entry, version):
+                if entry is not None:
+                    self.__drop(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return CachedResult(entry[2], dict(entry[3]), entry[4])
+
+    def put_page(
+        self, key, version, description, page: int, rows: list, total_rows
+    ) -> bool:
+        """
+        Stores rows of the page read with the version of the data.
+        Only first max_pages pages are stored.
+        """
+        if not key or (version is None and self.ttl is None):
+            return False
+        size = approx_size(rows) if rows else 0
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] != version:
+                # the result has changed
+                self.__drop(key)
+                entry = None
+            if entry is None:
+                entry = [version, time.monotonic(), description, {}, None, 0]
+                self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            if total_rows is not None:
+                entry[4] = total_rows
+            pages = entry[3]
+            if not rows or page in pages or len(pages) >= self.max_pages:
+                return False
+            if size > self.max_bytes:
+                # the page alone exceeds the budget
+                return False
+            pages[page] = rows
+            entry[5] += size
+            self.__size += size
+            while self.__size > self.max_bytes:
+                self.__drop(next(iter(self.__entries)))
+                self.evictions += 1
+            return True
+
+    def put_total(self, key, version, total_rows: int):
+        """Stores exact number of rows of the cached result."""
+        with self.__lock:
+            entry = self.__entries.get(key) if key else None
+            if entry is not None and entry[0] == version:
+                entry[4] = total_rows
+
+    def invalidate(self, connection):
+        """
+        Removes results of the connection's DB, e.g. after the DB was
+        written to. All results are removed if the DB is unknown.
+        """
+        db = database(connection)
+        with self.__lock:
+            for key in list(self.__entries):
+                if db is None or key[1] == db:
+                    self.__drop(key)
+
+    def clear(self):
+        """Removes all results, counters are left intact."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def __is_valid(self, entry, version) -> bool:
+        """Checks if the result is of the same data and isn't too old."""
+        if entry[0] != version:
+            return False
+        if self.ttl is not None:
+            return time.monotonic() - entry[1] <= self.ttl
+        # the version can't be checked without ttl
+        return version is not None
+
+    def __drop(self, key):
+        """Removes the result of the key."""
+        entry = self.__entries.pop(key)
+        self.__size -= entry[5]
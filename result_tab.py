@@ -0,0 +1,122 @@
+from PyQt5 import QtCore
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from worker import PaginatorWorker
+
+
+class ResultTab(QObject):
+    """
+    Result set of one tab: its own paginator worker running in its own
+    thread, the connection and the state of paging shown by the form.
+    Queries of different tabs run concurrently. The model of the tab is
+    kept only while the tab is shown, the hidden one keeps the bookmark
+    of its page, which is read again when the tab is shown.
+    """
+
+    # requests to the paginator worker
+    execute_requested = pyqtSignal(object)
+    page_requested = pyqtSignal(bool, int)
+    goto_requested = pyqtSignal(int, int)
+    window_requested = pyqtSignal(int)
+    export_requested = pyqtSignal(object)
+    import_requested = pyqtSignal(object)
+    suspend_requested = pyqtSignal()
+    close_requested = pyqtSignal(object)
+    shutdown_requested = pyqtSignal(object)
+
+    def __init__(
+        self, parent=None, pool=None, title: str = "", result_cache=None
+    ):
+        super().__init__(parent)
+        self.title = title
+        self.conn = None
+        # provider name and connection string of the connection
+        self.connection = None
+        # DB-API module of the connection and errors of the driver
+        self.db_provider = None
+        self.errors = ()
+        self.model = None
+        # paginator runs in the worker thread
+        self.paginator_active = False
+        self.busy = False
+        self.rows_fetched = 0
+        # current page and number of pages, e.g. "~20"
+        self.current_page = 0
+        self.total_pages = ""
+        # pages are appended to the model while scrolling
+        self.incremental = False
+        self.appending = False
+        # whole result is scrolled, a window of pages is kept in memory
+        self.virtual = False
+        self.rows_num = 0
+        self.total_rows = None
+        # page of the navigation request in flight
+        self.target_page = None
+        # page shown when the tab is shown again
+        self.bookmark = 0
+        # executed query and status of the export or the import
+        self.query = ""
+        self.transfer_status = ""
+        # time of the last result and StatementResults of the script
+        self.update_time = ""
+        self.script_results = []
+        # running time of the query
+        self.elapsed = QtCore.QElapsedTimer()
+        self.__start_worker(pool, result_cache)
+
+    def __start_worker(self, pool, result_cache):
+        """Moves paginator worker to its own thread and connects it."""
+        self.worker_thread = QtCore.QThread(self)
+        self.worker = PaginatorWorker(pool=pool, result_cache=result_cache)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.finished.connect(self.worker.deleteLater)
+        self.execute_requested.connect(self.worker.execute)
+        self.page_requested.connect(self.worker.page)
+        self.goto_requested.connect(self.worker.goto_page)
+        self.window_requested.connect(self.worker.read_page)
+        self.export_requested.connect(self.worker.export)
+        self.import_requested.connect(self.worker.import_file)
+        self.suspend_requested.connect(self.worker.suspend)
+        self.close_requested.connect(self.worker.close)
+        self.shutdown_requested.connect(self.worker.shutdown)
+        self.worker_thread.start()
+
+    def request_window(self, page: int):
+        """Requests the page for the virtual model."""
+        # the worker drops reads the view has scrolled away from
+        self.worker.window_page = page
+        self.window_requested.emit(page)
+
+    def suspend(self, bookmark: int):
+        """Drops the model of the hidden tab, the page is bookmarked."""
+        self.model = None
+        self.appending = False
+        self.bookmark = bookmark
+        self.suspend_requested.emit()
+
+    def reset_conn(self):
+        """Closes the paginator and releases the connection."""
+        self.paginator_active = False
+        if self.conn:
+            # paginator and connection belong to the worker's thread
+            self.close_requested.emit(self.conn)
+            self.conn = None
+            self.connection = None
+            self.db_provider = None
+            self.errors = ()
+
+    def shutdown(self):
+        """
+        Closes the connection and stops the worker's thread, running
+        request is cancelled. Use wait() for the thread to finish.
+        """
+        self.paginator_active = False
+        if self.busy:
+            # don't wait for the running query
+            self.worker.cancel()
+        self.shutdown_requested.emit(self.conn)
+        self.conn = None
+
+    def wait(self):
+        """Waits for the worker's thread to finish."""
+        self.worker_thread.wait()
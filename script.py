@@ -0,0 +1,189 @@
+import re
+import time
+from collections import namedtuple
+
+from dbapi import driver_errors, driver_module
+
+# result of the statement: its number starting with 1, the text,
+# rowcount of the cursor (-1 if unknown) and the time taken in seconds
+StatementResult = namedtuple(
+    "StatementResult", "number statement rowcount seconds"
+)
+
+# SQLite triggers have statements inside of BEGIN ... END
+TRIGGER_RE = re.compile(r"^create\s+(temp\s+|temporary\s+)?trigger\b", re.I)
+TRIGGER_END_RE = re.compile(r"\bend$", re.I)
+# dollar quote of PostgreSQL, e.g. $$ or $body$
+DOLLAR_QUOTE_RE = re.compile(r"\$(?:[A-Za-z_]\w*)?\$")
+
+
+class ScriptError(RuntimeError):
+    """
+    Statement of the script failed or the script was cancelled.
+    number is the number of the statement, results are of the statements
+    executed before.
+    """
+
+    def __init__(self, message: str, number: int, results: list):
+        super().__init__(message)
+        self.number = number
+        self.results = results
+
+
+def split_statements(script: str) -> list:
+    """
+    Splits the script into statements by semicolons which are not in
+    quotes, comments, dollar quotes or SQLite trigger bodies.
+    Empty statements and comments around statements are dropped.
+    """
+    statements = []
+    # first character of the current statement which is not a comment
+    # and the end of its last one
+    code_start = None
+    code_end = 0
+    pos = 0
+    while pos < len(script):
+        char = script[pos]
+        if script.startswith("--", pos):
+            end = script.find("\n", pos)
+            pos = len(script) if end < 0 else end + 1
+            continue
+        if script.startswith("/*", pos):
+            pos = _comment_end(script, pos)
+            continue
+        if char == ";":
+            if code_start is not None:
+                statement = script[code_start:code_end]
+                if TRIGGER_RE.match(statement) and not TRIGGER_END_RE.search(
+                    statement
+                ):
+                    # semicolon of the trigger's body
+                    pos += 1
+                    continue
+                statements.append(statement)
+            code_start = None
+            pos += 1
+            continue
+        if not char.isspace() and code_start is None:
+            code_start = pos
+        if char in "'\"":
+            pos = _quote_end(script, pos, char)
+        elif char == "$" and not (pos and _word_char(script[pos - 1])):
+            pos = _dollar_quote_end(script, pos)
+        else:
+            pos += 1
+        if not char.isspace():
+            code_end = pos
+    if code_start is not None:
+        statements.append(script[code_start:code_end])
+    return statements
+
+
+def run_script(
+    connection, statements, transaction: bool = True, cancel_event=None
+) -> list:
+    """
+    Executes the statements (or the script which is split) one by one
+    with one cursor and returns StatementResult of every statement.
+    Within the transaction all statements are committed at the end and
+    all of them are rolled back if any fails, otherwise every statement
+    is committed. ScriptError is raised if the statement or the commit
+    fails or cancel_event (threading.Event) is set, number of the failed
+    commit follows the last statement.
+    """
+    if isinstance(statements, str):
+        statements = split_statements(statements)
+    results = []
+    curs = connection.cursor()
+    try:
+        if transaction:
+            _begin(connection, curs)
+        for number, statement in enumerate(statements, 1):
+            if cancel_event and cancel_event.is_set():
+                connection.rollback()
+                raise ScriptError("script cancelled", number, results)
+            started = time.perf_counter()
+            try:
+                curs.execute(statement)
+                if not transaction:
+                    connection.commit()
+            except driver_errors(connection) as err:
+                connection.rollback()
+                raise ScriptError(
+                    f"statement {number} failed: {err}", number, results
+                ) from err
+            results.append(
+                StatementResult(
+                    number,
+                    statement,
+                    curs.rowcount,
+                    time.perf_counter() - started,
+                )
+            )
+        try:
+            # deferred constraints are checked here
+            connection.commit()
+        except driver_errors(connection) as err:
+            connection.rollback()
+            raise ScriptError(
+                f"commit failed: {err}", len(statements) + 1, results
+            ) from err
+    finally:
+        curs.close()
+    return results
+
+
+def _begin(connection, curs):
+    """
+    Starts transaction explicitly for SQLite, which doesn't start it
+    before DDL. Other drivers start it with the first statement.
+    """
+    module = driver_module(connection)
+    if getattr(module, "__name__", "") == "sqlite3":
+        if not connection.in_transaction:
+            curs.execute("BEGIN")
+
+
+def _word_char(char: str) -> bool:
+    """Checks if the character may be a part of an identifier."""
+    return char.isalnum() or char in "_$"
+
+
+def _quote_end(script: str, pos: int, quote: str) -> int:
+    """Returns position after the quoted string, doubled quotes inside."""
+    pos += 1
+    while True:
+        end = script.find(quote, pos)
+        if end < 0:
+            return len(script)
+        if script.startswith(quote, end + 1):
+            pos = end + 2
+            continue
+        return end + 1
+
+
+def _comment_end(script: str, pos: int) -> int:
+    """Returns position after the block comment, which may be nested."""
+    depth = 0
+    while pos < len(script):
+        if script.startswith("/*", pos):
+            depth += 1
+            pos += 2
+        elif script.startswith("*/", pos):
+            depth -= 1
+            pos += 2
+            if not depth:
+                return pos
+        else:
+            pos += 1
+    return pos
+
+
+def _dollar_quote_end(script: str, pos: int) -> int:
+    """Returns position after the dollar quoted string or the dollar."""
+    match = DOLLAR_QUOTE_RE.match(script, pos)
+    if not match:
+        # e.g. parameter $1
+        return pos + 1
+    end = script.find(match.group(), match.end())
+    return len(script) if end < 0 else end + len(match.group())
@@ -0,0 +1,119 @@
+import itertools
+import os
+import sqlite3
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from keyset import strip_query
+
+# memory mapped I/O for the spill file
+SPILL_MMAP_SIZE = 256 * 1024 * 1024
+# types stored by SQLite as is
+NATIVE_TYPES = (type(None), int, float, str, bytes)
+# types converted to strings, other types are converted with repr
+STR_TYPES = (Decimal, date, datetime, time)
+
+# snapshot tables must not clash within the connection
+_counter = itertools.count(1)
+
+
+def spill_value(value):
+    """Converts the value into one SQLite is able to store."""
+    if isinstance(value, NATIVE_TYPES):
+        return value
+    if isinstance(value, STR_TYPES):
+        return str(value)
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return repr(value)
+
+
+class Snapshot:
+    """
+    Result of the query materialized once into SQLite table which row ids
+    are dense (1, 2, 3 ...), so any range of rows is read by row id.
+    SQLite queries are materialized into a temp table of the very same
+    connection, results of other providers are spilled into a temporary
+    SQLite file.
+    """
+
+    def __init__(self, connection, query: str, batches=None):
+        self.__table = f"dbmp_snapshot_{next(_counter)}"
+        self.__path = None
+        if isinstance(connection, sqlite3.Connection):
+            self.__conn = connection
+            self.__table = f"temp.{self.__table}"
+            self.__create_temp_table(query)
+        else:
+            fd, self.__path = tempfile.mkstemp(suffix=".sqlite")
+            os.close(fd)
+            self.__conn = sqlite3.connect(self.__path)
+            self.__spill(batches or ())
+        self.__row_count = (
+            self.__conn.execute(
+                f"SELECT max(rowid) FROM {self.__table}"
+            ).fetchone()[0]
+            or 0
+        )
+
+    @property
+    def row_count(self) -> int:
+        """Returns number of rows in the snapshot"""
+        return self.__row_count
+
+    @property
+    def spill_file(self):
+        """Returns path to the spill file or None"""
+        return self.__path
+
+    def rows(self, first: int, last: int) -> list:
+        """Returns rows from the first till the last one, starts with 1."""
+        return self.__conn.execute(
+            f"SELECT * FROM {self.__table} "
+            "WHERE rowid BETWEEN ? AND ? ORDER BY rowid",
+            (first, last),
+        ).fetchall()
+
+    def close(self):
+        """Drops the snapshot."""
+        if self.__path:
+            self.__conn.close()
+            os.remove(self.__path)
+            self.__path = None
+        elif self.__table:
+            self.__conn.execute(f"DROP TABLE IF EXISTS {self.__table}")
+            self.__conn.commit()
+        self.__table = None
+
+    def __create_temp_table(self, query: str):
+        """Materializes SQLite query inside the connection."""
+        self.__conn.execute(
+            f"CREATE TABLE {self.__table} AS "
+            f"SELECT * FROM ({strip_query(query)})"
+        )
+        self.__conn.commit()
+
+    def __spill(self, batches):
+        """Moves batches of rows into the spill file."""
+        self.__conn.execute("PRAGMA journal_mode = OFF")
+        self.__conn.execute("PRAGMA synchronous = OFF")
+        self.__conn.execute(f"PRAGMA mmap_size = {SPILL_MMAP_SIZE}")
+        insert = None
+        for batch in batches:
+            if insert is None:
+                columns = [f"c{num}" for num in range(len(batch[0]))]
+                self.__conn.execute(
+                    f"CREATE TABLE {self.__table} ({', '.join(columns)})"
+                )
+                insert = "INSERT INTO {} VALUES ({})".format(
+                    self.__table, ", ".join("?" * len(columns))
+                )
+            self.__conn.executemany(
+                insert,
+                (tuple(spill_value(value) for value in row) for row in batch),
+            )
+        if insert is None:
+            # empty result
+            self.__conn.execute(f"CREATE TABLE {self.__table} (c0)")
+        self.__conn.commit()
@@ -0,0 +1,128 @@
+import sqlite3
+import unittest
+
+from page_cache import PageCache
+from paginator import QueryPaginator
+from settings import CREATE, INSERT, SELECT
+
+
+class TestPageCache(unittest.TestCase):
+    """Testing PageCache"""
+
+    def test_get_missing(self):
+        """Missing page counts as a miss"""
+        cache = PageCache()
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 0)
+
+    def test_put_get(self):
+        """Stored page counts as a hit"""
+        cache = PageCache()
+        cache.put(1, [(1, "a")])
+        self.assertEqual(cache.get(1), [(1, "a")])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 0)
+
+    def test_evict_by_pages(self):
+        """Least recently used page is evicted first"""
+        cache = PageCache(max_pages=2)
+        cache.put(1, [(1,)])
+        cache.put(2, [(2,)])
+        cache.get(1)
+        cache.put(3, [(3,)])
+        self.assertIn(1, cache)
+        self.assertNotIn(2, cache)
+        self.assertIn(3, cache)
+
+    def test_evict_by_bytes(self):
+        """Pages are evicted when the size budget is exceeded"""
+        page = [("x" * 1000,)] * 10
+        cache = PageCache(max_pages=100, max_bytes=25000)
+        for num in range(1, 6):
+            cache.put(num, page)
+        self.assertLessEqual(cache.size, 25000)
+        self.assertLess(len(cache), 5)
+        self.assertIn(5, cache)
+
+    def test_page_too_big(self):
+        """Page bigger than the budget is not stored"""
+        cache = PageCache(max_bytes=10)
+        self.assertFalse(cache.put(1, [("x" * 100,)]))
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled(self):
+        """Zero pages disables the cache"""
+        cache = PageCache(max_pages=0)
+        self.assertFalse(cache.put(1, [(1,)]))
+
+    def test_negative(self):
+        """Negative limits are not allowed"""
+        with self.assertRaises(ValueError):
+            PageCache(max_pages=-1)
+        with self.assertRaises(ValueError):
+            PageCache(max_bytes=-1)
+
+
+class TestSQLitePaginatorCache(unittest.TestCase):
+    """Testing page cache of QueryPaginator"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_backward_from_cache(self):
+        """Going backward doesn't reexecute the query"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        for _ in range(3):
+            _ = list(paginator.feeder(forward=True))
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[1] for i in res], list(range(8, 15)))
+        self.assertEqual(self.statements.count(SELECT), 1)
+        self.assertEqual(paginator.cache_hits, 1)
+        self.assertEqual(paginator.cache_misses, 3)
+
+    def test_forward_again_from_cache(self):
+        """Going forward after going backward is served from the cache"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        for _ in range(3):
+            _ = list(paginator.feeder(forward=True))
+        for _ in range(2):
+            _ = list(paginator.feeder(forward=False))
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[0][1] for i in res], list(range(8, 15)))
+        self.assertEqual(paginator.current_page, 2)
+        self.assertEqual(paginator.cache_hits, 3)
+        self.assertEqual(self.statements.count(SELECT), 1)
+
+    def test_backward_evicted(self):
+        """Evicted pages are read again from the DB"""
+        paginator = QueryPaginator(
+            rows_num=5, query=SELECT, connection=self.conn, cache_pages=1
+        )
+        for _ in range(4):
+            _ = list(paginator.feeder(forward=True))
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[0][1] for i in res], list(range(11, 16)))
+        self.assertEqual(paginator.current_page, 3)
+        self.assertEqual(paginator.cache_hits, 0)
+        self.assertEqual(self.statements.count(SELECT), 2)
+        # cursor continues from the reread page
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[0][1] for i in res], list(range(16, 21)))
+        self.assertEqual(self.statements.count(SELECT), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+import unittest
+
+from dbapi import cancel_connection
+from paginator import QueryCancelledError, QueryPaginator
+from settings import CREATE, INSERT, SELECT
+
+# never ending query
+SELECT_ENDLESS = (
+    "with recursive c(x) as (select 1 union all select x + 1 from c) "
+    "select count(*) from c"
+)
+# long result which takes time to skip
+SELECT_LONG = (
+    "with recursive c(x) as (select 1 union all select x + 1 from c) "
+    "select x from c"
+)
+
+
+class TestSQLitePaginatorCancel(unittest.TestCase):
+    """Testing cancellation and timeout of QueryPaginator"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_bad_timeout(self):
+        """Timeout must be positive"""
+        with self.assertRaises(ValueError):
+            QueryPaginator(query=SELECT, connection=self.conn, timeout=0)
+
+    def test_timeout_at_execution(self):
+        """Query is aborted by the timeout, the connection is usable"""
+        with self.assertRaises(QueryCancelledError) as ctx:
+            QueryPaginator(
+                query=SELECT_ENDLESS, connection=self.conn, timeout=0.1
+            )
+        self.assertIn("timeout", str(ctx.exception))
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn
+        )
+        self.assertEqual(len(list(paginator.feeder(forward=True))), 10)
+
+    def test_cancel_page(self):
+        """Reading of the page is cancelled, the paginator is usable"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT_LONG, connection=self.conn
+        )
+        _ = list(paginator.feeder(forward=True))
+        timer = threading.Timer(0.1, paginator.cancel)
+        timer.start()
+        with self.assertRaises(QueryCancelledError) as ctx:
+            list(paginator.goto_page(10**9))
+        timer.join()
+        self.assertEqual(str(ctx.exception), "query cancelled")
+        self.assertEqual(paginator.current_page, 1)
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[0][0] for i in res], list(range(11, 21)))
+
+    def test_cancel_idle(self):
+        """Cancel without running statement doesn't abort the next page"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn
+        )
+        paginator.fetch_page()
+        # the cursor of the query is pending
+        paginator.cancel()
+        self.assertEqual(paginator.fetch_page().rows[0][1], 11)
+
+    def test_timeout_not_reached(self):
+        """Fast queries are not affected by the timeout"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn, timeout=5
+        )
+        for _ in range(3):
+            res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[1] for i in res], list(range(21, 26)))
+
+    def test_cancel_connection(self):
+        """Idle connection is not affected by cancellation"""
+        self.assertTrue(cancel_connection(self.conn))
+        self.assertEqual(
+            self.conn.execute("select count(*) from t1").fetchone(), (25,)
+        )
+        self.assertFalse(cancel_connection(object()))
+
+
+if __name__ == "__main__":
+    unittest.main()
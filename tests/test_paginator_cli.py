@@ -0,0 +1,71 @@
+import io
+import os
+import sqlite3
+import subprocess
+import sys
+import unittest
+
+from dbmp import format_table, main, stream_pages
+from formatters import RowFormatter
+from paginator import QueryPaginator
+from settings import NW_SELECT, NW_SQLITE
+
+ROOT = os.path.join(os.path.dirname(__file__), os.pardir)
+
+
+class TestConsole(unittest.TestCase):
+    """Testing console front end"""
+
+    def test_format_table(self):
+        """Columns are aligned, row numbers are on the left"""
+        lines = format_table(["a", "bb"], [("x", ""), ("yyy", "z")], [9, 10])
+        self.assertEqual(
+            lines,
+            [
+                "#  | a   | bb",
+                "---+-----+---",
+                " 9 | x   |",
+                "10 | yyy | z",
+            ],
+        )
+
+    def test_stream_pages(self):
+        """All pages are written from the first one"""
+        conn = sqlite3.connect(NW_SQLITE)
+        paginator = QueryPaginator(
+            rows_num=100, query=NW_SELECT, connection=conn
+        )
+        out = io.StringIO()
+        rows = stream_pages(
+            paginator, RowFormatter(paginator.description), out, "csv", 2
+        )
+        conn.close()
+        self.assertEqual(rows, 730)
+        self.assertEqual(len(out.getvalue().splitlines()), 731)
+
+    def test_errors(self):
+        """Errors are reported with the exit code"""
+        self.assertEqual(
+            main(["sqlite", "no_such_file.sqlite", "select 1"]), 2
+        )
+        self.assertEqual(main(["sqlite", NW_SQLITE, "select x", "-b"]), 1)
+
+    def test_no_qt(self):
+        """Qt is not imported"""
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import dbmp, sys; print(set(sys.modules))",
+            ],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        ).stdout
+        self.assertNotIn("PyQt5", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
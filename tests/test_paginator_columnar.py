@@ -0,0 +1,95 @@
+import sqlite3
+import unittest
+from array import array
+from decimal import Decimal
+
+from columnar import ColumnarPage, PageChain, cell, encode_column
+from paginator import QueryPaginator
+from settings import NW_SELECT, NW_SQLITE
+
+
+class TestColumnar(unittest.TestCase):
+    """Testing columnar storage of pages"""
+
+    def test_int_column(self):
+        """Integers are stored in array, NULLs in the mask"""
+        column = encode_column([1, None, 3])
+        self.assertIsInstance(column.data, array)
+        self.assertEqual(column.data.typecode, "q")
+        self.assertEqual(list(column.nulls), [0, 1, 0])
+        column = encode_column([1, 2**70])
+        self.assertIsInstance(column.data, list)
+
+    def test_float_column(self):
+        """Floats are stored in array"""
+        column = encode_column([1.5, 2.5])
+        self.assertEqual(column.data.typecode, "d")
+        self.assertIsNone(column.nulls)
+
+    def test_string_column(self):
+        """Repeated strings are stored once"""
+        column = encode_column(["a", "b", "a", None, "a", "b"])
+        self.assertEqual(column.table, ["a", "b"])
+        self.assertEqual(list(column.data), [0, 1, 0, 0, 0, 1])
+        column = encode_column(["a", "b", "c"])
+        self.assertIsNone(column.table)
+
+    def test_mixed_column(self):
+        """Mixed types and bool are kept as is"""
+        self.assertEqual(encode_column([1, "a"]).data, [1, "a"])
+        self.assertEqual(encode_column([True, False]).data, [True, False])
+
+    def test_page(self):
+        """Rows are read back as they were"""
+        rows = [
+            (1, "x", 1.5, Decimal("2")),
+            (2, "x", None, None),
+            (None, "x", 3.5, b"\x00"),
+        ]
+        page = ColumnarPage(rows, 11)
+        self.assertEqual(len(page), 3)
+        self.assertEqual(page.column_count, 4)
+        self.assertEqual(page.numbers, range(11, 14))
+        self.assertEqual(list(page), rows)
+        self.assertEqual(page[-1], rows[-1])
+        self.assertIsNone(page.value(2, 0))
+        self.assertEqual(cell(page, 1, 1), "x")
+        self.assertEqual(cell(rows, 1, 1), "x")
+        with self.assertRaises(IndexError):
+            page[3]
+
+    def test_empty_page(self):
+        """Empty page has no rows and columns"""
+        page = ColumnarPage([], 1)
+        self.assertEqual(len(page), 0)
+        self.assertEqual(page.column_count, 0)
+        self.assertEqual(list(page), [])
+
+    def test_chain(self):
+        """Pages are read as one sequence"""
+        chain = PageChain()
+        self.assertEqual(chain.numbers, range(0))
+        chain.append(ColumnarPage([(1,), (2,)], 1))
+        chain.append(ColumnarPage([], 3))
+        chain.append(ColumnarPage([(3,)], 3))
+        self.assertEqual(len(chain), 3)
+        self.assertEqual(chain.numbers, range(1, 4))
+        self.assertEqual([chain.value(num, 0) for num in range(3)], [1, 2, 3])
+        self.assertEqual(chain[2], (3,))
+        self.assertEqual(cell(chain, 1, 0), 2)
+
+    def test_nw_page(self):
+        """Page of NW_SELECT is stored without losses"""
+        conn = sqlite3.connect(NW_SQLITE)
+        paginator = QueryPaginator(
+            rows_num=500, query=NW_SELECT, connection=conn
+        )
+        result = paginator.fetch_page()
+        page = ColumnarPage(result.rows, result.numbers.start)
+        self.assertEqual(list(page), result.rows)
+        self.assertEqual(page.numbers, result.numbers)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
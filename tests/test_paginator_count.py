@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from counter import count_query, estimate_rows, single_table
+from paginator import QueryPaginator
+from settings import CREATE, DELETE, INSERT, NW_SELECT, SELECT, SELECT_EMPTY
+
+# never ending query
+SELECT_ENDLESS = (
+    "with recursive c(x) as (select 1 union all select x + 1 from c) "
+    "select x from c"
+)
+
+
+class TestCounter(unittest.TestCase):
+    """Testing counter module"""
+
+    def test_count_query(self):
+        """User's query is wrapped"""
+        self.assertEqual(
+            count_query(SELECT),
+            "SELECT COUNT(*) FROM (select * from t1) AS dbmp_count",
+        )
+
+    def test_count_commented_query(self):
+        """Trailing comment of the query is dropped"""
+        self.assertEqual(
+            count_query(f"{SELECT}; -- all rows"),
+            "SELECT COUNT(*) FROM (select * from t1) AS dbmp_count",
+        )
+
+    def test_single_table(self):
+        """Table is taken from simple queries only"""
+        self.assertEqual(single_table(SELECT), "t1")
+        self.assertEqual(single_table(NW_SELECT), "order")
+        self.assertEqual(single_table('select a from "T 1" order by a'), "T 1")
+        self.assertIsNone(single_table(SELECT_EMPTY))
+        self.assertIsNone(single_table("select * from t1 join t2 using(a)"))
+
+
+class TestSQLitePaginatorCount(unittest.TestCase):
+    """Testing total number of rows of QueryPaginator"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.counted = threading.Event()
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.path)
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def test_estimate(self):
+        """Estimate comes from sqlite_stat1"""
+        self.assertIsNone(estimate_rows(self.conn, SELECT))
+        self.conn.execute("analyze")
+        self.assertEqual(estimate_rows(self.conn, SELECT), 25)
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn, count_rows=True
+        )
+        self.assertEqual(paginator.total_rows, 25)
+        self.assertEqual(paginator.total_pages, 3)
+        self.assertFalse(paginator.total_exact)
+
+    def test_no_count(self):
+        """Nothing is known until the end is reached"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn
+        )
+        _ = list(paginator.feeder(forward=True))
+        self.assertIsNone(paginator.total_rows)
+        self.assertIsNone(paginator.total_pages)
+        for _ in range(2):
+            _ = list(paginator.feeder(forward=True))
+        self.assertEqual(paginator.total_rows, 25)
+        self.assertTrue(paginator.total_exact)
+
+    def test_empty(self):
+        """Empty result has no pages"""
+        paginator = QueryPaginator(query=SELECT_EMPTY, connection=self.conn)
+        _ = list(paginator.feeder(forward=True))
+        self.assertEqual(paginator.total_rows, 0)
+        self.assertEqual(paginator.total_pages, 0)
+
+    def test_exact_count(self):
+        """Rows are counted in background"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT_EMPTY.replace("> 100", "> 3"),
+            connection=self.conn,
+            count_rows=True,
+            connection_factory=self.connect,
+            count_callback=self.counted.set,
+        )
+        self.assertTrue(self.counted.wait(5))
+        self.assertEqual(paginator.total_rows, 22)
+        self.assertEqual(paginator.total_pages, 3)
+        self.assertTrue(paginator.total_exact)
+        paginator.close()
+
+    def test_exact_count_commented(self):
+        """Query ending with a comment is counted"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=f"{SELECT} -- all rows",
+            connection=self.conn,
+            count_rows=True,
+            connection_factory=self.connect,
+            count_callback=self.counted.set,
+        )
+        self.assertTrue(self.counted.wait(5))
+        self.assertEqual(paginator.total_rows, 25)
+        paginator.close()
+
+    def test_snapshot(self):
+        """Snapshot knows the number of rows at once"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT,
+            connection=self.conn,
+            snapshot=True,
+            count_rows=True,
+        )
+        self.assertEqual(paginator.total_rows, 25)
+        self.assertTrue(paginator.total_exact)
+        paginator.close()
+
+    def test_ddl(self):
+        """DDL is not counted"""
+        paginator = QueryPaginator(
+            query=DELETE,
+            connection=self.conn,
+            count_rows=True,
+            connection_factory=self.connect,
+        )
+        self.assertIsNone(paginator.total_rows)
+        paginator.close()
+
+    def test_close_stops_count(self):
+        """Endless count is aborted by close()"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT_ENDLESS,
+            connection=self.conn,
+            count_rows=True,
+            connection_factory=self.connect,
+        )
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[1] for i in res], list(range(1, 11)))
+        paginator.close()
+        self.assertIsNone(paginator.total_rows)
+
+    def test_stop_background(self):
+        """Count is aborted, paging goes on"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT_ENDLESS,
+            connection=self.conn,
+            count_rows=True,
+            connection_factory=self.connect,
+        )
+        paginator.fetch_page()
+        paginator.stop_background()
+        self.assertIsNone(paginator.total_rows)
+        self.assertEqual(paginator.fetch_page().rows[0][0], 11)
+        paginator.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
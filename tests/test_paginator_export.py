@@ -0,0 +1,246 @@
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import sys
+import threading
+import types
+import unittest
+
+from export import (
+    ExportCancelledError,
+    copy_query,
+    export_format,
+    export_query,
+)
+from providers import Provider
+from settings import CREATE, INSERT, NW_SELECT, NW_SQLITE, SELECT, UPDATE
+
+# module of the fake driver, its errors are of sqlite3
+sys.modules["copy_driver"] = types.ModuleType("copy_driver")
+sys.modules["copy_driver"].Error = sqlite3.Error
+
+
+class CopyCursor:
+    """Cursor writing CSV of the query like psycopg2's copy_expert"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+
+    def copy_expert(self, sql, stream):
+        self.connection.statements.append(sql)
+        lines = [b"a,b\n"] + [b"x,%d\n" % num for num in range(1, 26)]
+        for line in lines:
+            if self.connection.cancelled:
+                raise sqlite3.OperationalError("canceling statement")
+            stream.write(line)
+        self.rowcount = 25
+
+    def close(self):
+        pass
+
+
+class CopyConnection:
+    """Connection whose cursors support COPY"""
+
+    __module__ = "copy_driver"
+
+    def __init__(self):
+        self.statements = []
+        self.cancelled = False
+        self.rolled_back = False
+
+    def cursor(self):
+        return CopyCursor(self)
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class RecordingConnection:
+    """SQLite connection which records arguments of its cursors"""
+
+    def __init__(self, conn):
+        self.__wrapped__ = conn
+        self.cursors = []
+
+    def cursor(self, **kwargs):
+        self.cursors.append(kwargs)
+        return self.__wrapped__.cursor(**kwargs)
+
+    def commit(self):
+        self.__wrapped__.commit()
+
+    def rollback(self):
+        self.__wrapped__.rollback()
+
+
+class TestSQLiteExport(unittest.TestCase):
+    """Testing streaming export of the query"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.conn.close()
+        self.dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_format(self):
+        """Format is taken from the file extension"""
+        self.assertEqual(export_format("a.JSONL"), "jsonl")
+        self.assertEqual(export_format("a.csv"), "csv")
+        self.assertEqual(export_format("a"), "csv")
+
+    def test_csv(self):
+        """All rows are written with the header"""
+        path = self.path("t1.csv")
+        rows = export_query(self.conn, SELECT, path, batch_rows=10)
+        self.assertEqual(rows, 25)
+        with open(path, newline="", encoding="utf-8") as stream:
+            lines = list(csv.reader(stream))
+        self.assertEqual(lines[0], ["a", "b"])
+        self.assertEqual(lines[1], ["a", "1"])
+        self.assertEqual(lines[6], ["", "6"])
+        self.assertEqual(len(lines), 26)
+
+    def test_jsonl(self):
+        """Rows are written as JSON objects"""
+        path = self.path("t1.jsonl")
+        self.conn.execute("create table t2 (a, b)")
+        self.conn.execute("insert into t2 values (x'00ff', 1.5)")
+        export_query(self.conn, "select * from t2", path)
+        with open(path, encoding="utf-8") as stream:
+            self.assertEqual(
+                json.loads(stream.readline()), {"a": "00ff", "b": 1.5}
+            )
+
+    def test_progress(self):
+        """Progress is reported at the end at least"""
+        reports = []
+        path = self.path("nw.csv")
+        conn = sqlite3.connect(NW_SQLITE)
+        rows = export_query(
+            conn,
+            NW_SELECT,
+            path,
+            batch_rows=100,
+            progress=lambda *args: reports.append(args),
+        )
+        conn.close()
+        self.assertEqual(rows, 830)
+        self.assertEqual(reports[-1][0], 830)
+        self.assertGreater(reports[-1][1], 0)
+
+    def test_cancel(self):
+        """Cancelled export leaves no file"""
+        path = self.path("t1.csv")
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(ExportCancelledError):
+            export_query(
+                self.conn,
+                SELECT,
+                path,
+                batch_rows=10,
+                cancel_event=cancel_event,
+            )
+        self.assertFalse(os.path.exists(path))
+
+    def test_provider(self):
+        """Named cursors aren't tried if the provider has none"""
+        conn = RecordingConnection(self.conn)
+        provider = Provider(
+            "Recording", "sqlite3", False, False, 1, "qmark", "", False
+        )
+        rows = export_query(
+            conn, SELECT, self.path("t1.csv"), provider=provider
+        )
+        self.assertEqual(rows, 25)
+        self.assertEqual(conn.cursors, [{}])
+
+    def test_bad_arguments(self):
+        """Only selects are exported to known formats"""
+        with self.assertRaises(ValueError):
+            export_query(self.conn, UPDATE, self.path("t1.csv"))
+        with self.assertRaises(ValueError):
+            export_query(self.conn, SELECT, self.path("t1.csv"), fmt="xml")
+        with self.assertRaises(sqlite3.OperationalError):
+            export_query(self.conn, "select * from t3", self.path("t3.csv"))
+        self.assertFalse(os.path.exists(self.path("t3.csv")))
+
+    def test_rollback(self):
+        """Failed export rolls back the transaction"""
+        self.conn.execute(UPDATE)
+        with self.assertRaises(sqlite3.OperationalError):
+            export_query(self.conn, "select * from t3", self.path("t3.csv"))
+        self.assertFalse(self.conn.in_transaction)
+
+
+class TestCopyExport(unittest.TestCase):
+    """Testing export with COPY TO STDOUT"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "t1.csv")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_copy_query(self):
+        """Query is wrapped into COPY"""
+        self.assertEqual(
+            copy_query("select * from t1;"),
+            "COPY (select * from t1) TO STDOUT WITH CSV HEADER",
+        )
+        self.assertEqual(
+            copy_query("select * from t1 -- all rows"),
+            "COPY (select * from t1) TO STDOUT WITH CSV HEADER",
+        )
+
+    def test_copy(self):
+        """COPY output is written to the file as is"""
+        conn = CopyConnection()
+        rows = export_query(conn, SELECT, self.path)
+        self.assertEqual(rows, 25)
+        self.assertEqual(len(conn.statements), 1)
+        with open(self.path, "rb") as stream:
+            lines = stream.readlines()
+        self.assertEqual(lines[0], b"a,b\n")
+        self.assertEqual(lines[-1], b"x,25\n")
+        self.assertEqual(len(lines), 26)
+
+    def test_cancel_copy(self):
+        """Cancelled COPY leaves no file and no aborted transaction"""
+        conn = CopyConnection()
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(ExportCancelledError):
+            export_query(conn, SELECT, self.path, cancel_event=cancel_event)
+        self.assertTrue(conn.cancelled)
+        self.assertTrue(conn.rolled_back)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_fallback(self):
+        """JSON Lines and use_copy=False are exported with fetches"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute(CREATE)
+        conn.execute(INSERT)
+        rows = export_query(conn, SELECT, self.path, use_copy=False)
+        self.assertEqual(rows, 25)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import sqlite3
+import unittest
+
+from paginator import Page, QueryPaginator
+from settings import CREATE, INSERT, SELECT, SELECT_EMPTY, UPDATE
+
+
+class TestSQLitePaginatorFetchPage(unittest.TestCase):
+    """Testing QueryPaginator.fetch_page() and fetch_page_at()"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_fetch_pages(self):
+        """Pages come as rows with the range of their numbers"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn
+        )
+        page = paginator.fetch_page()
+        self.assertIsInstance(page, Page)
+        self.assertEqual(page.number, 1)
+        self.assertEqual(page.numbers, range(1, 11))
+        self.assertEqual([row[1] for row in page.rows], list(range(1, 11)))
+        self.assertTrue(paginator.fetched)
+        _ = paginator.fetch_page()
+        page = paginator.fetch_page()
+        self.assertEqual(page.numbers, range(21, 26))
+        self.assertEqual(len(page.rows), 5)
+        self.assertIsNone(paginator.fetch_page())
+        self.assertEqual(paginator.current_page, 3)
+        page = paginator.fetch_page(forward=False)
+        self.assertEqual(page.numbers, range(11, 21))
+
+    def test_before_first(self):
+        """There is no page before the first one"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn
+        )
+        self.assertIsNone(paginator.fetch_page(forward=False))
+
+    def test_fetch_page_at(self):
+        """Jump to the page"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        page = paginator.fetch_page_at(3)
+        self.assertEqual(page.numbers, range(15, 22))
+        self.assertEqual(paginator.current_page, 3)
+        self.assertIsNone(paginator.fetch_page_at(5))
+        with self.assertRaises(ValueError):
+            paginator.fetch_page_at(0)
+
+    def test_empty(self):
+        """Empty select has no pages"""
+        paginator = QueryPaginator(query=SELECT_EMPTY, connection=self.conn)
+        self.assertIsNone(paginator.fetch_page())
+        self.assertTrue(paginator.fetched)
+
+    def test_ddl(self):
+        """Result of DDL is the only page"""
+        paginator = QueryPaginator(query=UPDATE, connection=self.conn)
+        page = paginator.fetch_page()
+        self.assertEqual(page.rows, [("Affected rows: 2",)])
+        self.assertEqual(page.numbers, range(1, 2))
+        self.assertIsNone(paginator.fetch_page())
+        self.assertEqual(paginator.fetch_page_at(1).number, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import sqlite3
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+
+from formatters import (
+    RowFormatter,
+    format_binary,
+    format_number,
+    formatter_for_type,
+    truncate,
+)
+from paginator import QueryPaginator
+from settings import CREATE, INSERT, SELECT
+
+
+class TypeObject:
+    """Mimics DB-API type object which equals to several type codes."""
+
+    def __init__(self, *codes):
+        self.codes = codes
+
+    def __eq__(self, other):
+        return other in self.codes
+
+
+class Driver:
+    """Mimics driver module with DB-API type objects."""
+
+    STRING = TypeObject(25, 1043)
+    BINARY = TypeObject(17)
+    NUMBER = TypeObject(20, 23, 1700)
+    DATETIME = TypeObject(1082, 1114)
+
+
+class TestFormatters(unittest.TestCase):
+    """Testing formatters module"""
+
+    def test_truncate(self):
+        """Long text is cut with ellipsis"""
+        self.assertEqual(truncate("abcdef", 4), "abc…")
+        self.assertEqual(truncate("abcd", 4), "abcd")
+        self.assertEqual(truncate("abcdef"), "abcdef")
+
+    def test_values(self):
+        """Values are converted to display strings"""
+        self.assertEqual(format_number(Decimal("1E+2")), "100")
+        self.assertEqual(format_binary(b"\x01\xff"), "0x01ff")
+        self.assertTrue(format_binary(bytes(100)).endswith("…"))
+
+    def test_formatter_for_type(self):
+        """Type codes are compared with type objects of the driver"""
+        self.assertIsNone(formatter_for_type(None, Driver))
+        self.assertIsNone(formatter_for_type(1700, None))
+        self.assertIs(formatter_for_type(1700, Driver), format_number)
+        self.assertIs(formatter_for_type(17, Driver), format_binary)
+        self.assertIsNone(formatter_for_type(999, Driver))
+
+    def test_description_types(self):
+        """Formatters are chosen from the description"""
+        description = [("n", 1700), ("d", 1082), ("s", 25)]
+        formatter = RowFormatter(description, Driver, max_length=20)
+        rows = formatter.format_rows(
+            [
+                (Decimal("1.50"), date(2020, 1, 2), "a" * 30),
+                (None, datetime(2020, 1, 2, 3, 4), "ok"),
+            ]
+        )
+        self.assertEqual(
+            rows,
+            [
+                ("1.50", "2020-01-02", "a" * 19 + "…"),
+                ("", "2020-01-02 03:04:00", "ok"),
+            ],
+        )
+
+    def test_value_types(self):
+        """Unknown types are chosen by the first not NULL value"""
+        formatter = RowFormatter([("a", None), ("b", None)])
+        rows = formatter.format_rows([(None, b"\x00"), (1.5, b"\x01")])
+        self.assertEqual(rows, [("", "0x00"), ("1.5", "0x01")])
+
+    def test_sqlite_page(self):
+        """Page of the paginator is formatted in one pass"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute(CREATE)
+        conn.execute(INSERT)
+        paginator = QueryPaginator(rows_num=6, query=SELECT, connection=conn)
+        formatter = RowFormatter(paginator.description, sqlite3)
+        rows = formatter.format_rows(paginator.fetch_page().rows)
+        self.assertEqual(rows[0], ("a", "1"))
+        self.assertEqual(rows[5], ("", "6"))
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
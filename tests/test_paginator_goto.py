@@ -0,0 +1,134 @@
+import sqlite3
+import unittest
+
+from paginator import QueryPaginator
+from settings import CREATE, INSERT, SELECT
+
+SELECT_ORDERED = "select * from t1 order by b"
+
+
+class TestSQLitePaginatorGoto(unittest.TestCase):
+    """Testing QueryPaginator.goto_page() and goto_row()"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_goto_page(self):
+        """Jump forward to the page"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        res = list(paginator.goto_page(3))
+        self.assertEqual([i[0][1] for i in res], list(range(15, 22)))
+        self.assertEqual([i[1] for i in res], list(range(15, 22)))
+        self.assertEqual(paginator.current_page, 3)
+        self.assertTrue(paginator.fetched)
+        # paging continues from the page
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[0][1] for i in res], list(range(22, 26)))
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[0][1] for i in res], list(range(15, 22)))
+
+    def test_goto_page_backward(self):
+        """Jump backward to the page which is not cached"""
+        paginator = QueryPaginator(
+            rows_num=5, query=SELECT, connection=self.conn, cache_pages=0
+        )
+        _ = list(paginator.goto_page(5))
+        res = list(paginator.goto_page(2))
+        self.assertEqual([i[0][1] for i in res], list(range(6, 11)))
+        self.assertEqual(paginator.current_page, 2)
+        self.assertEqual(self.statements.count(SELECT), 2)
+
+    def test_goto_last_incomplete_page(self):
+        """Jump to the last page which is not complete"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn, cache_pages=0
+        )
+        self.assertEqual(list(paginator.goto_page(4)), [])
+        res = list(paginator.goto_page(3))
+        self.assertEqual([i[1] for i in res], list(range(21, 26)))
+
+    def test_goto_beyond_end(self):
+        """Jump beyond the end keeps the current page"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        _ = list(paginator.goto_page(2))
+        self.assertEqual(list(paginator.goto_page(10)), [])
+        self.assertEqual(paginator.current_page, 2)
+
+    def test_goto_clamp(self):
+        """Jump beyond the end lands on the last page if it's known"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn, snapshot=True
+        )
+        page = paginator.fetch_page_at(10, clamp=True)
+        self.assertEqual(page.number, 4)
+        self.assertEqual(page.numbers, range(22, 26))
+        self.assertEqual(paginator.current_page, 4)
+        self.assertEqual(paginator.fetch_page_at(2, clamp=True).number, 2)
+        paginator.close()
+
+    def test_goto_clamp_unknown_end(self):
+        """Jump beyond the unknown end keeps the current page"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        _ = paginator.fetch_page_at(2)
+        self.assertIsNone(paginator.fetch_page_at(10, clamp=True))
+        self.assertEqual(paginator.current_page, 2)
+
+    def test_goto_row(self):
+        """Jump to the page of the row"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        res = list(paginator.goto_row(14))
+        self.assertEqual([i[1] for i in res], list(range(8, 15)))
+        self.assertEqual(paginator.current_page, 2)
+        res = list(paginator.goto_row(15))
+        self.assertEqual(paginator.current_page, 3)
+
+    def test_goto_bad_number(self):
+        """Page and row numbers start with 1"""
+        paginator = QueryPaginator(query=SELECT, connection=self.conn)
+        with self.assertRaises(ValueError):
+            list(paginator.goto_page(0))
+        with self.assertRaises(ValueError):
+            list(paginator.goto_row(0))
+
+    def test_goto_keyset(self):
+        """Jump with keyset skips from the closest known page"""
+        paginator = QueryPaginator(
+            rows_num=5,
+            query=SELECT_ORDERED,
+            connection=self.conn,
+            keyset=["b"],
+        )
+        _ = list(paginator.feeder(forward=True))
+        res = list(paginator.goto_page(4))
+        self.assertEqual([i[0][1] for i in res], list(range(16, 21)))
+        self.assertIn('"b" > 5', self.statements[-1])
+        self.assertIn("OFFSET 10", self.statements[-1])
+
+    def test_goto_ddl(self):
+        """Jump to the first page of DDL"""
+        paginator = QueryPaginator(
+            query="delete from t1 where b = 1", connection=self.conn
+        )
+        self.assertEqual(list(paginator.goto_page(2)), [])
+        res = list(paginator.goto_page(1))
+        self.assertEqual(res[0][0][0], "Affected rows: 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
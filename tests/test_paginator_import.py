@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from importer import (
+    INTEGER,
+    REAL,
+    TEXT,
+    ImportCancelledError,
+    convert_value,
+    create_query,
+    import_csv,
+    infer_kinds,
+)
+
+
+class TestSQLiteImport(unittest.TestCase):
+    """Testing bulk import of CSV files"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.dir.name, "t.sqlite")
+        self.conn = sqlite3.connect(self.db)
+
+    def tearDown(self):
+        self.conn.close()
+        self.dir.cleanup()
+
+    def csv_file(self, lines, name="t1.csv"):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write("\n".join(lines) + "\n")
+        return path
+
+    def test_infer_kinds(self):
+        """Column gets the widest kind of its values"""
+        sample = [["1", "1", "a", "", "1e3"], ["-2", "2.5", "1", ""]]
+        self.assertEqual(
+            infer_kinds(sample, 5), [INTEGER, REAL, TEXT, TEXT, REAL]
+        )
+        self.assertEqual(infer_kinds([[str(1 << 63)]], 1), [REAL])
+
+    def test_leading_zeros(self):
+        """Numbers with leading zeros are TEXT, so the zeros stay"""
+        sample = [["0", "0.5", "007", "-01.5"], ["1", "0e3", "1", "2"]]
+        self.assertEqual(infer_kinds(sample, 4), [INTEGER, REAL, TEXT, TEXT])
+        self.assertEqual(convert_value("007", INTEGER), "007")
+        self.assertEqual(convert_value("0", INTEGER), 0)
+        import_csv(self.conn, self.csv_file(["zip", "02134"]), "t1")
+        self.assertEqual(
+            self.conn.execute("select zip from t1").fetchone(), ("02134",)
+        )
+
+    def test_create_query(self):
+        """Types depend on the driver"""
+        self.assertEqual(
+            create_query("s.t", ["a", 'b"'], [INTEGER, REAL], sqlite3),
+            'CREATE TABLE IF NOT EXISTS "s"."t" ("a" INTEGER, "b""" REAL)',
+        )
+        self.assertIn('"a" BIGINT', create_query("t", ["a"], [INTEGER]))
+
+    def test_import(self):
+        """Rows are imported into the new table with inferred types"""
+        lines = ["a,b,c"] + [f"{num},{num / 2},x{num}" for num in range(25)]
+        lines.append("25,,")
+        reports = []
+        rows = import_csv(
+            self.conn,
+            self.csv_file(lines),
+            "t1",
+            batch_rows=10,
+            transaction_rows=20,
+            sample_rows=5,
+            progress=lambda *args: reports.append(args),
+        )
+        self.assertEqual(rows, 26)
+        self.assertEqual(reports[-1][0], 26)
+        self.assertEqual(
+            self.conn.execute("select * from t1 where a = 3").fetchone(),
+            (3, 1.5, "x3"),
+        )
+        self.assertEqual(
+            self.conn.execute("select * from t1 where a = 25").fetchone(),
+            (25, None, None),
+        )
+        types = [
+            column[2] for column in self.conn.execute("pragma table_info(t1)")
+        ]
+        self.assertEqual(types, ["INTEGER", "REAL", "TEXT"])
+
+    def test_existing_table(self):
+        """Rows are appended to the existing table"""
+        self.conn.execute("create table t1 (a text, b text)")
+        self.conn.execute("insert into t1 values ('x', 'y')")
+        self.conn.commit()
+        import_csv(self.conn, self.csv_file(["a,b", "1,2"]), "t1")
+        self.assertEqual(
+            self.conn.execute("select count(*) from t1").fetchone()[0], 2
+        )
+
+    def test_pragmas_restored(self):
+        """SQLite settings are restored after the import"""
+        synchronous = self.conn.execute("pragma synchronous").fetchone()
+        import_csv(self.conn, self.csv_file(["a", "1"]), "t1")
+        self.assertEqual(
+            self.conn.execute("pragma synchronous").fetchone(), synchronous
+        )
+        self.assertEqual(
+            self.conn.execute("pragma journal_mode").fetchone()[0], "delete"
+        )
+
+    def test_wal(self):
+        """Journal of WAL DB isn't changed"""
+        self.conn.execute("pragma journal_mode = wal")
+        import_csv(self.conn, self.csv_file(["a", "1"]), "t1")
+        self.assertEqual(
+            self.conn.execute("pragma journal_mode").fetchone()[0], "wal"
+        )
+
+    def test_pragmas_locked(self):
+        """Settings are restored when the DB is locked by other writer"""
+        other = sqlite3.connect(self.db)
+        other.execute("create table t2 (a)")
+        other.execute("insert into t2 values (1)")
+        synchronous = self.conn.execute("pragma synchronous").fetchone()
+        self.conn.execute("pragma busy_timeout = 0")
+        with self.assertRaises(sqlite3.OperationalError):
+            import_csv(self.conn, self.csv_file(["a", "1"]), "t1")
+        other.rollback()
+        other.close()
+        self.assertEqual(
+            self.conn.execute("pragma synchronous").fetchone(), synchronous
+        )
+        self.assertEqual(
+            self.conn.execute("pragma journal_mode").fetchone()[0], "delete"
+        )
+
+    def test_cancel(self):
+        """Cancelled import leaves no uncommitted rows"""
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(ImportCancelledError):
+            import_csv(
+                self.conn,
+                self.csv_file(["a", "1"]),
+                "t1",
+                cancel_event=cancel_event,
+            )
+        self.assertFalse(self.conn.in_transaction)
+
+    def test_bad_rows(self):
+        """Long rows fail the import, committed rows stay"""
+        lines = ["a,b", "1,2", "3,4", "5,6,7"]
+        with self.assertRaises(ValueError):
+            import_csv(
+                self.conn,
+                self.csv_file(lines),
+                "t1",
+                batch_rows=2,
+                transaction_rows=2,
+            )
+        self.assertEqual(
+            self.conn.execute("select count(*) from t1").fetchone()[0], 2
+        )
+
+    def test_bad_arguments(self):
+        """Table name and header are required"""
+        with self.assertRaises(ValueError):
+            import_csv(self.conn, self.csv_file(["a", "1"]), " ")
+        with self.assertRaises(ValueError):
+            import_csv(self.conn, self.csv_file([""]), "t1")
+        with self.assertRaises(ValueError):
+            import_csv(self.conn, self.csv_file(["a"]), "t1", batch_rows=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
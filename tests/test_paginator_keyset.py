@@ -0,0 +1,231 @@
+import sqlite3
+import unittest
+
+from keyset import (
+    detect_order_by,
+    placeholders,
+    seek_query,
+    strip_query,
+    unique_key,
+)
+from paginator import KEYSET_AUTO, QueryPaginator
+from settings import CREATE, INSERT, SELECT
+
+SELECT_ORDERED = "select * from t1 order by b;"
+SELECT_ORDERED_DESC = "select * from t1 order by b desc"
+SELECT_ORDERED_HIDDEN = "select a from t1 order by b"
+# b is unique and NOT NULL, a has duplicates
+CREATE_KEYED = "CREATE TABLE t2(a NOT NULL, b INTEGER PRIMARY KEY)"
+INSERT_KEYED = "insert into t2 (a, b) select b % 3, b from t1"
+
+
+class TestKeysetHelpers(unittest.TestCase):
+    """Testing keyset module"""
+
+    def test_detect_simple(self):
+        """Simple ORDER BY"""
+        self.assertEqual(detect_order_by(SELECT_ORDERED), ("b",))
+
+    def test_detect_multiple(self):
+        """ORDER BY with several qualified and quoted columns"""
+        self.assertEqual(
+            detect_order_by('select * from t order by t.a ASC, "B c"'),
+            ("a", "B c"),
+        )
+
+    def test_detect_none(self):
+        """Queries without suitable ORDER BY"""
+        self.assertIsNone(detect_order_by(SELECT))
+        self.assertIsNone(detect_order_by(SELECT_ORDERED_DESC))
+        self.assertIsNone(detect_order_by("select * from t order by a + 1"))
+        self.assertIsNone(
+            detect_order_by("select * from t order by a limit 5")
+        )
+
+    def test_placeholders(self):
+        """Placeholders for different paramstyles"""
+        self.assertEqual(placeholders("qmark", (1, 2)), (["?", "?"], (1, 2)))
+        self.assertEqual(placeholders("pyformat", (1,)), (["%s"], (1,)))
+        self.assertEqual(placeholders("numeric", (1,)), ([":1"], (1,)))
+        self.assertEqual(placeholders("named", (1,)), ([":k0"], {"k0": 1}))
+
+    def test_seek_query(self):
+        """Seek query backward with composite key"""
+        sql, params = seek_query(
+            SELECT_ORDERED, ("a", "b"), 10, key=(1, 2), backward=True
+        )
+        self.assertEqual(
+            sql,
+            "SELECT * FROM (select * from t1 order by b) AS dbmp_keyset "
+            'WHERE ("a", "b") < (?, ?) ORDER BY "a" DESC, "b" DESC LIMIT 10',
+        )
+        self.assertEqual(params, (1, 2))
+
+    def test_trailing_comment(self):
+        """Trailing comments don't comment out the end of the wrapper"""
+        query = "select * from t1 order by b; -- last; 'x'\n/* end */ ;"
+        self.assertEqual(strip_query(query), "select * from t1 order by b")
+        self.assertEqual(
+            strip_query("select '--;' as \"/*\" -- c"),
+            "select '--;' as \"/*\"",
+        )
+        self.assertEqual(detect_order_by(query), ("b",))
+        sql, _ = seek_query(query, ("b",), 10)
+        self.assertNotIn("--", sql)
+
+    def test_seek_query_percent(self):
+        """Percent signs of the query are escaped for pyformat"""
+        query = "select * from t where a like 'A%' order by b"
+        sql, params = seek_query(query, ("b",), 10, key=(1,), style="pyformat")
+        self.assertIn("like 'A%%'", sql)
+        # the way the driver substitutes parameters
+        self.assertIn("like 'A%'", sql % params)
+        sql, params = seek_query(query, ("b",), 10, style="format")
+        self.assertEqual(sql % params, seek_query(query, ("b",), 10)[0])
+        sql, _ = seek_query(query, ("b",), 10, key=(1,), style="qmark")
+        self.assertIn("like 'A%'", sql)
+
+
+class TestSQLitePaginatorKeyset(unittest.TestCase):
+    """Testing keyset pagination of QueryPaginator"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_forward(self):
+        """Pages forward by seeking from the last key"""
+        paginator = QueryPaginator(
+            rows_num=7,
+            query=SELECT_ORDERED,
+            connection=self.conn,
+            keyset=["b"],
+        )
+        pages = [list(paginator.feeder(forward=True)) for _ in range(5)]
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 4, 0])
+        self.assertEqual([i[0][1] for i in pages[2]], list(range(15, 22)))
+        self.assertEqual([i[1] for i in pages[3]], list(range(22, 26)))
+        self.assertEqual(paginator.current_page, 4)
+        # neither OFFSET nor rereading of the query
+        self.assertFalse([s for s in self.statements if "OFFSET" in s])
+        self.assertEqual(self.statements.count(SELECT_ORDERED), 0)
+
+    def test_commented_query(self):
+        """Query ending with a comment is paged"""
+        paginator = QueryPaginator(
+            rows_num=7,
+            query=f"{SELECT_ORDERED} -- ordered",
+            connection=self.conn,
+            keyset=["b"],
+        )
+        paginator.fetch_page()
+        self.assertEqual(paginator.fetch_page().rows[0][1], 8)
+
+    def test_backward(self):
+        """Pages backward by seeking from the first key"""
+        paginator = QueryPaginator(
+            rows_num=7,
+            query=SELECT_ORDERED,
+            connection=self.conn,
+            keyset=["b"],
+            cache_pages=0,
+        )
+        for _ in range(4):
+            _ = list(paginator.feeder(forward=True))
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[0][1] for i in res], list(range(15, 22)))
+        self.assertEqual([i[1] for i in res], list(range(15, 22)))
+        self.assertEqual(paginator.current_page, 3)
+        self.assertIn("DESC", self.statements[-1])
+        for _ in range(5):
+            res = list(paginator.feeder(forward=False)) or res
+        self.assertEqual([i[0][1] for i in res], list(range(1, 8)))
+        self.assertEqual(paginator.current_page, 1)
+
+    def test_auto(self):
+        """Keyset columns are detected from ORDER BY of unique key"""
+        self.conn.execute(CREATE_KEYED)
+        self.conn.execute(INSERT_KEYED)
+        paginator = QueryPaginator(
+            rows_num=10,
+            query="select * from t2 order by b",
+            connection=self.conn,
+            keyset=KEYSET_AUTO,
+        )
+        self.assertEqual(paginator.keyset, ("b",))
+        self.assertEqual(paginator.headers(), ["a", "b"])
+
+    def test_unique_key(self):
+        """Only NOT NULL unique keys of plain columns are used"""
+        self.conn.execute(CREATE_KEYED)
+        self.conn.execute("create unique index t2_ab on t2(a, b)")
+        query = "select a, b from t2 order by a, b"
+        self.assertTrue(unique_key(self.conn, query, ("b",)))
+        self.assertTrue(unique_key(self.conn, query, ("a", "b")))
+        self.assertFalse(unique_key(self.conn, query, ("a",)))
+        # primary key of t1 may be NULL
+        self.assertFalse(unique_key(self.conn, SELECT_ORDERED, ("b",)))
+        self.assertFalse(
+            unique_key(self.conn, "select b as a from t2 order by a", ("a",))
+        )
+        self.assertFalse(
+            unique_key(
+                self.conn,
+                "select * from t2 join t1 using(b) order by b",
+                ("b",),
+            )
+        )
+
+    def test_auto_ties(self):
+        """ORDER BY of not unique column is paged by skipping rows"""
+        self.conn.execute(CREATE_KEYED)
+        self.conn.execute(INSERT_KEYED)
+        paginator = QueryPaginator(
+            rows_num=4,
+            query="select * from t2 order by a",
+            connection=self.conn,
+            keyset=KEYSET_AUTO,
+        )
+        self.assertIsNone(paginator.keyset)
+        rows = []
+        page = paginator.fetch_page()
+        while page:
+            rows.extend(page.rows)
+            page = paginator.fetch_page()
+        self.assertEqual(sorted(row[1] for row in rows), list(range(1, 26)))
+
+    def test_auto_not_suitable(self):
+        """Query is paged as usual if ORDER BY is not suitable"""
+        for query in (
+            SELECT,
+            SELECT_ORDERED,
+            SELECT_ORDERED_DESC,
+            SELECT_ORDERED_HIDDEN,
+        ):
+            paginator = QueryPaginator(
+                rows_num=10,
+                query=query,
+                connection=self.conn,
+                keyset=KEYSET_AUTO,
+            )
+            self.assertIsNone(paginator.keyset)
+            res = list(paginator.feeder(forward=True))
+            self.assertEqual(len(res), 10)
+
+    def test_missing_column(self):
+        """Explicit keyset column is not in the result"""
+        with self.assertRaises(ValueError):
+            QueryPaginator(
+                query=SELECT_ORDERED, connection=self.conn, keyset=["c"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import functools
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from paginator import QueryPaginator
+from pool import ConnectionPool, PoolExhaustedError
+from settings import CREATE, INSERT, SELECT
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Testing pool of warm connections"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "t.sqlite")
+        conn = sqlite3.connect(self.path)
+        conn.execute(CREATE)
+        conn.execute(INSERT)
+        conn.commit()
+        conn.close()
+        self.connect = functools.partial(
+            sqlite3.connect, self.path, check_same_thread=False
+        )
+        self.pool = ConnectionPool(max_connections=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.dir.cleanup()
+
+    def test_reuse(self):
+        """Released connection is reused for the same key"""
+        conn = self.pool.acquire("a", self.connect)
+        self.pool.release(conn)
+        self.assertIs(self.pool.acquire("a", self.connect), conn)
+        self.assertEqual((self.pool.hits, self.pool.misses), (1, 1))
+        self.assertIsNot(self.pool.acquire("b", self.connect), conn)
+
+    def test_cap(self):
+        """Least recently used idle connection makes room"""
+        first = self.pool.acquire("a", self.connect)
+        second = self.pool.acquire("b", self.connect)
+        with self.assertRaises(PoolExhaustedError):
+            self.pool.acquire("c", self.connect)
+        self.pool.release(first)
+        self.pool.release(second)
+        self.pool.acquire("c", self.connect)
+        self.assertEqual((self.pool.idle, self.pool.in_use), (1, 1))
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first.cursor()
+        self.assertIs(self.pool.acquire("b", self.connect), second)
+
+    def test_validation(self):
+        """Broken connections are not reused"""
+        conn = self.pool.acquire("a", self.connect)
+        self.pool.release(conn)
+        conn.close()
+        self.assertIsNot(self.pool.acquire("a", self.connect), conn)
+        pool = ConnectionPool(validate_after=0)
+        conn = pool.acquire("a", self.connect)
+        pool.release(conn)
+        self.assertIs(pool.acquire("a", self.connect), conn)
+        pool.close()
+
+    def test_release_rolls_back(self):
+        """Transaction of the released connection is rolled back"""
+        conn = self.pool.acquire("a", self.connect)
+        conn.execute("delete from t1")
+        self.pool.release(conn)
+        self.assertFalse(conn.in_transaction)
+
+    def test_closed_pool(self):
+        """Connections released to the closed pool are closed"""
+        conn = self.pool.acquire("a", self.connect)
+        self.pool.close()
+        self.pool.release(conn)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.cursor()
+        with self.assertRaises(PoolExhaustedError):
+            self.pool.acquire("a", self.connect)
+
+    def test_factory(self):
+        """Background connections return to the pool when closed"""
+        factory = self.pool.factory("a", self.connect)
+        conn = factory()
+        self.assertEqual(
+            conn.execute("select count(*) from t1").fetchone()[0], 25
+        )
+        conn.close()
+        conn.close()
+        self.assertEqual((self.pool.idle, self.pool.in_use), (1, 0))
+
+    def test_paginator(self):
+        """Paginator counts rows with the connection of the pool"""
+        conn = self.pool.acquire("a", self.connect)
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT,
+            connection=conn,
+            connection_factory=self.pool.factory("a", self.connect),
+            count_rows=True,
+            prefetch=True,
+        )
+        self.assertEqual(len(paginator.fetch_page().rows), 10)
+        self.assertEqual(len(paginator.fetch_page().rows), 10)
+        paginator.close()
+        self.assertEqual(paginator.total_rows, 25)
+        self.assertEqual(self.pool.in_use, 1)
+        self.pool.release(conn)
+
+    def test_exhausted_prefetch(self):
+        """Pages are read in foreground when the pool is exhausted"""
+        pool = ConnectionPool(max_connections=1)
+        conn = pool.acquire("a", self.connect)
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT,
+            connection=conn,
+            connection_factory=pool.factory("a", self.connect),
+            prefetch=True,
+        )
+        self.assertEqual(len(paginator.fetch_page().rows), 10)
+        self.assertEqual(len(paginator.fetch_page().rows), 10)
+        paginator.close()
+        pool.release(conn)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
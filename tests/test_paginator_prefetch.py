@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from paginator import QueryPaginator
+from settings import CREATE, INSERT, SELECT
+
+SELECT_ORDERED = "select * from t1 order by b"
+
+
+class TestSQLitePaginatorPrefetch(unittest.TestCase):
+    """Testing background prefetch of QueryPaginator"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+        # connections made by the prefetch thread
+        self.threads = []
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.path)
+
+    def connect(self):
+        self.threads.append(threading.current_thread())
+        return sqlite3.connect(self.path)
+
+    def test_no_factory(self):
+        """SQLite connection can't be shared, so no prefetch"""
+        paginator = QueryPaginator(
+            query=SELECT, connection=self.conn, prefetch=True
+        )
+        self.assertFalse(paginator.prefetch)
+
+    def test_next_page_prefetched(self):
+        """Next page is read by the prefetch thread"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT,
+            connection=self.conn,
+            prefetch=True,
+            connection_factory=self.connect,
+        )
+        self.assertTrue(paginator.prefetch)
+        for _ in range(3):
+            res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[0][1] for i in res], list(range(21, 26)))
+        # page 1 is read in foreground, pages 2 and 3 in background
+        self.assertEqual(paginator.cache_hits, 2)
+        self.assertEqual(self.statements.count(SELECT), 1)
+        self.assertEqual(len(self.threads), 1)
+        self.assertIsNot(self.threads[0], threading.current_thread())
+        paginator.close()
+
+    def test_keyset_prefetched(self):
+        """Next page of keyset pagination is read in background"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT_ORDERED,
+            connection=self.conn,
+            keyset=["b"],
+            prefetch=True,
+            connection_factory=self.connect,
+        )
+        pages = [list(paginator.feeder(forward=True)) for _ in range(3)]
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(paginator.cache_hits, 2)
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[1] for i in res], list(range(11, 21)))
+        paginator.close()
+
+    def test_keyset_jumps(self):
+        """Bookmarks added in background are sought from"""
+        paginator = QueryPaginator(
+            rows_num=3,
+            query=SELECT_ORDERED,
+            connection=self.conn,
+            keyset=["b"],
+            prefetch=True,
+            connection_factory=self.connect,
+            cache_pages=0,
+        )
+        for page in (1, 5, 2, 9, 6, 3, 8):
+            rows = paginator.fetch_page_at(page).rows
+            self.assertEqual(rows[0][1], (page - 1) * 3 + 1)
+        paginator.close()
+
+    def test_cancel_interrupts(self):
+        """Page being prefetched is interrupted, not waited for"""
+        paginator = QueryPaginator(
+            rows_num=8,
+            query=(
+                "with recursive c(x) as (select 1 union all "
+                "select x + 1 from c) "
+                "select x from c where x < 10 or x % 1000000000 = 0"
+            ),
+            connection=self.conn,
+            prefetch=True,
+            connection_factory=self.connect,
+        )
+        paginator.fetch_page()
+        # the prefetch thread reads the second page
+        time.sleep(0.2)
+        started = time.monotonic()
+        paginator.cancel_prefetch()
+        self.assertLess(time.monotonic() - started, 2)
+        paginator.close()
+
+    def test_cancel(self):
+        """Prefetch is stopped and the thread's connection is closed"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT,
+            connection=self.conn,
+            prefetch=True,
+            connection_factory=self.connect,
+        )
+        _ = list(paginator.feeder(forward=True))
+        paginator.cancel_prefetch()
+        self.assertFalse(paginator.prefetch)
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[1] for i in res], list(range(11, 21)))
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[1] for i in res], list(range(21, 26)))
+
+
+if __name__ == "__main__":
+    unittest.main()
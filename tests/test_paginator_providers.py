@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import providers
+from paginator import QueryPaginator
+from providers import Provider, all_providers, provider_for, register
+from settings import CREATE, INSERT, SELECT
+from test_paginator_server_side import ServerSideConnection
+
+
+class TestProviders(unittest.TestCase):
+    """Testing provider registry and its capabilities"""
+
+    def setUp(self):
+        self.sqlite = sqlite3.connect(":memory:")
+        self.sqlite.execute(CREATE)
+        self.sqlite.execute(INSERT)
+        self.sqlite.commit()
+        # registry is loaded again by every test
+        patcher = mock.patch.object(providers, "_registry", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.sqlite.close()
+
+    def test_builtin(self):
+        """SQLite comes first with its capabilities declared"""
+        self.assertEqual(
+            [provider.name for provider in all_providers()][:2],
+            ["SQLite", "PostgreSQL"],
+        )
+        provider = provider_for(self.sqlite)
+        self.assertFalse(provider.named_cursors)
+        self.assertEqual(provider.threadsafety, 1)
+        self.assertEqual(provider.cancel, "interrupt")
+
+    def test_unknown_driver(self):
+        """Capabilities of unknown driver are probed"""
+        provider = provider_for(ServerSideConnection(self.sqlite))
+        self.assertTrue(provider.named_cursors)
+        self.assertEqual(provider.cancel, "")
+        self.assertEqual(provider.paramstyle, "qmark")
+        self.assertFalse(provider.copy_export)
+
+    def test_config_file(self):
+        """Providers of the config file replace the built-in ones"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "providers.json")
+            with open(path, "w", encoding="utf-8") as stream:
+                json.dump(
+                    [
+                        {"name": "SQLite", "module": "sqlite3"},
+                        {"name": "MySQL", "module": "MySQLdb"},
+                    ],
+                    stream,
+                )
+            with mock.patch.dict(os.environ, {providers.CONFIG_ENV: path}):
+                names = [provider.name for provider in all_providers()]
+        self.assertEqual(names, ["SQLite", "PostgreSQL", "MySQL"])
+        # undeclared capabilities are probed
+        self.assertEqual(provider_for(self.sqlite).cancel, "interrupt")
+
+    def test_bad_config_file(self):
+        """Unknown fields are refused"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "providers.json")
+            with open(path, "w", encoding="utf-8") as stream:
+                json.dump([{"name": "X", "module": "x", "speed": 1}], stream)
+            with mock.patch.dict(os.environ, {providers.CONFIG_ENV: path}):
+                with self.assertRaises(ValueError):
+                    all_providers()
+
+    def test_paginator_strategy(self):
+        """Paginator doesn't use named cursors if the provider can't"""
+        conn = ServerSideConnection(self.sqlite)
+        module = type(conn).__module__.split(".")[0]
+        register(Provider("Fake", module, named_cursors=False))
+        paginator = QueryPaginator(rows_num=7, query=SELECT, connection=conn)
+        self.assertFalse(paginator.server_side)
+        self.assertEqual(len(paginator.fetch_page().rows), 7)
+        paginator = QueryPaginator(
+            rows_num=7,
+            query=SELECT,
+            connection=conn,
+            provider=Provider("Fake", module, scrollable=False),
+        )
+        paginator.fetch_page_at(3)
+        paginator.fetch_page_at(1)
+        self.assertTrue(paginator.server_side)
+        self.assertEqual(conn.scrolls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
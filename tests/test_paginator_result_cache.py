@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from paginator import QueryPaginator
+from result_cache import ResultCache, cache_ttl, normalize_query
+from settings import CREATE, INSERT, SELECT, UPDATE
+
+
+class TestResultCache(unittest.TestCase):
+    """Testing result cache in front of QueryPaginator"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+        self.cache = ResultCache()
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.path)
+
+    def paginator(self, query=SELECT, **kwargs):
+        return QueryPaginator(
+            rows_num=10,
+            query=query,
+            connection=self.conn,
+            result_cache=self.cache,
+            **kwargs,
+        )
+
+    def test_normalize_query(self):
+        """Whitespaces are collapsed outside of literals and comments"""
+        self.assertEqual(
+            normalize_query("select  a,\n\tb from t ;"), "select a, b from t"
+        )
+        self.assertEqual(
+            normalize_query("select 'a  b' -- c\n from t"),
+            "select 'a  b' -- c\n from t",
+        )
+
+    def test_repeated_query(self):
+        """Repeated query is served without execution"""
+        paginator = self.paginator()
+        for _ in range(3):
+            paginator.fetch_page()
+        paginator.close()
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+        paginator = self.paginator(query=" select *  from t1 ; ")
+        self.assertEqual(paginator.headers(), ["a", "b"])
+        self.assertEqual(paginator.total_rows, 25)
+        self.assertTrue(paginator.total_exact)
+        self.assertEqual(paginator.fetch_page().rows[0][1], 1)
+        self.assertEqual(paginator.fetch_page_at(3).rows[-1][1], 25)
+        self.assertEqual(self.statements.count(SELECT), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_lazy_execution(self):
+        """Query is executed when the page isn't cached"""
+        self.cache.max_pages = 1
+        paginator = self.paginator()
+        paginator.fetch_page()
+        paginator.fetch_page()
+        self.statements.clear()
+        paginator = self.paginator()
+        paginator.fetch_page()
+        self.assertEqual(self.statements.count(SELECT), 0)
+        self.assertEqual(paginator.fetch_page().rows[0][1], 11)
+        self.assertEqual(self.statements.count(SELECT), 1)
+
+    def test_changed_data(self):
+        """Result is read again when the data changes"""
+        self.paginator().fetch_page()
+        self.conn.execute(UPDATE)
+        self.conn.commit()
+        paginator = self.paginator()
+        self.assertEqual(paginator.fetch_page().rows[1][0], "sss")
+        # the cursor of the paginator would lock the file
+        paginator.close()
+        other = sqlite3.connect(self.path)
+        other.execute("delete from t1 where b = 1")
+        other.commit()
+        other.close()
+        paginator = self.paginator()
+        self.assertEqual(paginator.fetch_page().rows[0][1], 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_not_cached(self):
+        """In-memory DB and results without version aren't cached"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute(CREATE)
+        conn.execute(INSERT)
+        self.assertIsNone(self.cache.key(conn, SELECT, 10))
+        conn.close()
+        with mock.patch("result_cache.data_version", return_value=None):
+            self.paginator().fetch_page()
+            self.paginator().fetch_page()
+            self.assertEqual(len(self.cache), 0)
+            self.cache.ttl = 60
+            self.paginator().fetch_page()
+            self.paginator().fetch_page()
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_ttl(self):
+        """Results older than ttl are dropped"""
+        self.cache.ttl = 60
+        self.paginator().fetch_page()
+        with mock.patch("result_cache.time.monotonic", return_value=1e12):
+            self.paginator().fetch_page()
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_invalidate(self):
+        """Results of the DB written to are dropped"""
+        self.paginator().fetch_page()
+        conn = sqlite3.connect(":memory:")
+        self.cache.invalidate(conn)
+        self.assertEqual(len(self.cache), 1)
+        other = sqlite3.connect(self.path)
+        self.cache.invalidate(other)
+        other.close()
+        self.assertEqual(len(self.cache), 0)
+        self.paginator().fetch_page()
+        self.cache.invalidate(mock.Mock(dsn=None))
+        self.assertEqual(len(self.cache), 0)
+        conn.close()
+
+    def test_no_limit(self):
+        """Age limit of 0 keeps results which version can't be checked"""
+        self.cache.ttl = cache_ttl(0)
+        with mock.patch("result_cache.data_version", return_value=None):
+            self.paginator().fetch_page()
+            with mock.patch("result_cache.time.monotonic", return_value=1e12):
+                self.paginator().fetch_page()
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(cache_ttl(30), 30)
+        with self.assertRaises(ValueError):
+            cache_ttl(-1)
+
+    def test_eviction(self):
+        """Least recently used results make room"""
+        self.paginator().fetch_page()
+        size = self.cache.size
+        self.cache.max_bytes = size * 2
+        self.paginator(query="select * from t1 where b > 0").fetch_page()
+        self.paginator().fetch_page()
+        self.paginator(query="select * from t1 where b > 1").fetch_page()
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertLessEqual(self.cache.size, self.cache.max_bytes)
+        self.paginator().fetch_page()
+        self.assertEqual(self.cache.hits, 2)
+
+    def test_bad_args(self):
+        """Limits are checked"""
+        with self.assertRaises(ValueError):
+            ResultCache(max_pages=0)
+        with self.assertRaises(ValueError):
+            ResultCache(ttl=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import sqlite3
+import threading
+import unittest
+
+from script import ScriptError, run_script, split_statements
+
+
+class TestSplitStatements(unittest.TestCase):
+    """Testing splitting of the script into statements"""
+
+    def test_simple(self):
+        """Statements are split by semicolons, empty ones are dropped"""
+        self.assertEqual(
+            split_statements("select 1; ;\n select 2"),
+            ["select 1", "select 2"],
+        )
+        self.assertEqual(split_statements(" ; -- nothing\n"), [])
+
+    def test_quotes(self):
+        """Semicolons in quotes are kept"""
+        self.assertEqual(
+            split_statements("""select 'a;''b'; select "c;d" from t"""),
+            ["select 'a;''b'", 'select "c;d" from t'],
+        )
+
+    def test_comments(self):
+        """Semicolons in comments are kept, comments around dropped"""
+        script = (
+            "-- first;\nselect /* a; /* b; */ c; */ 1 /* d */; select 2 -- x;"
+        )
+        self.assertEqual(
+            split_statements(script),
+            ["select /* a; /* b; */ c; */ 1", "select 2"],
+        )
+
+    def test_last_comment(self):
+        """Comment on the last line isn't a part of the last statement"""
+        self.assertEqual(
+            split_statements("select 1;\nselect 'a--' -- done\n"),
+            ["select 1", "select 'a--'"],
+        )
+        self.assertEqual(split_statements("select 1; -- done"), ["select 1"])
+
+    def test_dollar_quotes(self):
+        """Dollar quoted bodies of PostgreSQL are kept"""
+        script = (
+            "create function f() returns int as $body$ begin; return 1; "
+            "end $body$ language plpgsql; select $1, a$b; select 2"
+        )
+        self.assertEqual(
+            split_statements(script),
+            [
+                "create function f() returns int as $body$ begin; "
+                "return 1; end $body$ language plpgsql",
+                "select $1, a$b",
+                "select 2",
+            ],
+        )
+
+    def test_trigger(self):
+        """Body of SQLite trigger is kept"""
+        script = (
+            "create temp trigger t after insert on t1 begin "
+            "update t1 set b = 1; delete from t2; end; select 1"
+        )
+        self.assertEqual(len(split_statements(script)), 2)
+
+
+class TestRunScript(unittest.TestCase):
+    """Testing execution of scripts"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def count(self, table="t1"):
+        return self.conn.execute(f"select count(*) from {table}").fetchone()[0]
+
+    def test_results(self):
+        """Every statement gets its rowcount and time"""
+        results = run_script(
+            self.conn,
+            "create table t1 (a); insert into t1 values (1), (2); "
+            "update t1 set a = 3;",
+        )
+        self.assertEqual([result.number for result in results], [1, 2, 3])
+        self.assertEqual([result.rowcount for result in results][1:], [2, 2])
+        self.assertTrue(all(result.seconds >= 0 for result in results))
+        self.assertFalse(self.conn.in_transaction)
+
+    def test_transaction(self):
+        """Failed statement rolls back the whole script"""
+        self.conn.execute("create table t2 (a)")
+        self.conn.commit()
+        with self.assertRaises(ScriptError) as context:
+            run_script(
+                self.conn,
+                "create table t1 (a); insert into t2 values (1); bad;",
+            )
+        self.assertEqual(context.exception.number, 3)
+        self.assertEqual(len(context.exception.results), 2)
+        self.assertEqual(self.count("t2"), 0)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.count()
+
+    def test_no_transaction(self):
+        """Without transaction statements before the failed one stay"""
+        with self.assertRaises(ScriptError):
+            run_script(
+                self.conn,
+                ["create table t1 (a)", "insert into t1 values (1)", "bad"],
+                transaction=False,
+            )
+        self.assertEqual(self.count(), 1)
+
+    def test_commit_failed(self):
+        """Deferred constraint fails the commit, the script is rolled back"""
+        self.conn.execute("pragma foreign_keys = on")
+        script = (
+            "create table t1 (a primary key); "
+            "create table t2 (a references t1 deferrable initially deferred);"
+            "insert into t2 values (1);"
+        )
+        with self.assertRaises(ScriptError) as context:
+            run_script(self.conn, script)
+        self.assertEqual(context.exception.number, 4)
+        self.assertEqual(len(context.exception.results), 3)
+        self.assertFalse(self.conn.in_transaction)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.count()
+
+    def test_cancel(self):
+        """Cancelled script is rolled back"""
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(ScriptError):
+            run_script(
+                self.conn, "create table t1 (a)", cancel_event=cancel_event
+            )
+        with self.assertRaises(sqlite3.OperationalError):
+            self.count()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import sqlite3
+import unittest
+
+from paginator import QueryPaginator
+from settings import CREATE, INSERT, SELECT
+
+
+class ScrollableCursor:
+    """Mimics named scrollable cursor on top of SQLite cursor."""
+
+    def __init__(self, conn, name):
+        self.name = name
+        self.conn = conn
+        self.rows = []
+        self.pos = 0
+        self.description = None
+        self.rowcount = -1
+        self.closed = False
+
+    def execute(self, query, params=None):
+        self.conn.executions += 1
+        curs = self.conn.sqlite.execute(query)
+        self.rows = curs.fetchall()
+        self.pos = 0
+        self.__description = curs.description
+
+    def fetchmany(self, size):
+        # description of the named cursor is known after the first fetch
+        self.description = self.__description
+        rows = self.rows[self.pos : self.pos + size]
+        self.pos += len(rows)
+        return rows
+
+    def scroll(self, value, mode="relative"):
+        self.conn.scrolls += 1
+        self.pos = value if mode == "absolute" else self.pos + value
+
+    def close(self):
+        self.closed = True
+
+
+class ServerSideConnection:
+    """Connection which supports named cursors."""
+
+    def __init__(self, sqlite):
+        self.sqlite = sqlite
+        self.executions = 0
+        self.scrolls = 0
+        self.commits = 0
+
+    def cursor(self, name=None, scrollable=None):
+        if name is None:
+            return self.sqlite.cursor()
+        return ScrollableCursor(self, name)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class TestPaginatorServerSide(unittest.TestCase):
+    """Testing named scrollable cursors of QueryPaginator"""
+
+    def setUp(self):
+        self.sqlite = sqlite3.connect(":memory:")
+        self.sqlite.execute(CREATE)
+        self.sqlite.execute(INSERT)
+        self.sqlite.commit()
+        self.conn = ServerSideConnection(self.sqlite)
+
+    def tearDown(self):
+        self.sqlite.close()
+
+    def test_named_cursor(self):
+        """Select is executed with named cursor and not committed"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn
+        )
+        self.assertTrue(paginator.server_side)
+        self.assertEqual(paginator.headers(), ["a", "b"])
+        self.assertEqual(self.conn.commits, 0)
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[1] for i in res], list(range(1, 8)))
+
+    def test_scroll_backward(self):
+        """Going backward scrolls the cursor instead of reexecuting"""
+        paginator = QueryPaginator(
+            rows_num=7, query=SELECT, connection=self.conn, cache_pages=0
+        )
+        for _ in range(4):
+            _ = list(paginator.feeder(forward=True))
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[0][1] for i in res], list(range(15, 22)))
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[0][1] for i in res], list(range(8, 15)))
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[0][1] for i in res], list(range(15, 22)))
+        self.assertEqual(self.conn.executions, 1)
+        self.assertEqual(self.conn.scrolls, 2)
+
+    def test_ddl_client_cursor(self):
+        """Statements other than select use regular cursor"""
+        paginator = QueryPaginator(
+            query="delete from t1 where b = 1", connection=self.conn
+        )
+        self.assertFalse(paginator.server_side)
+        self.assertEqual(self.conn.commits, 1)
+
+    def test_disabled(self):
+        """Named cursors can be switched off"""
+        paginator = QueryPaginator(
+            query=SELECT, connection=self.conn, server_side=False
+        )
+        self.assertFalse(paginator.server_side)
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual(len(res), 25)
+
+    def test_sqlite_fallback(self):
+        """SQLite doesn't support named cursors, so regular one is used"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.sqlite
+        )
+        self.assertFalse(paginator.server_side)
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual(len(res), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
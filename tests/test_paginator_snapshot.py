@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import unittest
+from decimal import Decimal
+
+from paginator import QueryPaginator
+from settings import CREATE, INSERT, NW_SELECT, NW_SQLITE, SELECT
+from snapshot import spill_value
+
+
+class WrappedConnection:
+    """Connection of some provider other than SQLite."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        return self.conn.cursor()
+
+    def commit(self):
+        self.conn.commit()
+
+
+class TestSQLitePaginatorSnapshot(unittest.TestCase):
+    """Testing snapshot mode of QueryPaginator"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_same_pages(self):
+        """Snapshot pages are the same as regular ones"""
+        conn = sqlite3.connect(NW_SQLITE)
+        regular = QueryPaginator(
+            rows_num=100, query=NW_SELECT, connection=conn
+        )
+        snapshot = QueryPaginator(
+            rows_num=100, query=NW_SELECT, connection=conn, snapshot=True
+        )
+        self.assertEqual(regular.headers(), snapshot.headers())
+        while True:
+            expected = list(regular.feeder(forward=True))
+            self.assertEqual(list(snapshot.feeder(forward=True)), expected)
+            if not expected:
+                break
+        snapshot.close()
+        conn.close()
+
+    def test_query_executed_once(self):
+        """Pages are looked up by row id, query is not reexecuted"""
+        paginator = QueryPaginator(
+            rows_num=7,
+            query=SELECT,
+            connection=self.conn,
+            snapshot=True,
+            cache_pages=0,
+        )
+        self.assertEqual(paginator.snapshot.row_count, 25)
+        for _ in range(4):
+            _ = list(paginator.feeder(forward=True))
+        res = list(paginator.feeder(forward=False))
+        self.assertEqual([i[0][1] for i in res], list(range(15, 22)))
+        self.assertEqual([i[1] for i in res], list(range(15, 22)))
+        self.assertEqual(self.statements.count(SELECT), 1)
+
+    def test_commented_query(self):
+        """Query ending with a comment is materialized"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=f"{SELECT} -- all rows",
+            connection=self.conn,
+            snapshot=True,
+        )
+        self.assertEqual(paginator.snapshot.row_count, 25)
+        self.assertEqual(paginator.fetch_page().rows[0][1], 1)
+        paginator.close()
+
+    def test_stable(self):
+        """Snapshot doesn't see changes made after it's taken"""
+        paginator = QueryPaginator(
+            query=SELECT, connection=self.conn, snapshot=True, cache_pages=0
+        )
+        self.conn.execute("delete from t1")
+        self.conn.commit()
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual(len(res), 25)
+
+    def test_close(self):
+        """Temp table is dropped on close"""
+        paginator = QueryPaginator(
+            query=SELECT, connection=self.conn, snapshot=True
+        )
+        paginator.close()
+        tables = self.conn.execute(
+            "select name from sqlite_temp_master where type = 'table'"
+        ).fetchall()
+        self.assertEqual(tables, [])
+
+    def test_ddl(self):
+        """Snapshot is not taken for queries other than select"""
+        paginator = QueryPaginator(
+            query="delete from t1 where b = 1",
+            connection=self.conn,
+            snapshot=True,
+        )
+        self.assertIsNone(paginator.snapshot)
+        res = list(paginator.feeder(forward=True))
+        self.assertEqual(res[0][0][0], "Affected rows: 1")
+
+    def test_spill_file(self):
+        """Results of other providers are spilled into a file"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT,
+            connection=WrappedConnection(self.conn),
+            snapshot=True,
+        )
+        path = paginator.snapshot.spill_file
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(paginator.headers(), ["a", "b"])
+        for _ in range(3):
+            res = list(paginator.feeder(forward=True))
+        self.assertEqual([i[0][1] for i in res], list(range(21, 26)))
+        paginator.close()
+        self.assertFalse(os.path.isfile(path))
+
+    def test_spill_value(self):
+        """Values SQLite doesn't support are converted"""
+        self.assertEqual(spill_value(Decimal("1.50")), "1.50")
+        self.assertEqual(spill_value(bytearray(b"ab")), b"ab")
+        self.assertEqual(spill_value(None), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
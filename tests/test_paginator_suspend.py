@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from paginator import QueryPaginator
+from pool import ConnectionPool
+from settings import CREATE, INSERT, SELECT
+
+SELECT_ORDERED = "select * from t1 order by b"
+
+
+class TestSQLitePaginatorSuspend(unittest.TestCase):
+    """Testing memory release of the paginator of a hidden tab"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(CREATE)
+        self.conn.execute(INSERT)
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.path)
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def test_bookmark(self):
+        """Cached pages are dropped, the page is read again"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn
+        )
+        paginator.fetch_page()
+        paginator.fetch_page()
+        self.assertEqual(paginator.suspend(), 2)
+        self.assertEqual(paginator.current_page, 2)
+        misses = paginator.cache_misses
+        page = paginator.fetch_page_at(2)
+        self.assertEqual(paginator.cache_misses, misses + 1)
+        self.assertEqual(page.rows[0][1], 11)
+        self.assertEqual(paginator.fetch_page().rows[0][1], 21)
+
+    def test_lock_released(self):
+        """Partly read cursor doesn't keep other connections from writing"""
+        paginator = QueryPaginator(
+            rows_num=10, query=SELECT, connection=self.conn
+        )
+        paginator.fetch_page()
+        other = sqlite3.connect(self.path, timeout=0)
+        other.execute("delete from t1 where b = 1")
+        with self.assertRaises(sqlite3.OperationalError):
+            other.commit()
+        paginator.suspend()
+        other.commit()
+        other.close()
+        self.assertEqual(paginator.headers(), ["a", "b"])
+        self.assertEqual(paginator.fetch_page_at(1).rows[0][1], 2)
+        paginator.close()
+
+    def test_keyset(self):
+        """Keyset bookmarks survive, so the page is sought"""
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT_ORDERED,
+            connection=self.conn,
+            keyset=("b",),
+        )
+        for _ in range(3):
+            paginator.fetch_page()
+        self.assertEqual(paginator.suspend(), 3)
+        self.assertEqual(paginator.fetch_page_at(2).rows[0][1], 11)
+
+    def test_prefetch(self):
+        """Prefetch connection goes back to the pool and resumes later"""
+        pool = ConnectionPool()
+        paginator = QueryPaginator(
+            rows_num=10,
+            query=SELECT,
+            connection=self.conn,
+            prefetch=True,
+            connection_factory=pool.factory(self.path, self.connect),
+        )
+        paginator.fetch_page()
+        paginator.fetch_page()
+        paginator.suspend()
+        self.assertEqual(pool.in_use, 0)
+        self.assertTrue(paginator.prefetch)
+        paginator.fetch_page_at(1)
+        hits = paginator.cache_hits
+        self.assertEqual(paginator.fetch_page().rows[0][1], 11)
+        self.assertEqual(paginator.cache_hits, hits + 1)
+        paginator.close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,405 @@
+import threading
+from collections import namedtuple
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from columnar import ColumnarPage
+from dbapi import cancel_connection, driver_errors, driver_module, is_select
+from formatters import RowFormatter
+from paginator import Page, QueryCancelledError, QueryPaginator
+from pool import PoolExhaustedError
+
+# reads for the virtual model further from the latest requested page
+# are dropped, the view has moved on
+WINDOW_DISTANCE = 2
+
+# page fed by the paginator: column names, Page, direction, display
+# strings of the rows and generation of the request
+PageResult = namedtuple(
+    "PageResult", "headers page forward display generation"
+)
+
+
+class PaginatorWorker(QObject):
+    """
+    Runs QueryPaginator in a background thread, so the GUI never waits
+    for the DB. The worker must be moved to a QThread, requests come
+    with queued slots, results are sent back with signals.
+    The paginator and the connection are used by the worker's thread
+    only, the connection is closed there as well.
+    """
+
+    # PageResult
+    page_ready_signal = pyqtSignal(object)
+    # there is no such page, the current one is left intact;
+    # generation of the request
+    no_page_signal = pyqtSignal(int)
+    # number of rows fetched since the query was executed; numbers of rows
+    # are sent as objects, they may exceed the range of C++ int
+    progress_signal = pyqtSignal(object)
+    # error message
+    error_signal = pyqtSignal(str)
+    # number of rows, number of pages and whether they are exact,
+    # may come from other thread
+    count_signal = pyqtSignal(object, object, bool)
+    # PageResult for the virtual model, without rows if there is no such
+    # page
+    window_page_signal = pyqtSignal(object)
+    # page of the virtual model which read was dropped
+    window_dropped_signal = pyqtSignal(int)
+    # rows exported so far and rows per second
+    export_progress_signal = pyqtSignal(object, float)
+    # number of exported rows and the file
+    export_done_signal = pyqtSignal(object, str)
+    # error message of the export
+    export_failed_signal = pyqtSignal(str)
+    # rows imported so far and rows per second
+    import_progress_signal = pyqtSignal(object, float)
+    # number of imported rows and the table
+    import_done_signal = pyqtSignal(object, str)
+    # error message of the import
+    import_failed_signal = pyqtSignal(str)
+    # StatementResult of every executed statement of the script and
+    # whether the last select is paged afterwards
+    script_done_signal = pyqtSignal(object, bool)
+
+    def __init__(self, parent=None, pool=None, result_cache=None):
+        super().__init__(parent)
+        # connections are returned to the pool instead of being closed
+        self.pool = pool
+        # shared by the workers, even if results aren't cached now
+        self.result_cache = result_cache
+        self.paginator = None
+        self.formatter = None
+        self.conn = None
+        self.rows_fetched = 0
+        self.cancel_requested = False
+        # generation of the latest request, set by the GUI thread
+        self.generation = 0
+        # latest page requested by the virtual model, set by the GUI thread
+        self.window_page = 0
+        # set by cancel() to stop the export or the import
+        self.transfer_cancel = threading.Event()
+        # own connection of the running export
+        self.transfer_conn = None
+
+    def next_generation(self) -> int:
+        """
+        Returns generation for the new request, which supersedes all
+        requests sent before. Called from the GUI thread.
+        """
+        self.generation += 1
+        return self.generation
+
+    def cancel(self):
+        """Aborts running request, called from the GUI thread."""
+        self.cancel_requested = True
+        self.transfer_cancel.set()
+        paginator, conn = self.paginator, self.conn
+        transfer_conn = self.transfer_conn
+        if transfer_conn:
+            cancel_connection(transfer_conn)
+        if paginator:
+            paginator.cancel()
+        elif conn:
+            # the query is being executed by the paginator's constructor
+            cancel_connection(conn)
+
+    @pyqtSlot(object)
+    def execute(self, options: dict):
+        """
+        Creates paginator with the options (QueryPaginator's arguments)
+        and feeds the first page. Options display_max_length,
+        generation, script and transaction are taken by the worker, long
+        cells are truncated to display_max_length.
+        With script the query is split into statements which are run
+        one by one, within one transaction if transaction is set; the
+        last statement is paged if it's a select.
+        """
+        self.__close_paginator()
+        options = dict(options)
+        max_length = options.pop("display_max_length", None)
+        generation = options.pop("generation", self.generation)
+        script = options.pop("script", False)
+        transaction = options.pop("transaction", True)
+        self.conn = options["connection"]
+        self.rows_fetched = 0
+        self.cancel_requested = False
+        self.transfer_cancel.clear()
+        if script:
+            options["query"] = self.__run_script(options["query"], transaction)
+            if options["query"] is None:
+                return
+        try:
+            self.paginator = QueryPaginator(
+                **options, count_callback=self.__report_count
+            )
+        except (ValueError,) + self.__errors() as err:
+            self.error_signal.emit(self.__message(err))
+            return
+        if not self.paginator.is_data_query:
+            self.__invalidate(self.conn)
+        self.formatter = RowFormatter(
+            self.paginator.description, driver_module(self.conn), max_length
+        )
+        self.__feed(self.paginator.fetch_page, generation, True)
+
+    @pyqtSlot(bool, int)
+    def page(self, forward: bool, generation: int):
+        """Feeds the next or the previous page."""
+        self.cancel_requested = False
+        if self.paginator and generation == self.generation:
+            self.__feed(self.paginator.fetch_page, generation, forward)
+
+    @pyqtSlot(int, int)
+    def goto_page(self, page: int, generation: int):
+        """
+        Feeds the page or the last one if the result is shorter.
+        Superseded request is dropped.
+        """
+        self.cancel_requested = False
+        if not self.paginator or generation != self.generation:
+            return
+        forward = page >= self.paginator.current_page
+        self.__feed(
+            self.paginator.fetch_page_at, generation, forward, page, True
+        )
+
+    @pyqtSlot(object)
+    def export(self, options: dict):
+        """
+        Streams all rows of the query to the file,
+        options are export_query's arguments except the connection.
+        The rows are read through the connection made by
+        connection_factory option if it's given, so the paginator's
+        cursor and transaction are left alone; the connection is closed
+        afterwards.
+        """
+        from export import ExportCancelledError, export_query
+
+        self.cancel_requested = False
+        self.transfer_cancel.clear()
+        options = dict(options)
+        factory = options.pop("connection_factory", None)
+        conn = self.conn
+        if not conn:
+            return
+        try:
+            if factory:
+                conn = self.transfer_conn = factory()
+            try:
+                rows = export_query(
+                    conn,
+                    progress=self.export_progress_signal.emit,
+                    cancel_event=self.transfer_cancel,
+                    **options,
+                )
+            finally:
+                if factory:
+                    self.transfer_conn = None
+                    conn.close()
+        except (
+            ValueError,
+            OSError,
+            ExportCancelledError,
+            PoolExhaustedError,
+        ) + driver_errors(conn) as err:
+            self.export_failed_signal.emit(str(err))
+            return
+        self.export_done_signal.emit(rows, options["path"])
+
+    @pyqtSlot(object)
+    def import_file(self, options: dict):
+        """
+        Loads CSV file into the table, options are import_csv's
+        arguments. The rows are inserted through the connection made by
+        connection_factory option if it's given, the connection is closed
+        afterwards. Otherwise background readers of the paginator are
+        stopped first, they would lock SQLite DB.
+        """
+        import csv
+
+        from importer import ImportCancelledError, import_csv
+
+        self.cancel_requested = False
+        self.transfer_cancel.clear()
+        options = dict(options)
+        factory = options.pop("connection_factory", None)
+        connection = conn = options.pop("connection")
+        if not factory and self.paginator:
+            self.paginator.stop_background()
+        try:
+            if factory:
+                conn = factory()
+            try:
+                rows = import_csv(
+                    conn,
+                    progress=self.import_progress_signal.emit,
+                    cancel_event=self.transfer_cancel,
+                    **options,
+                )
+            finally:
+                if factory:
+                    conn.close()
+        except (
+            ValueError,
+            OSError,
+            csv.Error,
+            ImportCancelledError,
+            PoolExhaustedError,
+        ) + driver_errors(conn) as err:
+            self.import_failed_signal.emit(str(err))
+            return
+        finally:
+            # committed batches stay even if the import fails
+            self.__invalidate(connection)
+        self.import_done_signal.emit(rows, options["table"])
+
+    @pyqtSlot(int)
+    def read_page(self, page: int):
+        """
+        Reads the page for the virtual model. Pages far from the latest
+        requested one are dropped, e.g. while the scroll bar is dragged.
+        """
+        self.cancel_requested = False
+        if not self.paginator:
+            return
+        if abs(page - self.window_page) > WINDOW_DISTANCE:
+            self.window_dropped_signal.emit(page)
+            return
+        try:
+            result = self.paginator.fetch_page_at(page)
+        except self.__errors() as err:
+            self.error_signal.emit(self.__message(err))
+            return
+        self.window_page_signal.emit(
+            self.__result(
+                result or Page([], range(0), page), True, self.generation
+            )
+        )
+        self.__report_count()
+
+    @pyqtSlot()
+    def suspend(self):
+        """Frees pages and the cursor of the paginator of the hidden tab."""
+        if self.paginator:
+            self.paginator.suspend()
+
+    @pyqtSlot(object)
+    def close(self, connection):
+        """
+        Closes the paginator and returns the connection to the pool,
+        the connection is closed if there is no pool.
+        """
+        self.__close_paginator()
+        if connection and self.pool:
+            self.pool.release(connection)
+        elif connection:
+            connection.close()
+
+    @pyqtSlot(object)
+    def shutdown(self, connection):
+        """Closes the paginator and the connection, stops the thread."""
+        self.close(connection)
+        self.thread().quit()
+
+    def __run_script(self, script: str, transaction: bool):
+        """
+        Runs statements of the script except the last select, which is
+        returned to be paged, and reports their results.
+        Returns None if there is nothing to page.
+        """
+        from script import ScriptError, run_script, split_statements
+
+        statements = split_statements(script)
+        if not statements:
+            self.error_signal.emit("no query provided")
+            return None
+        last = statements.pop() if is_select(statements[-1]) else None
+        try:
+            results = run_script(
+                self.conn, statements, transaction, self.transfer_cancel
+            )
+        except ScriptError as err:
+            self.script_done_signal.emit(err.results, False)
+            self.error_signal.emit(str(err))
+            return None
+        except driver_errors(self.conn) as err:
+            # e.g. rollback of the failed statement
+            self.error_signal.emit(str(err))
+            return None
+        finally:
+            if not all(is_select(statement) for statement in statements):
+                self.__invalidate(self.conn)
+        self.script_done_signal.emit(results, last is not None)
+        return last
+
+    def __invalidate(self, connection):
+        """Drops cached results of the DB written to by the connection."""
+        if self.result_cache is not None:
+            self.result_cache.invalidate(connection)
+
+    def __close_paginator(self):
+        """Closes the paginator if any."""
+        if self.paginator:
+            self.paginator.close()
+            self.paginator = None
+
+    def __result(
+        self, page: Page, forward: bool, generation: int
+    ) -> PageResult:
+        """Returns the page with its rows formatted for display."""
+        first_number = page.numbers.start
+        display = self.formatter.format_rows(page.rows)
+        return PageResult(
+            self.paginator.headers(),
+            page._replace(rows=ColumnarPage(page.rows, first_number)),
+            forward,
+            ColumnarPage(display, first_number),
+            generation,
+        )
+
+    def __report_count(self):
+        """Sends number of pages to the GUI if it's known."""
+        paginator = self.paginator
+        if paginator and paginator.total_pages is not None:
+            self.count_signal.emit(
+                paginator.total_rows,
+                paginator.total_pages,
+                paginator.total_exact,
+            )
+
+    def __errors(self) -> tuple:
+        """Returns errors reported to the GUI."""
+        return (QueryCancelledError,) + driver_errors(self.conn)
+
+    def __message(self, err: Exception) -> str:
+        """Returns error message for the GUI."""
+        if self.cancel_requested and not isinstance(err, QueryCancelledError):
+            # driver's own message, e.g. 'interrupted'
+            return "query cancelled"
+        return str(err)
+
+    def __feed(self, fetch, generation: int, forward: bool, *args):
+        """
+        Fetches the page with the paginator's fetch method and sends it
+        to the GUI. The method gets args if given, the direction
+        otherwise.
+        """
+        # empty result of the query is shown as an empty table
+        first = not self.paginator.fetched
+        try:
+            result = fetch(*args) if args else fetch(forward)
+        except self.__errors() as err:
+            self.error_signal.emit(self.__message(err))
+            return
+        if result:
+            self.rows_fetched += len(result.rows)
+        self.progress_signal.emit(self.rows_fetched)
+        if not result and not first:
+            self.no_page_signal.emit(generation)
+            return
+        if not result:
+            result = Page([], range(0), self.paginator.current_page)
+        self.page_ready_signal.emit(self.__result(result, forward, generation))
+        self.__report_count()